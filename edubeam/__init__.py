@@ -26,6 +26,6 @@ This is a EduBeam module (Static analysis of 2D beams)
 """
 
 #List all submodules, so they can all be imported: from edubeam import *
-__all__ = ['ebfem', 'ebinit', 'edubeam', 'ebgui', 'ebio']
+__all__ = ['ebfem', 'ebinit', 'edubeam', 'ebgui', 'ebio', 'ebanalysis', 'ebreliability']
 
 
@@ -0,0 +1,630 @@
+# -*- coding: utf-8 -*
+
+#
+#          EduBeam is an education project to develop a free structural
+#                   analysis code for educational purposes.
+#
+#                             (c) 2011 Borek Patzak 
+#
+#       EduBeam is free software; you can redistribute it and/or modify it 
+#         under the terms of the GNU General Public License as published 
+#        by the Free Software Foundation; either version 2 of the License, 
+#                        or (at your option) any later version.
+#
+# EduBeam is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; 
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  
+# See the GNU General Public License for more details. You should have received a copy of 
+# the GNU General Public License along with File Hunter; if not, write to 
+# the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+
+##################################################################
+#
+# ebanalysis.py file
+# defines EduBeam analyses driving repeated solutions (parameter sweeps, sizing)
+#
+##################################################################
+
+"""
+EduBeam module providing analyses driving repeated solutions of the computational part (:py:mod:`ebfem`)
+"""
+
+
+from ebinit import *
+from ebfem import *
+
+
+sweepStiffnessAttributes = {'material':('e','g'), 'crossSection':('a','iy','k','j'), 'node':('x','y','z'), 'element':('hinges','mat','cs')}
+"""*(dict)* attributes of domain components (see :py:meth:`ParameterSweep.addParameter`) the stiffness matrix depends on"""
+
+def giveSweepComponent(domain, kind, where):
+    """Returns component of domain changed by a parameter of :py:class:`ParameterSweep`, None if not found
+    
+    :param Domain domain: domain
+    :param str kind: 'material', 'crossSection', 'node', 'element', 'nodalLoad', 'elementLoad', 'prescribedDspl' or 'loadCase'
+    :param str where: label of the component
+    :rtype: Material | CrossSection | Node | Element | GeneralBoundaryCondition | LoadCase | None
+    """
+    give = {'material':domain.giveMaterial, 'crossSection':domain.giveCrossSection, 'node':domain.giveNode, 'element':domain.giveElement, 'nodalLoad':domain.giveNodalLoad, 'elementLoad':domain.giveElementLoad, 'prescribedDspl':domain.givePrescribedDspl, 'loadCase':domain.giveLoadCase}.get(kind)
+    return give(where) if give else None
+
+def giveSweepParameterValue(domain, parameter):
+    """Returns current value of a parameter of :py:class:`ParameterSweep`
+    
+    :param tuple parameter: parameter (label,kind,where,attribute,values)
+    :rtype: float | list | str
+    """
+    label,kind,where,attribute,values = parameter
+    obj = giveSweepComponent(domain,kind,where)
+    if kind == 'node':
+        return obj.coords['xyz'.index(attribute)]
+    if kind == 'element':
+        value = getattr(obj,attribute)
+        return list(value) if attribute == 'hinges' else value.label
+    if kind in ('nodalLoad','elementLoad','prescribedDspl'):
+        return obj.value[attribute]
+    return getattr(obj,attribute)
+
+def applySweepParameter(domain, parameter, value):
+    """Sets value of a parameter of :py:class:`ParameterSweep` by change method of domain component without undo records. Returns False if successful, True otherwise
+    
+    :param Domain domain: domain
+    :param tuple parameter: parameter (label,kind,where,attribute,values)
+    :param float|list|str value: new value
+    :rtype: bool
+    """
+    label,kind,where,attribute,values = parameter
+    obj = giveSweepComponent(domain,kind,where)
+    if obj is None:
+        return 1
+    if kind == 'node':
+        coords = list(obj.coords)
+        coords['xyz'.index(attribute)] = value
+        return obj.change(coords=coords)
+    if kind == 'element':
+        return obj.change(**{attribute:list(value) if attribute == 'hinges' else value})
+    if kind in ('nodalLoad','elementLoad','prescribedDspl'):
+        return obj.change(value={attribute:value})
+    return obj.change(**{attribute:value})
+
+def evaluateSweepOutputs(solver, outputs):
+    """Returns values of outputs of :py:class:`ParameterSweep` extracted from solved solver, see :py:meth:`ParameterSweep.addOutput`
+    
+    :param LinearStaticSolver solver: solved solver
+    :param [tuple] outputs: outputs (label,type,where,index,loadCase)
+    :rtype: [float]
+    """
+    domain = solver.domain
+    endForces = {}
+    ret = []
+    for label,type,where,index,loadCase in outputs:
+        if callable(type):
+            ret.append(float(type(solver)))
+            continue
+        if type in ('reaction','displacement'):
+            node = domain.giveNode(where)
+            loc = node.loc[domain.dofsNames.index(index)]
+            ret.append((solver.f if type == 'reaction' else solver.r)[loadCase][loc])
+        elif type == 'endForce':
+            if loadCase not in endForces:
+                elems,fe = solver.computeEndForces([loadCase])
+                endForces[loadCase] = dict( (elem.label,f[:,0]) for elem,f in zip(elems,fe) )
+            ret.append(endForces[loadCase][where][index])
+        elif type == 'maxDisplacement':
+            nodes = [domain.giveNode(node) for node in where] if where else domain.nodes.values()
+            i = domain.dofsNames.index(index)
+            r = solver.r[loadCase]
+            ret.append(max(abs(r[node.loc[i]]) for node in nodes))
+    return ret
+
+def solveSweepRuns(domain, solver, parameters, outputs, runs):
+    """Solves given runs of :py:class:`ParameterSweep` one by one by given solver. Returns indices of runs and (nrun,nout) array of outputs, NaN for failed runs
+    
+    :param Domain domain: domain, it is changed by parameters
+    :param LinearStaticSolver solver: solver
+    :param [tuple] parameters: parameters (label,kind,where,attribute,values)
+    :param [tuple] outputs: outputs (label,type,where,index,loadCase)
+    :param [(int,tuple)] runs: indices of runs and values of parameters
+    :rtype: ([int],np.array(2d))
+    """
+    ret = empty((len(runs),len(outputs)))
+    ret.fill(nan)
+    # consecutive runs with the same stiffness reuse the factorization of solver (see LinearStaticSolver.solve)
+    for i,(run,values) in enumerate(runs):
+        if [parameter for parameter,value in zip(parameters,values) if applySweepParameter(domain,parameter,value)]:
+            continue
+        if solver.solve(domain):
+            continue
+        ret[i] = evaluateSweepOutputs(solver,outputs)
+    return [run for run,values in runs], ret
+
+def solveSweepRunsFromXml(xmlString, parameters, outputs, runs, settings=None):
+    """Worker of :py:class:`ParameterSweep` solving given runs of domain passed as xml string (see :py:func:`ebio.xmlStringFromDomain`), see :py:func:`solveSweepRuns`
+    
+    :param bytes xmlString: xml representation of domain
+    :param dict settings: attributes of :py:class:`LinearStaticSolver` to be set
+    :rtype: ([int],np.array(2d))
+    """
+    import io
+    from ebio import loadDomainFromXmlFile
+    # messages below errors are suppressed in workers
+    logger.setLevel('ERROR')
+    domain = loadDomainFromXmlFile(io.BytesIO(xmlString))
+    solver = LinearStaticSolver()
+    for key,value in (settings or {}).items():
+        setattr(solver,key,value)
+    Session(domain=domain,solver=solver)
+    return solveSweepRuns(domain,solver,parameters,outputs,runs)
+
+
+class ParameterSweep:
+    """Parametric study of domain, the domain is solved for all combinations of values of given parameters and given outputs are collected to a table
+    
+    :param Domain domain: domain to be studied
+    :param str label: string label of receiver
+    """
+
+    label = None
+    """*(str)* string label"""
+    domain = None
+    """*(Domain)* studied domain"""
+    parameters = None
+    """*([tuple])* parameters (label,kind,where,attribute,values), see :py:meth:`addParameter`"""
+    outputs = None
+    """*([tuple])* outputs (label,type,where,index,loadCase), see :py:meth:`addOutput`"""
+    data = None
+    """*(np.array(2d))* (nrun,npar+nout) table of parameters and outputs of the last sweep, non-numeric parameters are given by indices of their values, failed outputs are NaN"""
+    solverSettings = ('denseThreshold','equationOrdering','factorizationType','bandwidthThreshold','incrementalReanalysis','maxUpdateRank','linearSolver','preconditioner','tolerance','maxIterations')
+    """*(tuple)* attributes of session solver copied to solvers of the sweep"""
+
+    def __init__(self, domain=None, label='parametersweep'):
+        self.label = label
+        self.domain = domain
+        self.parameters = []
+        self.outputs = []
+
+    def addParameter(self, kind, where, attribute, values, label=None):
+        """Adds parameter of the sweep. Returns False if successful, True otherwise
+        
+        :param str kind: kind of domain component, 'material' (attribute 'e', 'g', 'alpha' or 'd'), 'crossSection' (attribute 'a', 'iy', 'iz', 'dyz', 'h', 'k' or 'j'), 'node' (coordinate 'x', 'y' or 'z'), 'element' (attribute 'hinges' with [bool,bool] values, 'mat' or 'cs' with labels as values), 'nodalLoad', 'elementLoad' or 'prescribedDspl' (key of value, e.g. 'fz' or 'magnitude')
+        :param str where: label of the component
+        :param str attribute: changed attribute
+        :param list values: values of the parameter
+        :param str label: label of the parameter (column of the table), kind/where/attribute if None
+        :rtype: bool
+        """
+        if not self.domain or giveSweepComponent(self.domain,kind,where) is None:
+            logger.error( langStr('Parameter of %s %s can not be added', 'Parametr %s %s nelze přidat') % (kind,where) )
+            return 1
+        label = label if label else '%s/%s/%s'%(kind,where,attribute)
+        self.parameters.append((label,kind,where,attribute,list(values)))
+        return 0
+
+    def addOutput(self, type, where=None, index=None, loadCase=None, label=None):
+        """Adds output of the sweep. Returns False if successful, True otherwise
+        
+        :param str|callable type: 'reaction' or 'displacement' (where is node, index is dof name), 'endForce' (where is element, index is local dof 0..5), 'maxDisplacement' (maximum absolute displacement in dof index over nodes where, all nodes if None), or function of solved :py:class:`LinearStaticSolver` returning float (module level function for parallel sweep)
+        :param str|[str] where: label of node or element, labels of nodes for 'maxDisplacement'
+        :param str|int index: dof name or local dof
+        :param str loadCase: label of load case or variant of load combination, active load case if None
+        :param str label: label of the output (column of the table)
+        :rtype: bool
+        """
+        loadCase = loadCase if loadCase else self.domain.activeLoadCase.label if self.domain and self.domain.activeLoadCase else None
+        if not callable(type) and type not in ('reaction','displacement','endForce','maxDisplacement'):
+            logger.error( langStr('Unknown output %s', 'Neznámý výstup %s') % type )
+            return 1
+        if type == 'maxDisplacement' and index is None:
+            index = 'z'
+        if not label:
+            label = getattr(type,'__name__','output') if callable(type) else '/'.join(str(v) for v in (type,where if isinstance(where,str) or where is None else ' '.join(where),index,loadCase) if v is not None)
+        self.outputs.append((label,type,where,index,loadCase))
+        return 0
+
+    def giveColumns(self):
+        """Returns labels of columns of :py:attr:`data`
+        
+        :rtype: [str]
+        """
+        return [parameter[0] for parameter in self.parameters] + [output[0] for output in self.outputs]
+
+    def isStiffnessParameter(self, parameter):
+        """Returns True if stiffness matrix depends on given parameter
+        
+        :param tuple parameter: parameter (label,kind,where,attribute,values)
+        :rtype: bool
+        """
+        return parameter[3] in sweepStiffnessAttributes.get(parameter[1],())
+
+    def giveRuns(self):
+        """Returns runs of the sweep grouped by values of stiffness parameters, each group is list of (index,values), index is row of :py:attr:`data`
+        
+        :rtype: [[(int,tuple)]]
+        """
+        shape = [len(parameter[4]) for parameter in self.parameters]
+        stiff = [i for i,parameter in enumerate(self.parameters) if self.isStiffnessParameter(parameter)]
+        groups = OrderedDict()
+        for run,ii in enumerate(ndindex(*shape)):
+            groups.setdefault(tuple(ii[i] for i in stiff),[]).append((run,tuple(parameter[4][i] for parameter,i in zip(self.parameters,ii))))
+        # groups in lexicographic order, consecutive ones differ in as few parameters as possible
+        return [groups[key] for key in sorted(groups)]
+
+    def giveSolverSettings(self):
+        """Returns settings of session solver to be used by solvers of the sweep
+        
+        :rtype: dict
+        """
+        solver = self.domain.session.solver if self.domain.session and isinstance(self.domain.session.solver,LinearStaticSolver) else LinearStaticSolver
+        return dict( (key,getattr(solver,key)) for key in self.solverSettings )
+
+    def run(self, workers=1, fileName=None):
+        """Runs the sweep in this process or in given number of processes, fills and returns :py:attr:`data`, None if there is nothing to run
+        
+        :param int workers: number of processes, number of processors if None
+        :param str fileName: name of csv file for streamed results (run index, parameters and outputs)
+        :rtype: np.array(2d) | None
+        """
+        if not self.domain or not self.parameters or not self.outputs:
+            logger.error( langStr('Parameter sweep needs domain, parameters and outputs', 'Parametrická studie potřebuje síť, parametry a výstupy') )
+            return None
+        # runs with the same stiffness matrix reuse one factorization, runs differing in a few elements reuse it by low-rank update
+        groups = self.giveRuns()
+        npar = len(self.parameters)
+        nrun = len([run for group in groups for run in group])
+        self.data = empty((nrun,npar+len(self.outputs)))
+        self.data.fill(nan)
+        for group in groups:
+            for run,values in group:
+                self.data[run,:npar] = [value if isinstance(value,(int,float)) else parameter[4].index(value) for parameter,value in zip(self.parameters,values)]
+        f = open(fileName,'w') if fileName else None
+        if f:
+            f.write(','.join(['run']+self.giveColumns())+'\n')
+        # rows are written to csv file as soon as they are computed
+        def store(runs, values):
+            self.data[runs,npar:] = values
+            if f:
+                for run in runs:
+                    f.write(','.join(['%d'%run]+['%.10g'%v for v in self.data[run]])+'\n')
+                f.flush()
+        settings = self.giveSolverSettings()
+        level = logger.level
+        try:
+            if workers == 1:
+                # parameters are applied by change methods without undo records and messages, the domain is restored after the sweep
+                original = [giveSweepParameterValue(self.domain,parameter) for parameter in self.parameters]
+                solver = LinearStaticSolver()
+                for key,value in settings.items():
+                    setattr(solver,key,value)
+                logger.setLevel('ERROR')
+                try:
+                    for group in groups:
+                        store(*solveSweepRuns(self.domain,solver,self.parameters,self.outputs,group))
+                finally:
+                    for parameter,value in zip(self.parameters,original):
+                        applySweepParameter(self.domain,parameter,value)
+            else:
+                # each process solves its own copy of domain
+                import concurrent.futures
+                from ebio import xmlStringFromDomain
+                xmlString = xmlStringFromDomain(self.domain)
+                with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+                    # contiguous chunks of groups, several for each process to balance the load
+                    nchunk = min(len(groups),4*(workers or os.cpu_count() or 1))
+                    bounds = linspace(0,len(groups),nchunk+1).astype(int)
+                    futures = [executor.submit(solveSweepRunsFromXml,xmlString,self.parameters,self.outputs,[run for group in groups[i:j] for run in group],settings) for i,j in zip(bounds[:-1],bounds[1:])]
+                    for future in concurrent.futures.as_completed(futures):
+                        store(*future.result())
+        finally:
+            logger.setLevel(level)
+            if f:
+                f.close()
+        failed = isnan(self.data[:,npar:]).any(axis=1).sum()
+        if failed:
+            logger.warning( langStr('Parameter sweep: %d of %d runs failed', 'Parametrická studie: %d z %d výpočtů selhalo') % (failed,nrun) )
+        logger.info( langStr('Parameter sweep finished, %d runs', 'Parametrická studie dokončena, %d výpočtů') % nrun )
+        return self.data
+
+    def exportCsv(self, fileName):
+        """Writes table of the last sweep to csv file. Returns 0 if successful, 1 otherwise
+        
+        :param str fileName: name of file
+        :rtype: bool
+        """
+        if self.data is None:
+            return 1
+        try:
+            f = open(fileName,'w')
+            f.write(','.join(['run']+self.giveColumns())+'\n')
+            for run,row in enumerate(self.data):
+                f.write(','.join(['%d'%run]+['%.10g'%v for v in row])+'\n')
+            f.close()
+            return 0
+        except IOError:
+            return 1
+
+
+class SectionSizing:
+    """Discrete sizing of cross sections of groups of elements minimizing weight (sum of d*A*l) subject to limits of bending stress and nodal displacements
+    
+    :param Domain domain: domain to be sized
+    :param [CrossSection|str] catalog: available cross sections of domain
+    :param [[Element|str]] groups: groups of elements sharing one section, elements are grouped by their current cross sections if None
+    :param float stressLimit: limit of |N|/A+|M|*h/(2*Iy) [Pa], stresses are not checked if None
+    :param float deflectionLimit: limit of absolute displacement of nodes in dof [m], displacements are not checked if None
+    :param str dof: checked dof of nodes
+    :param [Node|str] nodes: checked nodes, all nodes if None
+    :param [str] loadCases: labels of load cases or variants of load combinations, all of them if None
+    :param str label: string label of receiver
+    """
+
+    label = None
+    """*(str)* string label"""
+    domain = None
+    """*(Domain)* sized domain"""
+    catalog = None
+    """*([CrossSection])* available cross sections sorted by area"""
+    groups = None
+    """*([[Element]])* groups of elements sharing one section"""
+    stressLimit = None
+    """*(float)* limit of |N|/A+|M|*h/(2*Iy) [Pa]"""
+    deflectionLimit = None
+    """*(float)* limit of absolute displacement of checked nodes in :py:attr:`dof` [m]"""
+    dof = None
+    """*(str)* checked dof of nodes"""
+    nodes = None
+    """*([Node])* checked nodes"""
+    loadCases = None
+    """*([str])* labels of load cases or variants of load combinations, all of them if None"""
+    nseg = 10
+    """*(int)* number of segments of elements for evaluation of stresses"""
+    maxIterations = 50
+    """*(int)* maximum number of iterations"""
+    iterations = None
+    """*(int)* number of iterations (solutions) of the last sizing"""
+    history = None
+    """*([(float,float,float)])* weight, maximum stress ratio and maximum displacement ratio of each iteration"""
+    design = None
+    """*([CrossSection])* resulting section of each group"""
+    timings = None
+    """*(dict)* accumulated wall times [s] of the last sizing, phases of solutions (see :py:attr:`LinearStaticSolver.timings`), 'internalForces', 'sensitivities' and 'resizing'"""
+
+    def __init__(self, domain, catalog, groups=None, stressLimit=None, deflectionLimit=None, dof='z', nodes=None, loadCases=None, label='sectionsizing'):
+        self.label = label
+        self.domain = domain
+        catalog = [domain.giveCrossSection(cs) for cs in catalog]
+        if not catalog or None in catalog:
+            logger.error( langStr('Catalog of cross sections is empty or contains unknown cross section', 'Katalog průřezů je prázdný nebo obsahuje neznámý průřez') )
+            raise EduBeamError
+        self.catalog = sorted(catalog, key=lambda cs: cs.a)
+        if groups is None:
+            groups = OrderedDict()
+            for elem in domain.elements.values():
+                groups.setdefault(elem.cs,[]).append(elem)
+            groups = groups.values()
+        self.groups = [[domain.giveElement(elem) for elem in group] for group in groups]
+        self.stressLimit = stressLimit
+        self.deflectionLimit = deflectionLimit
+        self.dof = dof
+        self.nodes = [domain.giveNode(node) for node in nodes] if nodes else list(domain.nodes.values())
+        self.loadCases = loadCases
+
+    def computeStressRatios(self, solver, elems, a, iy, h):
+        """Returns (nelem,nsec) maximum ratios of stresses to :py:attr:`stressLimit` of given elements with each section of catalog and (nelem,) ratios with current sections, None if internal forces of some elements are not available
+        
+        :param LinearStaticSolver solver: solved solver
+        :param [Element] elems: elements
+        :param np.array a: current areas of elements
+        :param np.array iy: current moments of inertia of elements
+        :param np.array h: current heights of elements
+        :rtype: (np.array(2d),np.array)|None
+        """
+        ratios,current = zeros((len(elems),len(self.catalog))),zeros(len(elems))
+        if self.stressLimit is None or not elems:
+            return ratios,current
+        forces = solver.computeInternalForces(self.loadCases,self.nseg)
+        index = dict( (elem,i) for i,elem in enumerate(forces[0] if forces else []) )
+        missing = [elem.label for elem in elems if elem not in index]
+        if missing:
+            logger.error( langStr('Stresses of elements %s can not be checked, internal forces are not available', 'Napětí prvků %s nelze posoudit, vnitřní síly nejsou k dispozici') % ', '.join(missing) )
+            return None
+        fElems,x,(nn,vv,mm) = forces
+        ie = array([index[elem] for elem in elems], dtype=int)
+        absN = abs(nn[ie]).reshape(len(ie),-1)
+        absM = abs(mm[ie]).reshape(len(ie),-1)
+        ca = array([1./cs.a for cs in self.catalog])
+        cm = array([0.5*cs.h/cs.iy for cs in self.catalog])
+        ratios = (absN[:,:,newaxis]*ca + absM[:,:,newaxis]*cm).max(axis=1)/self.stressLimit
+        current = (absN/a[:,newaxis] + absM*(0.5*h/iy)[:,newaxis]).max(axis=1)/self.stressLimit
+        return ratios,current
+
+    def giveDeflections(self, solver):
+        """Returns (nnode,ncol) displacements of checked nodes in :py:attr:`dof` for checked load cases
+        
+        :param LinearStaticSolver solver: solved solver
+        :rtype: np.array(2d)
+        """
+        labels,cols = solver.giveColumns(self.loadCases)
+        i = self.domain.dofsNames.index(self.dof)
+        return solver.r.data[array([node.loc[i] for node in self.nodes], dtype=int)][:,cols]
+
+    def giveDeflectionRatio(self, r):
+        """Returns maximum ratio of displacements to :py:attr:`deflectionLimit`, 0 if displacements are not checked
+
+        :param np.array(2d) r: displacements of checked nodes (see :py:meth:`giveDeflections`)
+        :rtype: float
+        """
+        return abs(r).max()/self.deflectionLimit if self.deflectionLimit and r.size else 0.
+
+    def giveEnlargement(self, candidate, lg, delta, violated):
+        """Returns group and its larger section with the best ratio of reduction of violated displacements to added weight, (None,None) if there is none
+
+        :param np.array candidate: indices of sections of groups in :py:attr:`catalog`
+        :param np.array lg: sums of d*l of elements of groups
+        :param np.array(3d) delta: (nresp,ngroup,nsec) contributions of sections of groups to approximated displacements, the lightest enlargement is chosen if None
+        :param np.array violated: mask of violated displacements, or mask of groups which may be enlarged if delta is None
+        :rtype: (int,int)
+        """
+        secA = array([cs.a for cs in self.catalog])
+        dw = lg[:,newaxis]*(secA - secA[candidate][:,newaxis])
+        if delta is None:
+            gain = violated[:,newaxis]*ones(len(secA))
+        else:
+            dcur = delta[:,arange(len(candidate)),candidate]
+            gain = (dcur[:,:,newaxis] - delta)[violated].sum(axis=0)
+        score = where((dw > 0.) & (gain > 0.), gain/where(dw > 0.,dw,1.), 0.)
+        g,s = unravel_index(score.argmax(), score.shape)
+        if score[g,s] <= 0.:
+            return None,None
+        return g,s
+
+    def run(self, isUndoable=True):
+        """Runs sizing and applies the lightest feasible design, or the last one if there is none. Returns 0 if the applied design satisfies the limits, 1 otherwise
+        
+        :param bool isUndoable: if the change of sections is undoable or not
+        :rtype: bool
+        """
+        domain = self.domain
+        session = domain.session
+        solver = session.solver if session and isinstance(session.solver,LinearStaticSolver) else LinearStaticSolver()
+        elems = [elem for group in self.groups for elem in group]
+        groupIndex = array([g for g,group in enumerate(self.groups) for elem in group], dtype=int)
+        ngroup,nsec = len(self.groups),len(self.catalog)
+        original = [elem.cs for elem in elems]
+        allElems = list(domain.elements.values())
+        position = dict( (elem,i) for i,elem in enumerate(allElems) )
+        ie = array([position[elem] for elem in elems], dtype=int)
+        dl = array([elem.mat.d*elem.computeLength() for elem in elems])
+        lg = bincount(groupIndex, dl, ngroup)
+        secA = array([cs.a for cs in self.catalog])
+        secI = array([cs.iy for cs in self.catalog])
+        labels = self.loadCases
+        self.timings = dict( (key,0.) for key in ('assembly','update','loads','factorization','solution','postprocessing','internalForces','sensitivities','resizing') )
+        self.history = []
+        self.iterations = 0
+        current = None
+        checked = {}
+        constraints = OrderedDict()
+        found,best,bestWeight = False,None,None
+        failed = False
+        level = logger.level
+        logger.setLevel('WARN')
+        try:
+            while self.iterations < self.maxIterations:
+                # session solver reuses its factorization or updates it by low-rank update if only a few elements change
+                if solver.solve(domain):
+                    break
+                self.iterations += 1
+                for key,value in solver.timings.items():
+                    self.timings[key] += value
+                a = array([elem.cs.a for elem in elems])
+                iy = array([elem.cs.iy for elem in elems])
+                h = array([elem.cs.h for elem in elems])
+                weight = (dl*a).sum()
+                t = time.time()
+                ratios = self.computeStressRatios(solver,elems,a,iy,h)
+                self.timings['internalForces'] += time.time()-t
+                if ratios is None:
+                    failed = True
+                    break
+                stress,stressNow = ratios
+                r = self.giveDeflections(solver)
+                deflNow = self.giveDeflectionRatio(r)
+                self.history.append((weight,stressNow.max() if len(stressNow) else 0.,deflNow))
+                checked[current] = feasible = stressNow.max() <= 1. and deflNow <= 1.
+                if feasible and (not found or weight < bestWeight):
+                    found,best,bestWeight = True,current,weight
+                t = time.time()
+                # the lightest sections satisfying stress limit (fully stressed design)
+                stressOk = full((ngroup,nsec),True)
+                for g in range(ngroup):
+                    stressOk[g] = (stress[groupIndex==g] <= 1.).all(axis=0)
+                candidate = where(stressOk.any(axis=1), stressOk.argmax(axis=1), nsec-1)
+                self.timings['resizing'] += time.time()-t
+                delta,violated = None,None
+                if self.deflectionLimit:
+                    # reciprocal approximation of displacements of all nodes, which have ever been governing in any load case,
+                    # constraints of previous designs are kept so that the design does not oscillate between them
+                    t = time.time()
+                    labels,cols = solver.giveColumns(self.loadCases)
+                    for c,n in enumerate(abs(r).argmax(axis=0)):
+                        constraints[(n,c)] = True
+                    pairs = array(list(constraints), dtype=int)
+                    responses = [('displacement',self.nodes[n].label,self.dof,labels[c]) for n,c in pairs]
+                    sens = solver.computeSensitivities(responses,('a','iy'))
+                    self.timings['sensitivities'] += time.time()-t
+                    t = time.time()
+                    if sens is None:
+                        break
+                    rg = r[pairs[:,0],pairs[:,1]]
+                    # displacement is approximated as base + sum(ca/A + ci/Iy) over elements
+                    da = -sign(rg)[:,newaxis]*sens[:,ie,0]*a*a
+                    di = -sign(rg)[:,newaxis]*sens[:,ie,1]*iy*iy
+                    ca = array([bincount(groupIndex,d,ngroup) for d in da]).reshape(-1,ngroup)
+                    ci = array([bincount(groupIndex,d,ngroup) for d in di]).reshape(-1,ngroup)
+                    base = abs(rg) - (da/a + di/iy).sum(axis=1)
+                    estimate = base + (ca/secA[candidate] + ci/secI[candidate]).sum(axis=1)
+                    # change of estimate and weight for each group and section
+                    delta = ca[:,:,newaxis]/secA + ci[:,:,newaxis]/secI
+                    violated = abs(rg) > self.deflectionLimit
+                    # groups with the best ratio of displacement reduction to added weight are enlarged
+                    while (estimate > self.deflectionLimit).any():
+                        g,s = self.giveEnlargement(candidate,lg,delta,estimate > self.deflectionLimit)
+                        if g is None:
+                            break
+                        estimate += delta[:,g,s] - delta[:,g,candidate[g]]
+                        candidate[g] = s
+                    self.timings['resizing'] += time.time()-t
+                # the approximation may lead back to an infeasible checked design (e.g. to a mirror image of the current one),
+                # sections are then enlarged until an unchecked design is reached
+                key = tuple(candidate)
+                while key in checked and not checked[key]:
+                    if violated is not None and violated.any():
+                        g,s = self.giveEnlargement(candidate,lg,delta,violated)
+                    else:
+                        overstressed = array([stressNow[groupIndex==g].max() > 1. for g in range(ngroup)])
+                        g,s = self.giveEnlargement(candidate,lg,None,overstressed)
+                    if g is None:
+                        break
+                    candidate[g] = s
+                    key = tuple(candidate)
+                # iterations stop when a feasible design repeats or an infeasible one can not be enlarged
+                if key in checked:
+                    break
+                current = key
+                for elem,g in zip(elems,groupIndex):
+                    if elem.cs is not self.catalog[candidate[g]]:
+                        elem.change(cs=self.catalog[candidate[g]])
+        finally:
+            logger.setLevel(level)
+        # original sections are restored and the final design is applied as one undoable action, None stands for original design
+        final = best if found else current
+        for elem,cs in zip(elems,original):
+            if elem.cs is not cs:
+                elem.change(cs=cs)
+        if failed:
+            return 1
+        self.design = [self.catalog[s] for s in final] if final is not None else [group[0].cs for group in self.groups]
+        isUndoable = isUndoable and session
+        commands = []
+        for group,cs in zip(self.groups,self.design if final is not None else []):
+            changed = [elem for elem in group if elem.cs is not cs]
+            if changed and domain.changeElements(changed,None,cs,None,isUndoable=isUndoable,verbose=False,masterCommands=commands):
+                return 1
+        if isUndoable and commands:
+            commands.append(('other',Domain.changeElements,{}))
+            session.addCommands(commands)
+        # the applied design is checked once more, a design that was not checked (e.g. after the last iteration) may violate the limits
+        if solver.solve(domain):
+            return 1
+        a = array([elem.cs.a for elem in elems])
+        ratios = self.computeStressRatios(solver,elems,a,array([elem.cs.iy for elem in elems]),array([elem.cs.h for elem in elems]))
+        if ratios is None:
+            return 1
+        stressNow = ratios[1]
+        deflNow = self.giveDeflectionRatio(self.giveDeflections(solver))
+        logger.info( langStr('Sizing finished after %d iterations, weight %g', 'Návrh průřezů dokončen po %d iteracích, hmotnost %g') % (self.iterations,(dl*a).sum()) )
+        logger.info( ', '.join('%s %.3f s'%(key,value) for key,value in self.timings.items()) )
+        if stressNow.max() > 1. or deflNow > 1.:
+            logger.warning( langStr('No design satisfying limits found', 'Nenalezen návrh splňující limity') )
+            return 1
+        return 0
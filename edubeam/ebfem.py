@@ -31,13 +31,27 @@ EduBeam module providing computational part of the program
 
 
 from ebinit import *
+from collections import OrderedDict
+import tempfile
+import weakref
 
 try:
     from numpy import *
+    from numpy.lib.format import open_memmap
 except ImportError:
     logger.fatal( langStr('Required Numerical Python (numpy) package not present', 'Potřebný balík Numerical Python (numpy) nenalezen') )
     raise ImportError
 
+try:
+    import scipy.sparse as SP
+    import scipy.sparse.linalg as SPLA
+    import scipy.sparse.csgraph as SPCG
+except ImportError:
+    SP = None
+    SPLA = None
+    SPCG = None
+    logger.warning( langStr('Scientific Python (scipy) package not present, sparse solver not available', 'Balík Scientific Python (scipy) nenalezen, řídký řešič není k dispozici') )
+
 
 def keyExists(instances, key):
     """Checks whether a key exists in a dictionary or in a list of dictionaries
@@ -191,6 +205,9 @@ class Material:
         self.g = g
         self.alpha = alpha
         self.d = d
+        if self.domain:
+            for elem in self.domain.giveElementsWithMat(self):
+                elem.invalidateMatrixKey()
         if label!=self.label or domain is not self.domain:
             if self.domain:
                 self.domain.materials.pop(self.label,None)
@@ -306,6 +323,9 @@ class CrossSection:
         self.h = h
         self.k = k
         self.j = j
+        if self.domain:
+            for elem in self.domain.giveElementsWithCS(self):
+                elem.invalidateMatrixKey()
         if label!=self.label or domain is not self.domain:
             if self.domain:
                 self.domain.crossSects.pop(self.label,None)
@@ -375,6 +395,9 @@ class Node:
                     return 1
         self.coords = [float(coord) for coord in coords]                     if coords is not None else self.coords if self.coords is not None else [0., 0., 0.]
         self.bcs    = dict( (key,bool(val)) for key,val in bcs.items() ) if bcs    is not None else self.bcs    if self.bcs    is not None else {'x':False,'z':False,'Y':False}
+        if coords is not None and self.domain:
+            for elem in self.domain.giveElementsWithNode(self):
+                elem.invalidateMatrixKey()
         if label!=self.label or domain is not self.domain:
             if self.domain:
                 self.domain.nodes.pop(self.label,None)
@@ -433,6 +456,79 @@ class Node:
         return self.label
 
 
+class ElementMatrixCache:
+    """Bounded LRU cache of read-only element matrices shared by elements with equal keys (see :py:meth:`Element.giveMatrixKey`)
+    
+    :param int maxSize: maximum number of stored keys
+    """
+
+    maxSize = 2000
+    """*(int)* maximum number of stored keys, the least recently used ones are dropped"""
+    digits = 12
+    """*(int)* number of significant digits the key values are rounded to"""
+    hits = 0
+    """*(int)* number of successful lookups"""
+    misses = 0
+    """*(int)* number of lookups which required evaluation"""
+
+    def __init__(self, maxSize=2000):
+        self.maxSize = maxSize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def roundValue(self, value):
+        """Returns value rounded to self.digits significant digits
+        
+        :param float value: value to be rounded
+        :rtype: float
+        """
+        return float('%.*g' % (self.digits, value))
+
+    def give(self, key, name, func):
+        """Returns cached matrix (or tuple of matrices) of given name, evaluates and stores it by func() if not present
+        
+        :param tuple key: key of element (see :py:meth:`Element.giveMatrixKey`)
+        :param str name: name of the matrix (e.g. 'kl' for local stiffness, 't' for transformation matrix)
+        :param function func: function evaluating the matrix
+        :rtype: np.array(2d) | tuple
+        """
+        entry = self.data.get(key)
+        if entry is None:
+            entry = self.data[key] = {}
+            if len(self.data) > self.maxSize:
+                self.data.popitem(last=False)
+        else:
+            self.data.move_to_end(key)
+        if name in entry:
+            self.hits += 1
+            return entry[name]
+        self.misses += 1
+        val = func()
+        for v in (val if isinstance(val,tuple) else (val,)):
+            if isinstance(v,ndarray):
+                v.setflags(write=False)
+        entry[name] = val
+        return val
+
+    def giveStats(self):
+        """Returns dictionary with number of hits, misses, stored keys and hit ratio
+        
+        :rtype: dict
+        """
+        n = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses, size=len(self.data), ratio=float(self.hits)/n if n else 0.)
+
+    def clear(self):
+        """Clears receiver including its counters"""
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+
+elementMatrixCache = ElementMatrixCache()
+"""*(ElementMatrixCache)* cache of element matrices shared by all elements"""
+
+
 class Element:
     """A class representing Finite Element
     
@@ -453,6 +549,8 @@ class Element:
     """*(Material)* material"""
     cs = None
     """*(CrossSection)* cross section"""
+    matrixKey = None
+    """*(tuple)* memoized key of receiver's matrices in :py:data:`elementMatrixCache`, None if not evaluated yet"""
 
     def __init__(self, label='element', nodes=None, mat=None, cs=None, domain=None):
         self.domain = domain
@@ -577,8 +675,37 @@ class Element:
             logger.info( langStr('Element %s renamed to %s','Prvek %s přejmenován na %s') % (self.label, label) )
         self.label = label
         self.domain = domain
+        self.invalidateMatrixKey()
         return 0
 
+    def giveMatrixKey(self):
+        """Returns key identifying matrices of receiver in :py:data:`elementMatrixCache`, rounded tuple (class, l, c, s, E, G, A, Iy, k, J, hinges)
+        
+        :rtype: tuple
+        """
+        # the key is memoized until receiver, its nodes, material or cross section are changed
+        if self.matrixKey is None:
+            l,d1,d2 = self.computeGeom()
+            mat,cs = self.mat,self.cs
+            hinges = tuple(bool(h) for h in getattr(self,'hinges',None) or ())
+            values = (l, d1/l, d2/l, mat.e, mat.g, cs.a, cs.iy, cs.k, cs.j)
+            self.matrixKey = (self.__class__.__name__,) + tuple(elementMatrixCache.roundValue(v) for v in values) + (hinges,)
+        return self.matrixKey
+
+    def invalidateMatrixKey(self):
+        """Forgets memoized key of receiver's matrices (see :py:meth:`giveMatrixKey`)"""
+        self.matrixKey = None
+
+    def giveCondensationOperators(self):
+        """Returns indices a (retained DOFs) and b (condensed DOFs), kab and inverse of kbb of local stiffness matrix of hinged receiver
+        
+        :rtype: ([int],[int],np.array(2d),np.array(2d))
+        """
+        def evaluate():
+            k,a,b,kaa,kab,kbb = self.computeLocalStiffness(retCondenseSubMats=True)
+            return a,b,kab,linalg.inv(kbb)
+        return elementMatrixCache.give(self.giveMatrixKey(), 'cond', evaluate)
+
     def giveLocationArray(self):
         """Return element code numbers"""
         loc = []
@@ -649,13 +776,10 @@ class Beam2d(Element):
             for load in self.domain.giveElementLoadsOnElement(self,onlyActiveLC=True):
                 vxTmp, vzTmp = load.giveFxFzElemProjection(type=self.domain.type)
                 fzloc += -s*vxTmp + c*vzTmp
-        wret = [0. for i in range(nseg+1)]
-        uret = [0. for i in range(nseg+1)]
+        # components from end displacements
+        uret,wret = dot(beam2dShapeFunctionsKernel(linspace(0.,1.,nseg+1),l),rl).T.tolist()
         for i in range(nseg+1):
             xl = float(i)/float(nseg) #runs 0..1
-            # components from end displacements
-            wret[i] = (1.0-3.0*xl*xl+2.0*xl*xl*xl)*rl[1]+l*(-xl+2.0*xl*xl-xl*xl*xl)*rl[2]+(3.0*xl*xl-2.0*xl*xl*xl)*rl[4]+l*(xl*xl-xl*xl*xl)*rl[5]
-            uret[i] = (1.-xl)*rl[0]+xl*rl[3]
             # components from distributed load
             wret[i] += fzloc*l*l*l*l * (xl*xl*xl*xl/24.-xl*xl*xl/12.+xl*xl/24.)/(self.mat.e*self.cs.iy)
             
@@ -814,6 +938,8 @@ class Beam2d(Element):
         :param bool retCondenseSubMats: if true, also statically condensed submatrices (kaa,kab,kbb) with corresponding indices arrays a and b are returned
         :rtype: np.array(2d) | (np.array(2d),[int],[int],np.array(2d),np.array(2d),np.array(2d))
         """
+        if l is None and ea is None and eiy is None:
+            return elementMatrixCache.give(self.giveMatrixKey(), 'klsub' if retCondenseSubMats else 'kl', lambda: self.computeLocalStiffness(self.computeLength(), self.mat.e*self.cs.a, self.mat.e*self.cs.iy, retCondenseSubMats))
         if l is None:
             l = self.computeLength()
         if ea is None:
@@ -902,14 +1028,14 @@ class Beam2d(Element):
         # static condensation if some ends are hinges
         # a=nonzero force value, b=zero force(moment) value
         if self.hasHinges():
-            (k,a,b,kaa,kab,kbb) = self.computeLocalStiffness (retCondenseSubMats=True)
+            a,b,kab,kbbi = self.giveCondensationOperators()
             t=zeros((6, len(a)))
             
             t[ix_(a),0:len(a)]=identity(len(a))
             #print "t:",t
             #print (-1)*dot(linalg.inv(kbb),kab.transpose())
             #print "ti",t[ix_(b),:] 
-            t[ix_(b),:]= (-1)*dot(linalg.inv(kbb),kab.transpose())
+            t[ix_(b),:]= (-1)*dot(kbbi,kab.transpose())
             #print "t:",t
             k2 = dot(t.transpose(),dot(answer,t))
             answer = zeros((6,6))
@@ -925,6 +1051,8 @@ class Beam2d(Element):
         :param float dz: precomputed dz
         :rtype: np.array(2d)
         """
+        if l is None and dx is None and dz is None:
+            return elementMatrixCache.give(self.giveMatrixKey(), 't', lambda: self.computeT(*self.computeGeom()))
         if l is None or dx is None or dz is None:
             l,dx,dz = self.computeGeom()
         c=dx/l
@@ -942,24 +1070,21 @@ class Beam2d(Element):
         
         :rtype: np.array(2d)
         """
-        l,dx,dz = self.computeGeom()
-        ea = self.mat.e*self.cs.a
-        eiy = self.mat.e*self.cs.iy
-        #
-        kl = self.computeLocalStiffness(l,ea,eiy)
-        t  = self.computeT(l,dx,dz)
-        k  = dot(dot(t.transpose(), kl), t)
-        return k
+        def evaluate():
+            kl = self.computeLocalStiffness()
+            t  = self.computeT()
+            return dot(dot(t.transpose(), kl), t)
+        return elementMatrixCache.give(self.giveMatrixKey(), 'k', evaluate)
  
     def computeInitialStressMatrix (self, N):
         """Compute element global stiffness matrix
         
         :rtype: np.array(2d)
         """
-        l,dx,dz = self.computeGeom()
+        l = self.computeLength()
         #
         kl = self.computeLocalInitialStressMatrix(l,N)
-        t  = self.computeT(l,dx,dz)
+        t  = self.computeT()
         k  = dot(dot(t.transpose(), kl), t)
         return k
          
@@ -969,24 +1094,19 @@ class Beam2d(Element):
         :param np.array(1d) r: global strucutre vector of nodal displacements
         :rtype: ( np.array(1d), np.array(1d) )
         """
-        l,dx,dz = self.computeGeom()
-        ea = self.mat.e*self.cs.a
-        eiy = self.mat.e*self.cs.iy
-        t = self.computeT(l,dx,dz)
+        t = self.computeT()
         loc = self.giveLocationArray()
         re = dot(t,r[loc])
-        if self.hasHinges():
-            kl,a,b,kaa,kab,kbb=self.computeLocalStiffness(l,ea,eiy,True)
-        else:
-            kl = self.computeLocalStiffness(l,ea,eiy)
+        kl = self.computeLocalStiffness()
         fe = dot(kl, re)
         bl = zeros(6)
         #blcc = zeros(6)
         for load in self.domain.giveElementLoadsOnElement(self,onlyActiveLC=True):
             bl += load.giveLoadVectorForDoublyClampedBeam(type='beam2d')
         if self.hasHinges():
-            re[ix_(b)] = dot(linalg.inv(kbb), -bl[ix_(b)] - dot(kab.transpose(), re[ix_(a)] ) )
-            fe[ix_(a)] += bl[ix_(a)] - dot(dot(kab,linalg.inv(kbb)),bl[ix_(b)])
+            a,b,kab,kbbi = self.giveCondensationOperators()
+            re[ix_(b)] = dot(kbbi, -bl[ix_(b)] - dot(kab.transpose(), re[ix_(a)] ) )
+            fe[ix_(a)] += bl[ix_(a)] - dot(kab,dot(kbbi,bl[ix_(b)]))
         else:
             fe += bl
         return fe,re
@@ -1058,6 +1178,7 @@ class Beam2d(Element):
             return 1
         if hinges:
             self.hinges = hinges
+            self.invalidateMatrixKey()
         return 0
 
 
@@ -1113,6 +1234,8 @@ class BeamGrid2d(Element):
         :param bool retCondenseSubMats: if true, also statically condensed submatrices (kaa,kab,kbb) with corresponding indices arrays a and b are returned
         :rtype: np.array(2d) | (np.array(2d),[int],[int],np.array(2d),np.array(2d),np.array(2d))
         """
+        if l is None and gj is None and eiy is None:
+            return elementMatrixCache.give(self.giveMatrixKey(), 'klsub' if retCondenseSubMats else 'kl', lambda: self.computeLocalStiffness(self.computeLength(), self.mat.g*self.cs.j, self.mat.e*self.cs.iy, retCondenseSubMats))
         if l is None:
             l = self.computeLength()
         if gj is None:
@@ -1163,6 +1286,8 @@ class BeamGrid2d(Element):
         :param float dz: precomputed dz
         :rtype: np.array(2d)
         """
+        if l is None and dx is None and dy is None:
+            return elementMatrixCache.give(self.giveMatrixKey(), 't', lambda: self.computeT(*self.computeGeom()))
         if l is None or dx is None or dy is None:
             l,dx,dy = self.computeGeom()
         c=dx/l
@@ -1181,14 +1306,11 @@ class BeamGrid2d(Element):
         
         :rtype: np.array(2d)
         """
-        l,dx,dy = self.computeGeom()
-        gj = self.mat.g*self.cs.j
-        eiy = self.mat.e*self.cs.iy
-        #
-        kl = self.computeLocalStiffness(l,gj,eiy)
-        t  = self.computeT(l,dx,dy)
-        k  = dot(dot(t.transpose(), kl), t)
-        return k
+        def evaluate():
+            kl = self.computeLocalStiffness()
+            t  = self.computeT()
+            return dot(dot(t.transpose(), kl), t)
+        return elementMatrixCache.give(self.giveMatrixKey(), 'k', evaluate)
  
     def computeInitialStressMatrix (self, N):
         raise NotImplementedError
@@ -1199,16 +1321,13 @@ class BeamGrid2d(Element):
         :param np.array(1d) r: global strucutre vector of nodal displacements
         :rtype: ( np.array(1d), np.array(1d) )
         """
-        l,dx,dz = self.computeGeom()
-        gj = self.mat.g*self.cs.j
-        eiy = self.mat.e*self.cs.iy
-        t = self.computeT(l,dx,dz)
+        t = self.computeT()
         loc = self.giveLocationArray()
         re = dot(t,r[loc])
         if self.hasHinges():
             raise NotImplementedError # TODO check?
         else:
-            kl = self.computeLocalStiffness(l,gj,eiy)
+            kl = self.computeLocalStiffness()
         fe = dot(kl, re)
         bl = zeros(6)
         #blcc = zeros(6)
@@ -1287,12 +1406,949 @@ class BeamGrid2d(Element):
             return 1
         if hinges:
             self.hinges = hinges
+            self.invalidateMatrixKey()
         return 0
 
 
 
 
 
+def beam2dLocalStiffnessKernel(l, ea, eiy, fi):
+    """Batched local stiffness matrices of Timoshenko 2D beams (without condensation), see :py:meth:`Beam2d.computeLocalStiffness`
+    
+    :param np.array l: lengths of elements
+    :param np.array ea: axial stiffnesses E*A
+    :param np.array eiy: bending stiffnesses E*Iy
+    :param np.array fi: Timoshenko's shear parameters 12*E*Iy/(k*G*A*l^2)
+    :rtype: np.array(3d)
+    """
+    n = len(l)
+    fi1 = 1.+fi
+    a = ea/l
+    b = 12.*eiy/(l*l*l)/fi1
+    c = 6.*eiy/(l*l)/fi1
+    d = (4.+fi)*eiy/l/fi1
+    e = (2.-fi)*eiy/l/fi1
+    k = zeros((n,6,6))
+    k[:,0,0] = k[:,3,3] = a
+    k[:,0,3] = k[:,3,0] = -a
+    k[:,1,1] = k[:,4,4] = b
+    k[:,1,4] = k[:,4,1] = -b
+    k[:,1,2] = k[:,2,1] = k[:,1,5] = k[:,5,1] = -c
+    k[:,2,4] = k[:,4,2] = k[:,4,5] = k[:,5,4] = c
+    k[:,2,2] = k[:,5,5] = d
+    k[:,2,5] = k[:,5,2] = e
+    return k
+
+def beamGrid2dLocalStiffnessKernel(l, gj, eiy):
+    """Batched local stiffness matrices of grid beams (without condensation), see :py:meth:`BeamGrid2d.computeLocalStiffness`
+    
+    :param np.array l: lengths of elements
+    :param np.array gj: torsional stiffnesses G*J
+    :param np.array eiy: bending stiffnesses E*Iy
+    :rtype: np.array(3d)
+    """
+    n = len(l)
+    a = gj/l
+    b = 12.*eiy/(l*l*l)
+    c = 6.*eiy/(l*l)
+    d = 4.*eiy/l
+    e = 2.*eiy/l
+    k = zeros((n,6,6))
+    k[:,1,1] = k[:,4,4] = a
+    k[:,1,4] = k[:,4,1] = -a
+    k[:,0,0] = k[:,3,3] = b
+    k[:,0,3] = k[:,3,0] = -b
+    k[:,0,2] = k[:,2,0] = k[:,0,5] = k[:,5,0] = -c
+    k[:,2,3] = k[:,3,2] = k[:,3,5] = k[:,5,3] = c
+    k[:,2,2] = k[:,5,5] = d
+    k[:,2,5] = k[:,5,2] = e
+    return k
+
+def beam2dLocalInitialStressKernel(l, fi, n):
+    """Batched local initial stress matrices of 2D beams without condensation and axial regularization, see :py:meth:`Beam2d.computeLocalInitialStressMatrix`
+    
+    :param np.array l: lengths of elements
+    :param np.array fi: Timoshenko's shear parameters (see :py:meth:`Beam2dStack.computeFi`)
+    :param np.array n: normal forces (positive in tension)
+    :rtype: np.array(3d)
+    """
+    l2 = l*l
+    fi2 = fi*fi
+    c = n/l/((1.+fi)*(1.+fi))
+    a = c*(6./5.+2.*fi+fi2)
+    b = c*l/10.
+    d = c*l2*(2./15.+fi/6.+fi2/12.)
+    e = -c*l2*(1./30.+fi/6.+fi2/12.)
+    k = zeros((len(l),6,6))
+    k[:,1,1] = k[:,4,4] = a
+    k[:,1,4] = k[:,4,1] = -a
+    k[:,1,2] = k[:,2,1] = k[:,1,5] = k[:,5,1] = -b
+    k[:,2,4] = k[:,4,2] = k[:,4,5] = k[:,5,4] = b
+    k[:,2,2] = k[:,5,5] = d
+    k[:,2,5] = k[:,5,2] = e
+    return k
+
+def beam2dLocalMassKernel(l, rhoa, lumped=False):
+    """Batched local mass matrices of 2D beams (without condensation) neglecting rotary inertia
+    
+    :param np.array l: lengths of elements
+    :param np.array rhoa: masses per unit length d*A
+    :param bool lumped: if True, lumped matrices are returned, consistent ones otherwise
+    :rtype: np.array(3d)
+    """
+    n = len(l)
+    m = zeros((n,6,6))
+    ml = rhoa*l
+    if lumped:
+        # half of mass of element in translational DOFs of each node
+        for i in (0,1,3,4):
+            m[:,i,i] = 0.5*ml
+        return m
+    # linear (axial) and cubic Hermitean (bending) shape functions
+    a = ml/420.
+    m[:,0,0] = m[:,3,3] = ml/3.
+    m[:,0,3] = m[:,3,0] = ml/6.
+    m[:,1,1] = m[:,4,4] = 156.*a
+    m[:,1,4] = m[:,4,1] = 54.*a
+    # rotations are opposite to derivatives of deflections, see beam2dLocalStiffnessKernel
+    m[:,1,2] = m[:,2,1] = -22.*a*l
+    m[:,4,5] = m[:,5,4] = 22.*a*l
+    m[:,1,5] = m[:,5,1] = 13.*a*l
+    m[:,2,4] = m[:,4,2] = -13.*a*l
+    m[:,2,2] = m[:,5,5] = 4.*a*l*l
+    m[:,2,5] = m[:,5,2] = -3.*a*l*l
+    return m
+
+def beamGrid2dLocalMassKernel(l, rhoa, rhoip, lumped=False):
+    """Batched local mass matrices of grid beams (without condensation), bending part is the same as in :py:func:`beam2dLocalMassKernel`, torsional part uses linear shape functions
+    
+    :param np.array l: lengths of elements
+    :param np.array rhoa: masses per unit length d*A
+    :param np.array rhoip: torsional mass moments of inertia per unit length d*(Iy+Iz)
+    :param bool lumped: if True, lumped matrices are returned, consistent ones otherwise
+    :rtype: np.array(3d)
+    """
+    m2 = beam2dLocalMassKernel(l, rhoa, lumped)
+    m = zeros_like(m2)
+    # bending DOFs of grid beam (w,fiy) correspond to beam2d DOFs (w,fi)
+    b = array([0,2,3,5])
+    m[:,b[:,newaxis],b] = m2[:,[1,2,4,5]][:,:,[1,2,4,5]]
+    mt = rhoip*l
+    if lumped:
+        m[:,1,1] = m[:,4,4] = 0.5*mt
+    else:
+        m[:,1,1] = m[:,4,4] = mt/3.
+        m[:,1,4] = m[:,4,1] = mt/6.
+    return m
+
+def condenseKernel(k, hinges, dofs, f=None):
+    """Batched static condensation of DOFs released by hinges
+    
+    :param np.array(3d) k: (nelem,6,6) stack of local matrices
+    :param np.array(2d) hinges: (nelem,2) bool array of hinge flags
+    :param ([int],[int]) dofs: local DOFs released by hinge at the first and at the second end
+    :param np.array f: (nelem,6) or (nelem,6,nrhs) stack of local end forces (load vectors) condensed together with k
+    :rtype: np.array(3d) | (np.array(3d), np.array)
+    """
+    k = k.copy()
+    if f is not None:
+        f = f.copy()
+        f3 = f.reshape(f.shape[0],f.shape[1],-1)
+    for end in (0,1):
+        sel = nonzero(hinges[:,end])[0]
+        if len(sel) == 0:
+            continue
+        for b in dofs[end]:
+            # rank-one update k - k[:,b]*k[b,:]/k[b,b] equal to kaa - kab*kbb^-1*kba, zero pivots (e.g. both torsional DOFs of grid beam released) are skipped
+            ks = k[sel]
+            kbb = ks[:,b,b]
+            ok = abs(kbb) > 1.e-12*abs(ks.diagonal(axis1=1,axis2=2)).max(axis=1)
+            sel2 = sel[ok]
+            ks = ks[ok]
+            kb = ks[:,:,b]
+            kbb = kbb[ok]
+            k[sel2] = ks - kb[:,:,newaxis]*kb[:,newaxis,:]/kbb[:,newaxis,newaxis]
+            k[sel2,b,:] = 0.
+            k[sel2,:,b] = 0.
+            if f is not None:
+                fs = f3[sel2]
+                f3[sel2] = fs - kb[:,:,newaxis]*(fs[:,b,:]/kbb[:,newaxis])[:,newaxis,:]
+                f3[sel2,b,:] = 0.
+    if f is not None:
+        return k,f
+    return k
+
+def condenseDerivativeKernel(k, dk, hinges, dofs, f=None, df=None):
+    """Batched derivatives of statically condensed matrices and load vectors, see :py:func:`condenseKernel`
+    
+    :param np.array(3d) k: (nelem,6,6) stack of local matrices
+    :param np.array(3d) dk: (nelem,6,6) stack of derivatives of local matrices
+    :param np.array(2d) hinges: (nelem,2) bool array of hinge flags
+    :param ([int],[int]) dofs: local DOFs released by hinge at the first and at the second end
+    :param np.array f: (nelem,6) or (nelem,6,nrhs) stack of local end forces
+    :param np.array df: derivatives of f
+    :rtype: np.array(3d) | (np.array(3d), np.array)
+    """
+    k = k.copy()
+    dk = dk.copy()
+    if f is not None:
+        df = df.copy()
+        f3 = f.copy().reshape(f.shape[0],f.shape[1],-1)
+        df3 = df.reshape(f3.shape)
+    for end in (0,1):
+        sel = nonzero(hinges[:,end])[0]
+        if len(sel) == 0:
+            continue
+        for b in dofs[end]:
+            ks = k[sel]
+            kbb = ks[:,b,b]
+            ok = abs(kbb) > 1.e-12*abs(ks.diagonal(axis1=1,axis2=2)).max(axis=1)
+            sel2 = sel[ok]
+            ks,dks = ks[ok],dk[sel2]
+            kb,dkb = ks[:,:,b],dks[:,:,b]
+            kbb,dkbb = kbb[ok,newaxis],dks[:,b,b,newaxis]
+            # derivative of each rank-one update is propagated together with the update
+            k[sel2] = ks - kb[:,:,newaxis]*kb[:,newaxis,:]/kbb[:,:,newaxis]
+            dk[sel2] = dks - (dkb[:,:,newaxis]*kb[:,newaxis,:]+kb[:,:,newaxis]*dkb[:,newaxis,:])/kbb[:,:,newaxis] + kb[:,:,newaxis]*kb[:,newaxis,:]*(dkbb/(kbb*kbb))[:,:,newaxis]
+            k[sel2,b,:] = k[sel2,:,b] = 0.
+            dk[sel2,b,:] = dk[sel2,:,b] = 0.
+            if f is not None:
+                fs,dfs = f3[sel2],df3[sel2]
+                fb,dfb = fs[:,b,:]/kbb,dfs[:,b,:]/kbb
+                f3[sel2] = fs - kb[:,:,newaxis]*fb[:,newaxis,:]
+                df3[sel2] = dfs - dkb[:,:,newaxis]*fb[:,newaxis,:] - kb[:,:,newaxis]*(dfb - fb*dkbb/kbb)[:,newaxis,:]
+                f3[sel2,b,:] = df3[sel2,b,:] = 0.
+    if f is not None:
+        return dk,df
+    return dk
+
+def condenseMassKernel(k, m, hinges, dofs):
+    """Batched condensation of mass matrices consistent with static condensation of stiffness matrices, see :py:func:`condenseKernel`
+    
+    :param np.array(3d) k: (nelem,6,6) stack of local stiffness matrices (without condensation)
+    :param np.array(3d) m: (nelem,6,6) stack of local mass matrices
+    :param np.array(2d) hinges: (nelem,2) bool array of hinge flags
+    :param ([int],[int]) dofs: local DOFs released by hinge at the first and at the second end
+    :rtype: np.array(3d)
+    """
+    k = k.copy()
+    m = m.copy()
+    for end in (0,1):
+        sel = nonzero(hinges[:,end])[0]
+        if len(sel) == 0:
+            continue
+        for b in dofs[end]:
+            ks = k[sel]
+            kbb = ks[:,b,b]
+            ok = abs(kbb) > 1.e-12*abs(ks.diagonal(axis1=1,axis2=2)).max(axis=1)
+            sel2 = sel[ok]
+            ks = ks[ok]
+            kb = ks[:,:,b]
+            # released DOF follows the others as u[b] = t*u, m is transformed by P^T*m*P, P is unit matrix with row b replaced by t
+            t = -kb/kbb[ok,newaxis]
+            t[:,b] = 0.
+            ms = m[sel2]
+            ms = ms + ms[:,:,b,newaxis]*t[:,newaxis,:]
+            ms = ms + t[:,:,newaxis]*ms[:,b,newaxis,:]
+            ms[:,b,:] = ms[:,:,b] = 0.
+            m[sel2] = ms
+            k[sel2] = ks - kb[:,:,newaxis]*kb[:,newaxis,:]/kbb[ok,newaxis,newaxis]
+            k[sel2,b,:] = k[sel2,:,b] = 0.
+    return m
+
+def beam2dLocalStiffnessDerivativeKernel(l, ea, eiy, fi, dea, deiy, dfi):
+    """Batched derivatives of local stiffness matrices of Timoshenko 2D beams (without condensation), see :py:func:`beam2dLocalStiffnessKernel`
+    
+    :param np.array l: lengths of elements
+    :param np.array ea: axial stiffnesses E*A
+    :param np.array eiy: bending stiffnesses E*Iy
+    :param np.array fi: Timoshenko's shear parameters 12*E*Iy/(k*G*A*l^2)
+    :param np.array dea: derivatives of ea
+    :param np.array deiy: derivatives of eiy
+    :param np.array dfi: derivatives of fi
+    :rtype: np.array(3d)
+    """
+    n = len(l)
+    fi1 = 1.+fi
+    dw = (deiy - eiy*dfi/fi1)/fi1 # derivative of eiy/(1+fi)
+    a = dea/l
+    b = 12.*dw/(l*l*l)
+    c = 6.*dw/(l*l)
+    d = ((4.+fi)*deiy/fi1 - 3.*eiy*dfi/(fi1*fi1))/l
+    e = ((2.-fi)*deiy/fi1 - 3.*eiy*dfi/(fi1*fi1))/l
+    k = zeros((n,6,6))
+    k[:,0,0] = k[:,3,3] = a
+    k[:,0,3] = k[:,3,0] = -a
+    k[:,1,1] = k[:,4,4] = b
+    k[:,1,4] = k[:,4,1] = -b
+    k[:,1,2] = k[:,2,1] = k[:,1,5] = k[:,5,1] = -c
+    k[:,2,4] = k[:,4,2] = k[:,4,5] = k[:,5,4] = c
+    k[:,2,2] = k[:,5,5] = d
+    k[:,2,5] = k[:,5,2] = e
+    return k
+
+def beam2dTransformationKernel(c, s):
+    """Batched transformation matrices from global to local cs of 2D beams, see :py:meth:`Beam2d.computeT`
+    
+    :param np.array c: cosines of elements' directions
+    :param np.array s: sines of elements' directions
+    :rtype: np.array(3d)
+    """
+    t = zeros((len(c),6,6))
+    for i in (0,3):
+        t[:,i,i] = t[:,i+1,i+1] = c
+        t[:,i,i+1] = s
+        t[:,i+1,i] = -s
+        t[:,i+2,i+2] = 1.
+    return t
+
+def beamGrid2dTransformationKernel(c, s):
+    """Batched transformation matrices from global to local cs of grid beams, see :py:meth:`BeamGrid2d.computeT`
+    
+    :param np.array c: cosines of elements' directions
+    :param np.array s: sines of elements' directions
+    :rtype: np.array(3d)
+    """
+    t = zeros((len(c),6,6))
+    for i in (0,3):
+        t[:,i,i] = 1.
+        t[:,i+1,i+1] = t[:,i+2,i+2] = c
+        t[:,i+1,i+2] = s
+        t[:,i+2,i+1] = -s
+    return t
+
+def transformKernel(k, t):
+    """Batched transformation t^T*k*t of stacked matrices
+    
+    :param np.array(3d) k: (nelem,6,6) stack of local matrices
+    :param np.array(3d) t: (nelem,6,6) stack of transformation matrices
+    :rtype: np.array(3d)
+    """
+    return matmul(matmul(t.transpose(0,2,1), k), t)
+
+def beam2dStiffnessKernel(l, c, s, ea, eiy, fi, hinges):
+    """Batched global stiffness matrices of 2D beams including static condensation of hinges
+    
+    :param np.array l: lengths of elements
+    :param np.array c: cosines of elements' directions
+    :param np.array s: sines of elements' directions
+    :param np.array ea: axial stiffnesses E*A
+    :param np.array eiy: bending stiffnesses E*Iy
+    :param np.array fi: Timoshenko's shear parameters 12*E*Iy/(k*G*A*l^2)
+    :param np.array(2d) hinges: (nelem,2) bool array of hinge flags
+    :rtype: np.array(3d)
+    """
+    k = condenseKernel(beam2dLocalStiffnessKernel(l,ea,eiy,fi), hinges, Beam2dStack.hingeDofs)
+    return transformKernel(k, beam2dTransformationKernel(c,s))
+
+def beamGrid2dStiffnessKernel(l, c, s, gj, eiy, hinges):
+    """Batched global stiffness matrices of grid beams including static condensation of hinges
+    
+    :param np.array l: lengths of elements
+    :param np.array c: cosines of elements' directions
+    :param np.array s: sines of elements' directions
+    :param np.array gj: torsional stiffnesses G*J
+    :param np.array eiy: bending stiffnesses E*Iy
+    :param np.array(2d) hinges: (nelem,2) bool array of hinge flags
+    :rtype: np.array(3d)
+    """
+    k = condenseKernel(beamGrid2dLocalStiffnessKernel(l,gj,eiy), hinges, BeamGrid2dStack.hingeDofs)
+    return transformKernel(k, beamGrid2dTransformationKernel(c,s))
+
+def beam2dUniformLoadKernel(l, qx, qz):
+    """Batched end forces of doubly clamped 2D beams due to uniform load, see :py:meth:`ElementLoad.giveLoadVectorForDoublyClampedBeam`
+    
+    :param np.array l: lengths of elements
+    :param np.array qx: load intensities in local x direction
+    :param np.array qz: load intensities in local z direction
+    :rtype: np.array(2d)
+    """
+    f = zeros((len(l),6))
+    f[:,0] = f[:,3] = -0.5*l*qx
+    f[:,1] = f[:,4] = -0.5*l*qz
+    f[:,2] = 1/12.*qz*l*l
+    f[:,5] = -f[:,2]
+    return f
+
+def beam2dForceLoadKernel(l, a, px, pz):
+    """Batched end forces of doubly clamped 2D beams due to point force, see :py:meth:`ElementLoad.giveLoadVectorForDoublyClampedBeam`
+    
+    :param np.array l: lengths of elements
+    :param np.array a: distances of forces from the first node
+    :param np.array px: forces in local x direction
+    :param np.array pz: forces in local z direction
+    :rtype: np.array(2d)
+    """
+    b = l-a
+    l2 = l*l
+    f = zeros((len(l),6))
+    f[:,0] = -b/l*px
+    f[:,1] = b/l*(a*(a-b)/l2-1.)*pz
+    f[:,2] = a*b*b/l2*pz
+    f[:,3] = -a/l*px
+    f[:,4] = a/l*(b*(b-a)/l2-1.)*pz
+    f[:,5] = -a*a*b/l2*pz
+    return f
+
+def beam2dForceDeflectionKernel(x, l, a, pz, eiy):
+    """Batched deflections of doubly clamped 2D beams due to point force, see :py:meth:`Beam2d.computeDefl`
+    
+    :param np.array(2d) x: (n,nst) distances of stations from the first node
+    :param np.array l: lengths of elements
+    :param np.array a: distances of forces from the first node
+    :param np.array pz: forces in local z direction
+    :param np.array eiy: bending stiffnesses E*Iy
+    :rtype: np.array(2d)
+    """
+    b = l-a
+    za = (b/l*(a*(a-b)/l/l-1.)*pz)[:,newaxis]
+    ma = (a*b*b/l/l*pz)[:,newaxis]
+    d = maximum(x-a[:,newaxis],0.)
+    return (za*x*x*x/6. + ma*x*x/2. + pz[:,newaxis]*d*d*d/6.)/eiy[:,newaxis]
+
+def beam2dShapeFunctionsKernel(xl, l):
+    """Batched shape functions N of 2D beams, u = dot(N[...,0,:],rl) and w = dot(N[...,1,:],rl) for local end displacements rl, see :py:meth:`Beam2d.computeDefl`
+    
+    :param np.array xl: relative positions of points (0..1)
+    :param np.array l: lengths of elements (broadcastable to xl)
+    :rtype: np.array
+    """
+    xl = asarray(xl, dtype=float)
+    l = asarray(l, dtype=float)*ones(xl.shape)
+    xl2 = xl*xl
+    xl3 = xl2*xl
+    n = zeros(xl.shape+(2,6))
+    n[...,0,0] = 1.-xl
+    n[...,0,3] = xl
+    n[...,1,1] = 1.0-3.0*xl2+2.0*xl3
+    n[...,1,2] = l*(-xl+2.0*xl2-xl3)
+    n[...,1,4] = 3.0*xl2-2.0*xl3
+    n[...,1,5] = l*(xl2-xl3)
+    return n
+
+def beam2dTemperatureLoadKernel(n, m):
+    """Batched end forces of doubly clamped 2D beams due to temperature change, see :py:meth:`ElementLoad.giveLoadVectorForDoublyClampedBeam`
+    
+    :param np.array n: normal forces E*A*alpha*dTc
+    :param np.array m: bending moments E*Iy*alpha*dTg/h
+    :rtype: np.array(2d)
+    """
+    f = zeros((len(n),6))
+    f[:,0] = n
+    f[:,2] = m
+    f[:,3] = -n
+    f[:,5] = -m
+    return f
+
+def beamGrid2dUniformLoadKernel(l, qz):
+    """Batched end forces of doubly clamped grid beams due to uniform load, see :py:meth:`ElementLoad.giveLoadVectorForDoublyClampedBeam`
+    
+    :param np.array l: lengths of elements
+    :param np.array qz: load intensities in z direction
+    :rtype: np.array(2d)
+    """
+    f = zeros((len(l),6))
+    f[:,0] = f[:,3] = -0.5*l*qz
+    f[:,2] = 1/12.*qz*l*l
+    f[:,5] = -f[:,2]
+    return f
+
+def giveUniformLoadProjections(loads, c, s):
+    """Returns global components (vx,vz) of uniform element loads, vectorized version of :py:meth:`ElementLoad.giveFxFzElemProjection`
+    
+    :param [ElementLoad] loads: element loads
+    :param np.array c: cosines of directions of loaded elements
+    :param np.array s: sines of directions of loaded elements
+    :rtype: (np.array,np.array)
+    """
+    mag = array([float(load.value.get('magnitude',0.)) for load in loads])
+    dirs = array([str(load.value.get('dir','')) for load in loads])
+    perX = array([load.value.get('perX') == 1 for load in loads], dtype=bool)
+    vx = where(dirs=='X', mag, 0.) + where(dirs=='Local X', mag*c, 0.) + where(dirs=='Local Z', -mag*s, 0.)
+    vz = where(dirs=='Z', mag, 0.) + where(dirs=='Local X', mag*s, 0.) + where(dirs=='Local Z', mag*c, 0.)
+    scale = where(perX, abs(c), 1.)
+    return vx*scale, vz*scale
+
+
+
+class ElementStack:
+    """Vectorized representation of list of elements of the same class processed by batched kernels, this base class falls back to per element methods
+    
+    :param [Element] elems: list of elements of the same class
+    """
+
+    elems = None
+    """*([Element])* elements of receiver"""
+    hingeDofs = ([],[])
+    """*([int],[int])* local DOFs released by hinge at the first and at the second end"""
+    loc = None
+    """*(np.array(2d))* (nelem,6) code numbers of elements, None if equations are not numbered"""
+    l = None
+    """*(np.array)* lengths"""
+    c = None
+    """*(np.array)* cosines of directions"""
+    s = None
+    """*(np.array)* sines of directions"""
+    e = None
+    """*(np.array)* Young's moduli"""
+    g = None
+    """*(np.array)* shear moduli"""
+    alpha = None
+    """*(np.array)* thermal dillatation coefficients"""
+    d = None
+    """*(np.array)* mass densities"""
+    a = None
+    """*(np.array)* areas"""
+    iy = None
+    """*(np.array)* moments of inertia"""
+    iz = None
+    """*(np.array)* moments of inertia with respect to z axis"""
+    h = None
+    """*(np.array)* heights"""
+    k = None
+    """*(np.array)* Timoshenko's shear coefficients"""
+    j = None
+    """*(np.array)* torsional stiffness moments"""
+    hinges = None
+    """*(np.array(2d))* (nelem,2) hinge flags"""
+    hasInternalForces = False
+    """*(bool)* True if receiver evaluates local element loads and internal forces, see :py:meth:`Beam2dStack.computeInternalForces`"""
+    hasInitialStress = False
+    """*(bool)* True if receiver evaluates local initial stress matrices, see :py:meth:`Beam2dStack.computeLocalInitialStress`"""
+
+    def __init__(self, elems):
+        self.elems = list(elems)
+        self.gatherData()
+
+    def gatherData(self):
+        """Gathers element data to arrays"""
+        elems = self.elems
+        n = len(elems)
+        if n and not [node for elem in elems for node in elem.nodes if node.loc is None]:
+            self.loc = array([elem.giveLocationArray() for elem in elems], dtype=int).reshape(n,-1)
+        mats = [elem.mat for elem in elems]
+        css = [elem.cs for elem in elems]
+        self.e = array([mat.e for mat in mats], dtype=float)
+        self.g = array([mat.g for mat in mats], dtype=float)
+        self.alpha = array([mat.alpha for mat in mats], dtype=float)
+        self.d = array([mat.d for mat in mats], dtype=float)
+        self.a = array([cs.a for cs in css], dtype=float)
+        self.iy = array([cs.iy for cs in css], dtype=float)
+        self.iz = array([cs.iz for cs in css], dtype=float)
+        self.h = array([cs.h for cs in css], dtype=float)
+        self.k = array([cs.k for cs in css], dtype=float)
+        self.j = array([cs.j for cs in css], dtype=float)
+        self.hinges = array([[bool(h) for h in elem.hinges] for elem in elems], dtype=bool).reshape(n,2)
+        self.gatherGeom()
+
+    def gatherGeom(self):
+        """Gathers lengths and direction cosines of elements"""
+        geom = array([elem.computeGeom() for elem in self.elems], dtype=float).reshape(len(self.elems),3)
+        self.l = geom[:,0]
+        self.c = geom[:,1]/self.l
+        self.s = geom[:,2]/self.l
+
+    def computeLocalStiffness(self, condense=True):
+        """Returns (nelem,6,6) stack of local stiffness matrices
+        
+        :param bool condense: if True, hinges are statically condensed
+        :rtype: np.array(3d)
+        """
+        return array([elem.computeLocalStiffness() for elem in self.elems]).reshape(len(self.elems),6,6)
+
+    def computeT(self):
+        """Returns (nelem,6,6) stack of transformation matrices from global to local cs
+        
+        :rtype: np.array(3d)
+        """
+        return array([elem.computeT() for elem in self.elems]).reshape(len(self.elems),6,6)
+
+    def computeStiffness(self):
+        """Returns (nelem,6,6) stack of global stiffness matrices
+        
+        :rtype: np.array(3d)
+        """
+        return transformKernel(self.computeLocalStiffness(), self.computeT())
+
+    def computeLocalMass(self, condense=True, lumped=False):
+        """Returns (nelem,6,6) stack of local mass matrices, see :py:meth:`Beam2dStack.computeLocalMass`"""
+        raise NotImplementedError
+
+    def computeInitialStress(self, n):
+        """Returns (nelem,6,6) stack of global initial stress matrices, available if :py:attr:`hasInitialStress`
+        
+        :param np.array n: normal forces of elements (positive in tension)
+        :rtype: np.array(3d)
+        """
+        return transformKernel(self.computeLocalInitialStress(n), self.computeT())
+
+    def computeMass(self, lumped=False):
+        """Returns (nelem,6,6) stack of global mass matrices
+        
+        :param bool lumped: if True, lumped mass matrices are returned, consistent ones otherwise
+        :rtype: np.array(3d)
+        """
+        return transformKernel(self.computeLocalMass(lumped=lumped), self.computeT())
+
+    def giveSampledCopy(self, values, nsample):
+        """Returns copy of receiver representing nsample realizations of its elements, element i of realization s has index s*nelem+i
+
+        :param dict values: (nsample,nelem) arrays of properties of realizations, e.g. {'e':...,'a':...}
+        :param int nsample: number of realizations
+        :rtype: ElementStack
+        """
+        ret = self.__class__.__new__(self.__class__)
+        ret.__dict__.update(self.__dict__)
+        ret.elems = self.elems*nsample
+        for key in ('loc','l','c','s','e','g','alpha','d','a','iy','iz','h','k','j','hinges'):
+            value = getattr(self,key)
+            if value is not None:
+                setattr(ret,key,tile(value,(nsample,)+(1,)*(value.ndim-1)))
+        for key,value in values.items():
+            # given properties are set, the other ones are repeated
+            setattr(ret,key,array(value,dtype=float).ravel())
+        return ret
+
+    def computeLoadVectors(self, loads, type=''):
+        """Returns code numbers and equivalent nodal loads in global cs of element loads, loads[i] acting on self.elems[i]
+        
+        :param [ElementLoad] loads: element loads
+        :param str type: domain type
+        :rtype: (np.array(2d),np.array(2d))
+        """
+        vals = [load.computeLoad(type) for load in loads]
+        n = len(loads)
+        return array([v[0] for v in vals], dtype=int).reshape(n,-1), array([v[1] for v in vals], dtype=float).reshape(n,-1)
+
+    def computeFixedEndForces(self, loads):
+        """Returns (nelem,6) local end forces of doubly clamped elements due to element loads, loads[i] acting on self.elems[i]
+        
+        :param [ElementLoad] loads: element loads
+        :rtype: np.array(2d)
+        """
+        return array([load.giveLoadVectorForDoublyClampedBeam(type=load.where.domain.type) for load in loads], dtype=float).reshape(len(loads),6)
+
+    def condenseFixedEndForces(self, f):
+        """Returns given local end forces of doubly clamped elements with DOFs released by hinges statically condensed
+        
+        :param np.array f: (nelem,6) or (nelem,6,nrhs) local end forces
+        :rtype: np.array
+        """
+        if self.hinges.any():
+            k,f = condenseKernel(self.computeLocalStiffness(condense=False), self.hinges, self.hingeDofs, f)
+        return f
+
+    def computeEndValues(self, r, f=None):
+        """Returns (nelem,6) local end forces and (nelem,6) local end displacements, vectorized version of :py:meth:`Beam2d.computeEndValues`
+
+        :param np.array r: displacements of all DOFs
+        :param np.array(2d) f: (nelem,6) local end forces of doubly clamped elements due to element loads (see :py:meth:`computeFixedEndForces`), no element loads if None
+        :rtype: (np.array(2d),np.array(2d))
+        """
+        nelem = len(self.elems)
+        f = zeros((nelem,6)) if f is None else f
+        re = einsum('nij,nj->ni', self.computeT(), asarray(r)[self.loc])
+        k = self.computeLocalStiffness(condense=False)
+        if self.hinges.any():
+            # displacements of released DOFs follow from equilibrium of uncondensed elements, one batched call for each hinge pattern
+            for pattern in set(map(tuple,self.hinges)):
+                b = [dof for end in (0,1) if pattern[end] for dof in self.hingeDofs[end]]
+                if not b:
+                    continue
+                sel = nonzero((self.hinges == array(pattern)).all(axis=1))[0]
+                a = [dof for dof in range(6) if dof not in b]
+                ks = k[sel]
+                kbb = ks[:,b][:,:,b]
+                rhs = -f[sel][:,b] - einsum('nij,nj->ni', ks[:,b][:,:,a], re[sel][:,a])
+                # pseudoinverse skips zero pivots like condenseKernel
+                re[ix_(sel,b)] = einsum('nij,nj->ni', linalg.pinv(kbb), rhs)
+        fe = einsum('nij,nj->ni', k, re) + f
+        return fe,re
+
+    def computeLocalStiffnessDerivative(self, variable, condense=True):
+        """Returns (nelem,6,6) derivatives of local stiffness matrices with respect to given property of elements, see :py:meth:`Beam2dStack.computeLocalStiffnessDerivative`"""
+        raise NotImplementedError
+
+    def computeFixedEndForceDerivative(self, loads, variable):
+        """Returns derivatives of local end forces of doubly clamped elements with respect to given property of elements, see :py:meth:`Beam2dStack.computeFixedEndForceDerivative`"""
+        raise NotImplementedError
+
+    def condenseFixedEndForceDerivative(self, f, df, variable):
+        """Returns derivatives of condensed local end forces (see :py:meth:`condenseFixedEndForces`) with respect to given property of elements
+        
+        :param np.array f: (nelem,6) or (nelem,6,nrhs) local end forces of doubly clamped elements
+        :param np.array df: derivatives of f
+        :param str variable: property of elements, see :py:meth:`Beam2dStack.giveStiffnessDerivatives`
+        :rtype: np.array
+        """
+        if self.hinges.any():
+            dk,df = condenseDerivativeKernel(self.computeLocalStiffness(condense=False), self.computeLocalStiffnessDerivative(variable,condense=False), self.hinges, self.hingeDofs, f, df)
+        return df
+
+    def condenseLoadVectors(self, f):
+        """Returns equivalent nodal loads in global cs of given (nelem,6) local end forces of doubly clamped elements. DOFs released by hinges are statically condensed
+        
+        :param np.array(2d) f: local end forces
+        :rtype: np.array(2d)
+        """
+        # minus, because end values are opposite than their influence on nodes
+        return -einsum('nji,nj->ni', self.computeT(), self.condenseFixedEndForces(f))
+
+
+class Beam2dStack(ElementStack):
+    """Vectorized representation of list of :py:class:`Beam2d` elements
+    
+    :param [Beam2d] elems: list of elements
+    """
+
+    hingeDofs = ([2],[5])
+    hasInternalForces = True
+    hasInitialStress = True
+
+    def gatherGeom(self):
+        coords = array([[elem.nodes[0].coords, elem.nodes[1].coords] for elem in self.elems], dtype=float).reshape(len(self.elems),2,3)
+        dx = coords[:,1,0]-coords[:,0,0]
+        dz = coords[:,1,2]-coords[:,0,2]
+        self.l = sqrt(dx*dx+dz*dz)
+        self.c = dx/self.l
+        self.s = dz/self.l
+
+    def computeFi(self):
+        """Returns Timoshenko's shear parameters 12*E*Iy/(k*G*A*l^2)
+        
+        :rtype: np.array
+        """
+        return 12.*self.e*self.iy/(self.k*self.g*self.a*self.l*self.l)
+
+    def computeLocalStiffness(self, condense=True):
+        k = beam2dLocalStiffnessKernel(self.l, self.e*self.a, self.e*self.iy, self.computeFi())
+        if condense:
+            k = condenseKernel(k, self.hinges, self.hingeDofs)
+        return k
+
+    def computeT(self):
+        return beam2dTransformationKernel(self.c, self.s)
+
+    def computeStiffness(self):
+        return beam2dStiffnessKernel(self.l, self.c, self.s, self.e*self.a, self.e*self.iy, self.computeFi(), self.hinges)
+
+    def computeLocalMass(self, condense=True, lumped=False):
+        """Returns (nelem,6,6) stack of local mass matrices (see :py:func:`beam2dLocalMassKernel`)
+        
+        :param bool condense: if True, DOFs released by hinges are condensed (see :py:func:`condenseMassKernel`)
+        :param bool lumped: if True, lumped mass matrices are returned, consistent ones otherwise
+        :rtype: np.array(3d)
+        """
+        m = beam2dLocalMassKernel(self.l, self.d*self.a, lumped)
+        if condense and self.hinges.any():
+            m = condenseMassKernel(self.computeLocalStiffness(condense=False), m, self.hinges, self.hingeDofs)
+        return m
+
+    def computeLocalInitialStress(self, n, condense=True):
+        """Returns (nelem,6,6) stack of local initial stress matrices (see :py:func:`beam2dLocalInitialStressKernel`)
+        
+        :param np.array n: normal forces of elements (positive in tension)
+        :param bool condense: if True, DOFs released by hinges are condensed by the same transformation as mass matrices (see :py:func:`condenseMassKernel`)
+        :rtype: np.array(3d)
+        """
+        k = beam2dLocalInitialStressKernel(self.l, self.computeFi(), n)
+        if condense and self.hinges.any():
+            k = condenseMassKernel(self.computeLocalStiffness(condense=False), k, self.hinges, self.hingeDofs)
+        return k
+
+    def computeFixedEndForces(self, loads):
+        """Returns (nelem,6) local end forces of doubly clamped beams due to element loads, loads[i] acting on self.elems[i]
+        
+        :param [ElementLoad] loads: element loads
+        :rtype: np.array(2d)
+        """
+        c,s = self.c,self.s
+        f = zeros((len(loads),6))
+        # each kernel is evaluated only for loads with nonzero corresponding values
+        vx,vz = giveUniformLoadProjections(loads, c, s)
+        sel = nonzero((vx!=0.)|(vz!=0.))[0]
+        if len(sel):
+            f[sel] += beam2dUniformLoadKernel(self.l[sel], c[sel]*vx[sel]+s[sel]*vz[sel], -s[sel]*vx[sel]+c[sel]*vz[sel])
+        fx,fz,a,dTc,dTg = array([[float(load.value.get(key,0.)) for key in ('Fx','Fz','DistF','dTc','dTg')] for load in loads]).reshape(len(loads),5).T
+        sel = nonzero((fx!=0.)|(fz!=0.))[0]
+        if len(sel):
+            f[sel] += beam2dForceLoadKernel(self.l[sel], a[sel], c[sel]*fx[sel]+s[sel]*fz[sel], -s[sel]*fx[sel]+c[sel]*fz[sel])
+        sel = nonzero((dTc!=0.)|(dTg!=0.))[0]
+        if len(sel):
+            ealpha = self.e[sel]*self.alpha[sel]
+            f[sel] += beam2dTemperatureLoadKernel(ealpha*self.a[sel]*dTc[sel], ealpha*self.iy[sel]*dTg[sel]/self.h[sel])
+        return f
+
+    def computeLoadVectors(self, loads, type=''):
+        return self.loc, self.condenseLoadVectors(self.computeFixedEndForces(loads))
+
+    def giveStiffnessDerivatives(self, variable):
+        """Returns derivatives of E*A, E*Iy and Timoshenko's shear parameters (see :py:meth:`computeFi`) with respect to given property of elements
+        
+        :param str variable: 'e', 'g', 'a', 'iy', 'k' or 'j'
+        :rtype: (np.array,np.array,np.array)
+        """
+        fi = self.computeFi()
+        zero = zeros(len(self.elems))
+        return {'e':(self.a,self.iy,fi/self.e), 'g':(zero,zero,-fi/self.g), 'a':(self.e,zero,-fi/self.a), 'iy':(zero,self.e,fi/self.iy), 'k':(zero,zero,-fi/self.k), 'j':(zero,zero,zero)}[variable]
+
+    def computeLocalStiffnessDerivative(self, variable, condense=True):
+        """Returns (nelem,6,6) derivatives of local stiffness matrices with respect to given property of elements
+        
+        :param str variable: property of elements, see :py:meth:`giveStiffnessDerivatives`
+        :param bool condense: if True, derivatives of statically condensed matrices are returned
+        :rtype: np.array(3d)
+        """
+        dea,deiy,dfi = self.giveStiffnessDerivatives(variable)
+        dk = beam2dLocalStiffnessDerivativeKernel(self.l, self.e*self.a, self.e*self.iy, self.computeFi(), dea, deiy, dfi)
+        if condense:
+            dk = condenseDerivativeKernel(self.computeLocalStiffness(condense=False), dk, self.hinges, self.hingeDofs)
+        return dk
+
+    def computeFixedEndForceDerivative(self, loads, variable):
+        """Returns (nelem,6) derivatives of local end forces of doubly clamped beams (see :py:meth:`computeFixedEndForces`) with respect to given property of elements
+        
+        :param [ElementLoad] loads: element loads
+        :param str variable: property of elements, see :py:meth:`giveStiffnessDerivatives`
+        :rtype: np.array(2d)
+        """
+        # only end forces due to temperature changes depend on the properties
+        dTc,dTg = array([[float(load.value.get(key,0.)) for key in ('dTc','dTg')] for load in loads]).reshape(len(loads),2).T
+        alpha,zero = self.alpha,zeros(len(loads))
+        dn,dm = {'e':(alpha*self.a*dTc,alpha*self.iy*dTg/self.h), 'a':(self.e*alpha*dTc,zero), 'iy':(zero,self.e*alpha*dTg/self.h)}.get(variable,(zero,zero))
+        return beam2dTemperatureLoadKernel(dn, dm)
+
+    def computeLocalLoads(self, loads):
+        """Returns local components of uniform loads (qx,qz) and point forces (px,pz) together with positions of point forces a, loads[i] acting on self.elems[i]
+        
+        :param [ElementLoad] loads: element loads
+        :rtype: (np.array,np.array,np.array,np.array,np.array)
+        """
+        c,s = self.c,self.s
+        vx,vz = giveUniformLoadProjections(loads, c, s)
+        fx,fz,a = array([[float(load.value.get(key,0.)) for key in ('Fx','Fz','DistF')] for load in loads]).reshape(len(loads),3).T
+        return c*vx+s*vz, -s*vx+c*vz, c*fx+s*fz, -s*fx+c*fz, a
+
+    def computeInternalForces(self, x, F, q, points=None):
+        """Returns (nelem,nst,ncol) normal forces, shear forces and bending moments at given stations, vectorized version of :py:meth:`Beam2d.computeNormalForce` and related methods
+        
+        :param np.array(2d) x: (nelem,nst) distances of stations from the first node
+        :param np.array(3d) F: (nelem,6,ncol) local end forces
+        :param np.array(3d) q: (nelem,2,ncol) local components of uniform loads
+        :param tuple points: point forces (ie,a,px,pz,w), ie element indices, a positions, px and pz local components and w (npoint,ncol) factors of point forces in each column or (npoint,) indices of the only column each point force acts in
+        :rtype: (np.array(3d),np.array(3d),np.array(3d))
+        """
+        xx = x[:,:,newaxis]
+        qx,qz = q[:,newaxis,0,:],q[:,newaxis,1,:]
+        n = -F[:,newaxis,0,:] - qx*xx
+        v = -F[:,newaxis,1,:] - qz*xx
+        m = 0.5*qz*xx*xx + F[:,newaxis,1,:]*xx + F[:,newaxis,2,:]
+        if points is not None and len(points[0]):
+            ie,a,px,pz,w = points
+            d = x[ie] - a[:,newaxis]
+            if w.ndim == 1:
+                h = d > 0.
+                index = (ie[:,newaxis],arange(x.shape[1])[newaxis,:],w[:,newaxis])
+                add.at(n, index, -px[:,newaxis]*h)
+                add.at(v, index, -pz[:,newaxis]*h)
+                add.at(m, index, pz[:,newaxis]*d*h)
+            else:
+                h = (d > 0.)[:,:,newaxis]*w[:,newaxis,:]
+                add.at(n, ie, -px[:,newaxis,newaxis]*h)
+                add.at(v, ie, -pz[:,newaxis,newaxis]*h)
+                add.at(m, ie, (pz[:,newaxis]*d)[:,:,newaxis]*h)
+        return n,v,m
+
+
+class BeamGrid2dStack(ElementStack):
+    """Vectorized representation of list of :py:class:`BeamGrid2d` elements
+    
+    :param [BeamGrid2d] elems: list of elements
+    """
+
+    hingeDofs = ([1,2],[4,5])
+
+    def gatherGeom(self):
+        coords = array([[elem.nodes[0].coords, elem.nodes[1].coords] for elem in self.elems], dtype=float).reshape(len(self.elems),2,3)
+        dx = coords[:,1,0]-coords[:,0,0]
+        dy = coords[:,1,1]-coords[:,0,1]
+        self.l = sqrt(dx*dx+dy*dy)
+        self.c = dx/self.l
+        self.s = dy/self.l
+
+    def computeLocalStiffness(self, condense=True):
+        k = beamGrid2dLocalStiffnessKernel(self.l, self.g*self.j, self.e*self.iy)
+        if condense:
+            k = condenseKernel(k, self.hinges, self.hingeDofs)
+        return k
+
+    def computeT(self):
+        return beamGrid2dTransformationKernel(self.c, self.s)
+
+    def computeStiffness(self):
+        return beamGrid2dStiffnessKernel(self.l, self.c, self.s, self.g*self.j, self.e*self.iy, self.hinges)
+
+    def computeLocalMass(self, condense=True, lumped=False):
+        """Returns (nelem,6,6) stack of local mass matrices (see :py:func:`beamGrid2dLocalMassKernel`), polar moments of inertia are taken as Iy+Iz
+        
+        :param bool condense: if True, DOFs released by hinges are condensed (see :py:func:`condenseMassKernel`)
+        :param bool lumped: if True, lumped mass matrices are returned, consistent ones otherwise
+        :rtype: np.array(3d)
+        """
+        m = beamGrid2dLocalMassKernel(self.l, self.d*self.a, self.d*(self.iy+self.iz), lumped)
+        if condense and self.hinges.any():
+            m = condenseMassKernel(self.computeLocalStiffness(condense=False), m, self.hinges, self.hingeDofs)
+        return m
+
+    def computeFixedEndForces(self, loads):
+        """Returns (nelem,6) local end forces of doubly clamped beams due to (uniform) element loads, loads[i] acting on self.elems[i]
+        
+        :param [ElementLoad] loads: element loads
+        :rtype: np.array(2d)
+        """
+        vx,vz = giveUniformLoadProjections(loads, self.c, self.s)
+        return beamGrid2dUniformLoadKernel(self.l, vz)
+
+    def giveStiffnessDerivatives(self, variable):
+        """Returns derivatives of torsional stiffnesses G*J and bending stiffnesses E*Iy with respect to given property of elements
+        
+        :param str variable: 'e', 'g', 'a', 'iy', 'k' or 'j'
+        :rtype: (np.array,np.array)
+        """
+        zero = zeros(len(self.elems))
+        return {'e':(zero,self.iy), 'g':(self.j,zero), 'iy':(zero,self.e), 'j':(self.g,zero)}.get(variable,(zero,zero))
+
+    def computeLocalStiffnessDerivative(self, variable, condense=True):
+        dgj,deiy = self.giveStiffnessDerivatives(variable)
+        dk = beamGrid2dLocalStiffnessKernel(self.l, dgj, deiy)
+        if condense:
+            dk = condenseDerivativeKernel(self.computeLocalStiffness(condense=False), dk, self.hinges, self.hingeDofs)
+        return dk
+
+    def computeFixedEndForceDerivative(self, loads, variable):
+        return zeros((len(loads),6))
+
+    def computeLoadVectors(self, loads, type=''):
+        return self.loc, self.condenseLoadVectors(self.computeFixedEndForces(loads))
+
+
+def giveElementStacks(elems):
+    """Returns list of :py:class:`ElementStack` instances, one for each element class present in elems
+    
+    :param [Element] elems: list of elements
+    :rtype: [ElementStack]
+    """
+    groups = {}
+    for elem in elems:
+        groups.setdefault(elem.__class__,[]).append(elem)
+    stackClasses = {Beam2d:Beam2dStack, BeamGrid2d:BeamGrid2dStack}
+    return [stackClasses.get(cls,ElementStack)(group) for cls,group in groups.items()]
+
+
+
+
+
 class GeneralBoundaryCondition:
     """Abstract class representing general boundary condition
     
@@ -1312,6 +2368,8 @@ class GeneralBoundaryCondition:
     """*(unknown)* value"""
     loadCase = None
     """*(LoadCase)* load case"""
+    unscaledKeys = ()
+    """*(tuple)* keys of value which are not multiplied by load factor (positions, flags etc.), see :py:meth:`giveScaledCopy`"""
 
     def __init__(self, label='generalboundarycondition', where=None, value=None, loadCase=None):
         self.loadCase = loadCase
@@ -1329,6 +2387,21 @@ class GeneralBoundaryCondition:
         """returns dictionary of attributes saved to xml file"""
         return dict(label=self.label, where=self.where.label, value=self.value, loadCase=self.loadCase.label if self.loadCase else '')
 
+    def giveScaledCopy(self, factor, label=None, loadCase=None):
+        """Returns shallow copy of receiver with numerical values multiplied by given factor. The copy is not registered in any load case of domain
+        
+        :param float factor: load factor
+        :param str label: label of the copy, label of receiver if None
+        :param LoadCase|CombinedLoadCase loadCase: load case which the copy belongs to
+        :rtype: GeneralBoundaryCondition
+        """
+        ret = self.__class__.__new__(self.__class__)
+        ret.__dict__.update(self.__dict__)
+        ret.label = label if label else self.label
+        ret.loadCase = loadCase
+        ret.value = dict( (key,val*factor if isinstance(val,(int,float)) and not isinstance(val,bool) and key not in self.unscaledKeys else val) for key,val in self.value.items() )
+        return ret
+
     def change(self,label=None,where=None,value=None,loadCase=None):
         """Change receiver. Return 0 if successful, 1 otherwise"""
         raise NotImplementedError
@@ -1571,6 +2644,7 @@ class ElementLoad(GeneralBoundaryCondition):
     """*(dict)* value"""
     loadCase = None
     """*(LoadCase)* load case"""
+    unscaledKeys = ('DistF',)
 
     def __init__(self, label='elementload', where=None, value=None, loadCase=None):
         GeneralBoundaryCondition.__init__(self,label=label, where=where, value=value, loadCase=loadCase)
@@ -1617,15 +2691,14 @@ class ElementLoad(GeneralBoundaryCondition):
         :rtype: ([int],nb.array(1d))
         """
         t = self.where.computeT()
-        l = self.where.computeLength()
         f = self.giveLoadVectorForDoublyClampedBeam(type=type)
         if not self.where.hasHinges(): # clamped-clamped
             # return -ret, because end values are opposite than their influence on nodes
             return (self.where.giveLocationArray(), -dot(t.transpose(), f) )
-        kl,a,b,kaa,kab,kbb = self.where.computeLocalStiffness(retCondenseSubMats=True)
+        a,b,kab,kbbi = self.where.giveCondensationOperators()
         ret = zeros(6)
         # following is result of static condensation
-        ret[ix_(a)] = f[ix_(a)] - dot(dot(kab,linalg.inv(kbb)),f[ix_(b)])
+        ret[ix_(a)] = f[ix_(a)] - dot(kab,dot(kbbi,f[ix_(b)]))
         # return -ret, because end values are opposite than their influence on nodes
         return self.where.giveLocationArray(), -dot(t.transpose(), ret)
 
@@ -1719,6 +2792,7 @@ class LoadCase:
     
     :param str label: string label of receiver
     :param Domain domain: new domain of receiver
+    :param [(float,float)] history: time history of receiver (time,factor) pairs
     """
 
     label = None
@@ -1733,9 +2807,12 @@ class LoadCase:
     """*(dict)* dictionary of prescribed displacements"""
     displayFlag = None
     """*(bool)* display flag"""
+    history = None
+    """*([(float,float)])* (time,factor) pairs sorted by time, factors are interpolated linearly and the last one holds after the final time, load case is not applied by :py:class:`TimeHistorySolver` if empty"""
 
-    def __init__(self, label='loadcase', domain=None):
-        initFail = self.change(label=label,domain=domain,fromInit=True)
+    def __init__(self, label='loadcase', domain=None, history=None):
+        self.history = []
+        initFail = self.change(label=label,domain=domain,history=history,fromInit=True)
         if initFail:
             raise EduBeamError
             print('LoadCase.__init__')
@@ -1750,17 +2827,23 @@ class LoadCase:
         
         :rtype: dict
         """
-        return dict(label=self.label, domain=self.domain.label if self.domain else '')
+        return dict(label=self.label, domain=self.domain.label if self.domain else '', history=self.history)
 
-    def change(self,label=None,domain=None,fromInit=False):
+    def change(self,label=None,domain=None,fromInit=False,history=None):
         """Change receiver. Return False if successful, True otherwise
         
         :param str label: new string label of receiver. If another load case with this label already exists, returns 1
         :param Domain domain: new domain of receiver
+        :param [(float,float)] history: new time history (time,factor) pairs
         :rtype: bool
         """
         label = label if label else self.label
         domain = domain if domain and isinstance(domain,Domain) else self.domain
+        try:
+            history = sorted( (float(t),float(f)) for t,f in history ) if history is not None else self.history
+        except (TypeError,ValueError):
+            logger.error( langStr('Wrong time history of load case %s', 'Chybný časový průběh zatěžovacího stavu %s') % label )
+            return 1
         if label!=self.label or domain is not self.domain:
             if domain:
                 if label in domain.loadCases:
@@ -1773,10 +2856,26 @@ class LoadCase:
                 domain.loadCases[label] = self
         if label != self.label and not fromInit:
             logger.info( langStr('Load case %s renamed to %s', 'Zatěžovací stav %s přejmenován na %s') % (self.label, label) )
+            if domain:
+                for comb in domain.loadCombinations.values():
+                    comb.renameLoadCase(self.label,label)
         self.label = label
         self.domain = domain
+        self.history = history
         return 0
 
+    def giveLoadFactors(self,times):
+        """Returns load factors of receiver in given times interpolated from :py:attr:`history`. Zeros are returned if the history is empty
+        
+        :param np.array(1d) times: times
+        :rtype: np.array(1d)
+        """
+        times = asarray(times,dtype=float)
+        if not self.history:
+            return zeros(times.shape)
+        t,f = array(self.history).T
+        return interp(times,t,f)
+
     def containsNodalLoad(self,load):
         return load in self.nodalLoads.values()
 
@@ -1799,59 +2898,220 @@ class LoadCase:
         return self.label
 
 
-
-
-class Domain:
-    """A class representing the mesh
+class LoadCombination:
+    """A class representing linear combination of load cases, which expands to variants by mutually exclusive load cases (see :py:meth:`giveVariants`)
     
     :param str label: string label of receiver
+    :param dict factors: load factors {lcLabel:float}
+    :param [[str]] groups: groups of mutually exclusive load cases
+    :param Domain domain: new domain of receiver
     """
 
     label = None
-    """*(str)* string label"""
-    materials = None
-    """*(dict)* dictionary of materials"""
-    crossSects = None
-    """*(dict)* dictionary of cross sections"""
-    nodes = None
-    """*(dict)* dictionary of nodes"""
-    elements = None
-    """*(dict)* dictionary of elements"""
-    loadCases = None
-    """*(dict)* dictionary of load cases"""
-    activeLoadCase = None
-    """*(LoadCase)* active load case"""
-    session = None
-    """*(Session)* session which receiver belongs to"""
-    dofsNames = None
-
-    def __init__(self,label='domain',type='beam2d'):
-        self.label = label
-        self.materials = {}
-        self.crossSects = {}
-        self.nodes = {}
-        self.elements = {}
-        # list of loadCases
-        self.loadCases = {}
-        self.activeLoadCase = None
-        #self.nodalLoads = {}
-        #self.elementLoads = {}
-        self.session = None
-        self.addPredefinedItems()
-        self.type = type
-        self.check()
-
-    def check(self):
-        if self.type == 'beam2d':
-            self.dofsNames = ['x','z','Y']
-        elif self.type == 'grid2d':
-            self.dofsNames = ['z','X','Y']
-        else:
+    """*(str)* String label"""
+    domain = None
+    """*(Domain)* Domain which receiver belongs to"""
+    factors = None
+    """*(dict)* load factors of load cases {lcLabel:float}, missing factors of load cases in groups are 1.0"""
+    groups = None
+    """*([[str]])* groups of mutually exclusive load cases"""
+
+    def __init__(self, label='loadcombination', factors=None, groups=None, domain=None):
+        self.factors = {}
+        self.groups = []
+        initFail = self.change(label=label,factors=factors,groups=groups,domain=domain,fromInit=True)
+        if initFail:
             raise EduBeamError
 
-    def addPredefinedItems(self):
-        mat = Material(label='DefaultMat', e=30.e+6, g=10.e+6, alpha=12.e-6)
-        self.materials[mat.label] = mat
+    def dict(self):
+        """returns dictionary of attributes saved to xml file
+        
+        :rtype: dict
+        """
+        return dict(label=self.label, factors=self.factors, groups=self.groups, domain=self.domain.label if self.domain else '')
+
+    def change(self,label=None,factors=None,groups=None,domain=None,fromInit=False):
+        """Change receiver. Return False if successful, True otherwise
+        
+        :param str label: new string label of receiver. If another load combination or load case with this label already exists, returns 1
+        :param dict factors: new load factors {lcLabel:float}
+        :param [[str]] groups: new groups of mutually exclusive load cases
+        :param Domain domain: new domain of receiver
+        :rtype: bool
+        """
+        label = label if label else self.label
+        domain = domain if domain and isinstance(domain,Domain) else self.domain
+        try:
+            factors = dict( (key,float(val)) for key,val in factors.items() ) if factors is not None else self.factors
+        except (TypeError,ValueError,AttributeError):
+            logger.error( langStr('Wrong load factors of load combination %s', 'Chybné součinitele kombinace zatížení %s') % label )
+            return 1
+        groups = [list(group) for group in groups if group] if groups is not None else self.groups
+        grouped = [lcLabel for group in groups for lcLabel in group]
+        if len(grouped) != len(set(grouped)):
+            logger.error( langStr('Load case is present in more groups of load combination %s', 'Zatěžovací stav je ve více skupinách kombinace zatížení %s') % label )
+            return 1
+        if label!=self.label or domain is not self.domain:
+            if domain:
+                if label in domain.loadCombinations or label in domain.loadCases:
+                    logger.error( langStr('Load combination or load case %s already exists', 'Kombinace zatížení nebo zatěžovací stav %s již existuje') % label )
+                    return 1
+            if self.domain:
+                self.domain.loadCombinations.pop(self.label,None)
+            if domain:
+                domain.loadCombinations[label] = self
+        if label != self.label and not fromInit:
+            logger.info( langStr('Load combination %s renamed to %s', 'Kombinace zatížení %s přejmenována na %s') % (self.label, label) )
+        self.label = label
+        self.domain = domain
+        self.factors = factors
+        self.groups = groups
+        return 0
+
+    def renameLoadCase(self,oldLabel,newLabel):
+        """Replaces label of renamed load case in factors and groups of receiver
+        
+        :param str oldLabel: old label of load case
+        :param str newLabel: new label of load case
+        """
+        if oldLabel in self.factors:
+            self.factors[newLabel] = self.factors.pop(oldLabel)
+        self.groups = [[newLabel if lcLabel==oldLabel else lcLabel for lcLabel in group] for group in self.groups]
+
+    def giveVariants(self):
+        """Returns variants of receiver as list of (label,{lcLabel:float}), each with all ungrouped load cases and one load case of each group
+        
+        :rtype: [(str,dict)]
+        """
+        grouped = set(lcLabel for group in self.groups for lcLabel in group)
+        variants = [((),dict( (lcLabel,factor) for lcLabel,factor in self.factors.items() if lcLabel not in grouped ))]
+        for group in self.groups:
+            newVariants = []
+            for chosen,factors in variants:
+                for lcLabel in group:
+                    newFactors = dict(factors)
+                    newFactors[lcLabel] = self.factors.get(lcLabel,1.)
+                    newVariants.append((chosen+(lcLabel,),newFactors))
+            variants = newVariants
+        # the only variant is labelled by label of receiver, otherwise labels of chosen load cases are appended in brackets
+        if len(variants) == 1:
+            return [(self.label,variants[0][1])]
+        return [('%s[%s]'%(self.label,','.join(chosen)),factors) for chosen,factors in variants]
+
+    def __str__(self):
+        return self.label
+
+
+class CombinedLoadCase:
+    """Load case like view of one variant of :py:class:`LoadCombination` with factored copies of loads, which can be :py:attr:`Domain.activeLoadCase`
+    
+    :param str label: label of the variant
+    :param LoadCombination combination: combination which receiver is variant of
+    :param dict factors: load factors of the variant {lcLabel:float}
+    """
+
+    label = None
+    """*(str)* String label"""
+    domain = None
+    """*(Domain)* Domain which receiver belongs to"""
+    combination = None
+    """*(LoadCombination)* combination which receiver is variant of"""
+    factors = None
+    """*(dict)* load factors {lcLabel:float}"""
+    nodalLoads = None
+    """*(dict)* dictionary of factored nodal loads"""
+    elementLoads = None
+    """*(dict)* dictionary of factored element loads"""
+    prescribedDspls = None
+    """*(dict)* dictionary of factored prescribed displacements"""
+    displayFlag = None
+    """*(bool)* display flag"""
+
+    def __init__(self, label, combination, factors):
+        self.label = label
+        self.combination = combination
+        self.domain = combination.domain
+        self.factors = factors
+        self.displayFlag = True
+        self.update()
+
+    def update(self):
+        """Rebuilds factored copies of loads of combined load cases, labelled 'lcLabel/loadLabel'"""
+        self.nodalLoads = {}
+        self.elementLoads = {}
+        self.prescribedDspls = {}
+        for lcLabel,factor in self.factors.items():
+            lc = self.domain.loadCases.get(lcLabel)
+            if not lc:
+                continue
+            for loads,combined in ((lc.nodalLoads,self.nodalLoads),(lc.elementLoads,self.elementLoads),(lc.prescribedDspls,self.prescribedDspls)):
+                for load in loads.values():
+                    label = '%s/%s'%(lcLabel,load.label)
+                    combined[label] = load.giveScaledCopy(factor,label,self)
+
+    def contains(self,load):
+        return load in self.nodalLoads.values() or load in self.elementLoads.values() or load in self.prescribedDspls.values()
+
+    def __str__(self):
+        return self.label
+
+
+
+
+class Domain:
+    """A class representing the mesh
+    
+    :param str label: string label of receiver
+    """
+
+    label = None
+    """*(str)* string label"""
+    materials = None
+    """*(dict)* dictionary of materials"""
+    crossSects = None
+    """*(dict)* dictionary of cross sections"""
+    nodes = None
+    """*(dict)* dictionary of nodes"""
+    elements = None
+    """*(dict)* dictionary of elements"""
+    loadCases = None
+    """*(dict)* dictionary of load cases"""
+    loadCombinations = None
+    """*(dict)* dictionary of load combinations"""
+    activeLoadCase = None
+    """*(LoadCase|CombinedLoadCase)* active load case"""
+    session = None
+    """*(Session)* session which receiver belongs to"""
+    dofsNames = None
+
+    def __init__(self,label='domain',type='beam2d'):
+        self.label = label
+        self.materials = {}
+        self.crossSects = {}
+        self.nodes = {}
+        self.elements = {}
+        # list of loadCases
+        self.loadCases = {}
+        self.loadCombinations = {}
+        self.activeLoadCase = None
+        #self.nodalLoads = {}
+        #self.elementLoads = {}
+        self.session = None
+        self.addPredefinedItems()
+        self.type = type
+        self.check()
+
+    def check(self):
+        if self.type == 'beam2d':
+            self.dofsNames = ['x','z','Y']
+        elif self.type == 'grid2d':
+            self.dofsNames = ['z','X','Y']
+        else:
+            raise EduBeamError
+
+    def addPredefinedItems(self):
+        mat = Material(label='DefaultMat', e=30.e+6, g=10.e+6, alpha=12.e-6)
+        self.materials[mat.label] = mat
         #default rectangle 0.2 x 0.3 m
         cs = CrossSection(label='DefaultCS', a=0.06, iy=4.5e-4, iz=2.0e-4, dyz=0., h=0.3, k=0.833333)
         self.crossSects[cs.label] = cs
@@ -1950,6 +3210,22 @@ class Domain:
             return lc
         raise TypeError
 
+    def giveLoadCombination(self,comb):
+        """Returns LoadCombination instance if successful, None otherwise
+        
+        :param str|LoadCombination comb: given load combination to be returned
+        :rtype: LoadCombination | None
+        """
+        if isinstance(comb,str):
+            label = comb
+            comb = self.loadCombinations.get(label)
+            if not comb:
+                logger.error( langStr('Load combination %s not found in the load combinations %s', 'Kombinace zatížení %s nenalezena v kombinacích zatížení %s') % (label, sorted(self.loadCombinations.keys())) )
+            return comb
+        if isinstance(comb,LoadCombination):
+            return comb
+        raise TypeError
+
     def giveNodalLoad(self,load):
         """Returns NodalLoad instance if successful, None otherwise
         
@@ -2177,6 +3453,37 @@ class Domain:
             logger.info( langStr('Added load case %s', 'Přidán zatěžovací stav %s') % (lc.label) )
         return lc
 
+    def addLoadCombination(self, comb=None, isUndoable=False,verbose=True,masterCommands=None,**kw):
+        """Add load combination to receiver. Return LoadCombination if successful, None otherwise
+        
+        :param LoadCombination comb: load combination to be added. If comb==None, new LoadCombination is constructed from kw and then added. Possible identical label issues are solved in :py:meth:`LoadCombination`
+        :param bool isUndoable: if the action is undoable or not
+        :param kw: for meaning of kw, see :py:class:`LoadCombination`
+        :rtype: LoadCombination|None
+        """
+        isUndoable = isUndoable and self.session
+        if not comb:
+            kw['domain'] = self
+            try:
+                comb = LoadCombination(**kw)
+            except EduBeamError:
+                return None
+        else:
+            if comb.label in self.loadCombinations or comb.label in self.loadCases:
+                logger.error( langStr('Load combination %s already exists in %s, continuing', 'Kombinace zatížení %s už existuje v %s, pokračuji') % (comb.label, sorted(self.loadCombinations.keys()) ) )
+                return None
+            self.loadCombinations[comb.label] = comb
+            comb.domain = self
+        if isUndoable:
+            command = ('add',Domain.addLoadCombination,comb.dict())
+            if masterCommands is not None:
+                masterCommands.append(command)
+            else:
+                self.session.addCommands((command,))
+        if verbose:
+            logger.info( langStr('Added load combination %s', 'Přidána kombinace zatížení %s') % (comb.label) )
+        return comb
+
     def addNodalLoad(self,load=None,isUndoable=False,verbose=True,masterCommands=None,**kw):
         """Add nodal load to receiver. Return NodalLoad if successful, None otherwise
         
@@ -2529,6 +3836,31 @@ class Domain:
             self.session.addCommands(commands)
         return 0
 
+    def delLoadCombination(self,comb,isUndoable=False,verbose=True,masterCommands=None):
+        """Delete load combination from receiver, the first load case becomes active instead of its variant. Return False if successful, True otherwise
+        
+        :param LoadCombination|str comb: load combination to be deleted
+        :param bool isUndoable: if the action is undoable or not
+        :rtype: bool
+        """
+        isUndoable = isUndoable and self.session
+        comb = self.giveLoadCombination(comb)
+        if not comb:
+            logger.error( langStr('Deleting of load combination failed', 'Mazání kombinace zatížení selhalo') )
+            return 1
+        if isinstance(self.activeLoadCase,CombinedLoadCase) and self.activeLoadCase.combination is comb:
+            self.activeLoadCase = next(iter(self.loadCases.values()),None)
+        if isUndoable:
+            command = ('del',Domain.delLoadCombination,comb.dict())
+            if masterCommands is not None:
+                masterCommands.append(command)
+            else:
+                self.session.addCommands((command,))
+        del self.loadCombinations[comb.label]
+        if verbose:
+            logger.info( langStr('Load combination %s deleted', 'Kombinace zatížení %s smazána') % comb.label )
+        return 0
+
     def delNodalLoad(self,load,isUndoable=False,verbose=True,masterCommands=None):
         """Delete nodal load from receiver. Return False if successful, True otherwise
         
@@ -2786,7 +4118,7 @@ class Domain:
         commands = [] if masterCommands is None else masterCommands # for undoable version
         # loop over selected objects
         for elem in elems:
-            if self.changeElement(elem,mat=mat,cs=cs,hinges=hinges,isUndoable=isUndoable,masterCommands=commands):
+            if self.changeElement(elem,mat=mat,cs=cs,hinges=hinges,isUndoable=isUndoable,verbose=verbose,masterCommands=commands):
                 # changing failed
                 return 1
         if isUndoable and masterCommands is None:
@@ -2821,6 +4153,32 @@ class Domain:
                 self.session.addCommands((command,))
         return 0
 
+    def changeLoadCombination(self,comb,isUndoable=False,verbose=True,masterCommands=None,**kw):
+        """Change load combination of receiver. Return False if successful, True otherwise. Possible identical label issues are controlled in :py:meth:`LoadCombination.change`
+        
+        :param LoadCombination|str comb: load combination to be changed
+        :param bool isUndoable: if the action is undoable or not
+        :param kw: see :py:meth:`LoadCombination.change`
+        :rtype: bool
+        """
+        isUndoable = isUndoable and self.session
+        comb = self.giveLoadCombination(comb)
+        if not comb:
+            logger.error( langStr('Changing of load combination failed', 'Změna kombinace zatížení selhala') )
+            return 1
+        cmdKw = {}
+        cmdKw['old'] = comb.dict()
+        if comb.change(**kw):
+            return 1
+        cmdKw['new'] = comb.dict()
+        if isUndoable:
+            command = ('change',Domain.changeLoadCombination,cmdKw)
+            if masterCommands is not None:
+                masterCommands.append(command)
+            else:
+                self.session.addCommands((command,))
+        return 0
+
     def changeNodalLoad(self,load,isUndoable=False,verbose=True,masterCommands=None,**kw):
         """Change nodal load of receiver. Return False if successful, True otherwise. Possible identical label issues are controlled in :py:meth:`NodalLoad.change`
         
@@ -3185,6 +4543,11 @@ class Domain:
         isUndoable = isUndoable and self.session
         if isUndoable:
             commands = []
+        for comb in list(self.loadCombinations.values()):
+            if isUndoable:
+                commands.append(('del',Domain.delLoadCombination,comb.dict()))
+            self.delLoadCombination(comb,verbose=False)
+        self.loadCombinations = {}
         for lc in list(self.loadCases.values()):
             for load in list(lc.nodalLoads.values()):
                 if isUndoable:
@@ -3240,13 +4603,43 @@ class Domain:
 
     def changeActiveLoadCaseTo(self, lcLabel):
         alc = self.activeLoadCase
-        self.activeLoadCase = self.loadCases.get(lcLabel,None)
+        self.activeLoadCase = self.loadCases.get(lcLabel,None) or self.giveCombinedLoadCases().get(lcLabel,None)
         if not self.activeLoadCase:
             logger.error( langStr('Load case %s not found', 'Zatěžovací stav %s nenalezen') % (lcLabel) )
             self.activeLoadCase = alc
             return
         #logger.info( langStr('Active load case changed to %s', 'Aktivní zatěžovací stav změněn na %s') % (lcLabel) )
-        session.glframe.loadCaseChoice.SetValue(self.activeLoadCase.label)
+        if session.glframe:
+            session.glframe.loadCaseChoice.SetValue(self.activeLoadCase.label)
+
+    def giveCombinedLoadCases(self):
+        """Returns all variants of load combinations (see :py:meth:`LoadCombination.giveVariants`) as load case like objects
+        
+        :rtype: OrderedDict
+        """
+        ret = OrderedDict()
+        for comb in self.loadCombinations.values():
+            for label,factors in comb.giveVariants():
+                ret[label] = CombinedLoadCase(label,comb,factors)
+        return ret
+
+    def giveCombinationMatrix(self, lcLabels=None):
+        """Returns labels of all variants of load combinations and (nlc,nvar) matrix of their load factors, one row for each load case. Unknown load cases are ignored
+        
+        :param [str] lcLabels: labels of load cases in order of rows, labels of :py:attr:`loadCases` if None
+        :rtype: ([str],np.array(2d))
+        """
+        lcLabels = list(self.loadCases.keys()) if lcLabels is None else list(lcLabels)
+        rows = dict( (lcLabel,i) for i,lcLabel in enumerate(lcLabels) )
+        variants = [variant for comb in self.loadCombinations.values() for variant in comb.giveVariants()]
+        c = zeros((len(lcLabels),len(variants)))
+        for j,(label,factors) in enumerate(variants):
+            for lcLabel,factor in factors.items():
+                if lcLabel in rows:
+                    c[rows[lcLabel],j] = factor
+                else:
+                    logger.warning( langStr('Load case %s of load combination %s not found', 'Zatěžovací stav %s kombinace zatížení %s nenalezen') % (lcLabel,label) )
+        return [label for label,factors in variants],c
 
     def postLoad(self,*args,**kw):
         """Perform all needed actions after loading domain from saved file"""
@@ -3334,132 +4727,1094 @@ class Solver:
         """
         return
 
+    def giveBeamDiagrams(self, nseg=20):
+        """Returns :py:class:`BeamDiagrams` of the active solution vector and element loads of the active load case
+        
+        :param int nseg: number of uniform segments
+        :rtype: BeamDiagrams
+        """
+        domain = self.session.domain
+        return BeamDiagrams(domain, self.giveActiveSolutionVector(), domain.activeLoadCase, nseg=nseg)
+
 
-class LinearStaticSolver(Solver):
-    """Class for solving linear elasticity
-    
-    :param str label: string label of receiver
+class DenseFactorization:
+    """Dense system matrix prepared for repeated solution. Used for tiny models, where the overhead of sparse factorization does not pay off
+
+    :param np.array(2d) k: system matrix
     """
 
-    domain = None
-    """*(Domain)* domain being solved"""
-    neq = None
-    """*(int)* number of equations (free dofs)"""
-    pneq = None
-    """*(int)* number of prescribed dofs"""
-    r = None
-    """*({numpy.array})* dictionary of displacement vectors for each load case (keys of this dict are load cases labels)"""
-    f = None
-    """*({numpy.array})* dictionary of load vectors for each load case (keys of this dict are load cases labels)"""
-    dofNames = None
-    """*(dict)* disctionary of dof names"""
+    k = None
+    """*(np.array(2d))* system matrix"""
 
-    def __init__(self,label='linearstaticsolver'):
-        Solver.__init__(self,label=label)
-        self.reset()
-        self.neq = 0
-        self.pneq = 0
+    def __init__(self, k):
+        self.k = array(k)
 
-    def solve(self,domain=None):
-        """Solves the domain
-        
-        :param Domain domain: domain to be solved
-        :rtype: bool
+    def solve(self, rhs):
+        """Returns solution for given right hand side(s)
+
+        :param np.array rhs: right hand side vector or matrix with one right hand side per column
+        :rtype: np.array
         """
-        if not domain:
-            if not self.session or not self.session.domain:
-                print (domain, self.domain, self.session.domain)
-                logger.error( langStr('LinearStaticSolver: No domain to solve...', 'Žádná síť pro řešení...') )
-                return 1
-        self.domain = domain if domain else self.session.domain
-        # number equations first
-        self.numberEquations()
-        #assemble the system
-        #assemble stiffness
-        kuu,kpp,kup = self.assembleStiffnessMatrix()
-        #check a near zero element in the stiffness matrix on the diagonal
-        if self.checkStiffnessMatrixDiagonal(kuu):
-            return 1
-        # assemble load vector
-        fu,fp = self.assembleLoadVectors()
-        # set prescribed displacement
-        ru,rp = self.assembleDsplVectors()
-        
-        # actual solving
-        if self.solveLoadCases(kuu,kpp,kup,ru,rp,fu,fp):
-            return 1
-        
-        # recover r
-        self.recoverDsplVector(ru,rp)
-        self.recoverLoadVector(fu,fp)
-        # subtract non-nodal (continuous force and temperature loads)
-        self.subtractForcesInReactions()
-        #check if huge displacements exist, which points to nearly singular stiffness matrix
-        if self.checkHugeDisplacements():
-            return 1
-        logger.info( langStr('Solution finished successfully', 'Úloha úspěšně vyřešena') )
-                      
-        if 0:#report output if desired
-            fileHandle = open ( 'results.txt', 'w' ) 
-            fileHandle.write('Node Location_array(numbers correspond to rows in stiffness matrix)\n')
-            for node in sorted(self.domain.nodes.values(), key=lambda n: natural_key(n.label)):
-                fileHandle.write("%s %s\n"% (node.label, node.loc))
-            fileHandle.write('Reduced stiffness matrix\n')
-            savetxt(fileHandle, kuu, fmt='%+1.4e', delimiter='   ')
-            fileHandle.write('Determinant of reduced stiffness matrix %e\n' % linalg.det(kuu))
-            fileHandle.write('Right hand side\n')
-            savetxt(fileHandle, fu-dot(kup,rp), fmt='%+1.4e', delimiter='   ')
-            fileHandle.write('Solution\n')
-            savetxt(fileHandle, ru, fmt='%+1.4e', delimiter='   ')
-            fileHandle.close()
-        return 0
+        return linalg.solve(self.k, rhs)
 
-    def solveLoadCases(self,kuu,kpp,kup,ru,rp,fu,fp):
-        lcLabels = self.domain.loadCases.keys()
-        rhs = zeros((self.neq,len(lcLabels)))
-        for i,lcLabel in enumerate(lcLabels):
-            rhs[:,i] = fu[lcLabel] - dot(kup,rp[lcLabel])
-        try:
-            if self.neq>0:
-                rulc = linalg.solve(kuu,rhs)
-            else:
-                rulc = zeros((0,len(lcLabels)))
-            self.isSolved = True
-        except (ValueError,linalg.LinAlgError):
-            logger.error( langStr('Solution of linear system failed, wrong boundary conditions (supports)?', 'Řešení lineárního systému selhalo, chybně zadané okrajové podmínky (podpory)?') )
-            self.isSolved = False
-            return 1
-        for i,lcLabel in enumerate(lcLabels):
-            ru[lcLabel] = rulc[:,i]
-            if self.pneq > 0:
-                fp[lcLabel] = dot(kup.transpose(),ru[lcLabel]) + dot(kpp,rp[lcLabel])
-        return 0
 
-    def checkHugeDisplacements(self):
-        """TODO
+class SparseLUFactorization:
+    """Sparse LU factorization (SuperLU) of symmetric system matrix
+
+    :param scipy.sparse.spmatrix k: system matrix
+    """
+
+    lu = None
+    """*(scipy.sparse.linalg.SuperLU)* factorized system matrix"""
+    perm = None
+    """*(np.array)* symmetric fill-reducing permutation applied before factorization, None if it is computed by SuperLU"""
+
+    def __init__(self, k, perm=None):
+        self.perm = perm
+        # symmetric fill-reducing ordering and preferred diagonal pivots, so it behaves like sparse Cholesky (scipy does not provide one)
+        if perm is None:
+            self.lu = SPLA.splu(SP.csc_matrix(k), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.01, options=dict(SymmetricMode=True))
+        else:
+            # ordering is already known, only numeric factorization of permuted matrix is performed
+            self.lu = SPLA.splu(SP.csc_matrix(k)[perm][:,perm], permc_spec='NATURAL', diag_pivot_thresh=0.01, options=dict(SymmetricMode=True))
+
+    def giveOrdering(self):
+        """Returns fill-reducing column ordering of the factorization, which can be passed to factorization of other matrices with the same sparsity pattern
         
-        :rtype: bool
+        :rtype: np.array
         """
-        locProblems = []
-        nodeProblems = []
-        MaxDisplacement = 0.
-        for r in self.r.values():
-            for i in range(r.shape[0]):
-                if abs(r[i]) > 1.e+6:
-                    locProblems.append(i)
-                    if abs(r[i]) > abs(MaxDisplacement):
-                        MaxDisplacement = abs(r[i])
-        for j in locProblems:
-            for node in self.domain.nodes.values():
-                if node.loc.count(j):
-                    if node.label not in nodeProblems:
-                        nodeProblems.append(node.label)    
-        #
-        ret = 0
-        if locProblems:
-            nodeProblemsSorted = sorted(nodeProblems, key=lambda n: natural_key(n))
-            if session.glframe: # we are in GUI
-                from ebgui import wx
+        return self.perm[self.lu.perm_c] if self.perm is not None else self.lu.perm_c
+
+    def solve(self, rhs):
+        """Returns solution for given right hand side(s)
+
+        :param np.array rhs: right hand side vector or matrix with one right hand side per column
+        :rtype: np.array
+        """
+        if self.perm is None:
+            return self.lu.solve(rhs)
+        ret = empty(rhs.shape)
+        ret[self.perm] = self.lu.solve(rhs[self.perm])
+        return ret
+
+
+class BandedCholeskyFactorization:
+    """Cholesky factorization of symmetric positive definite banded matrix in upper banded form, see :py:meth:`LinearStaticSolver.giveNodeOrdering`
+
+    :param scipy.sparse.spmatrix k: system matrix
+    :param int bandwidth: (upper) bandwidth of k
+    """
+
+    cb = None
+    """*(np.array(2d))* Cholesky factor in upper banded form"""
+
+    def __init__(self, k, bandwidth):
+        k = k.tocoo()
+        upper = k.row <= k.col
+        ab = zeros((bandwidth+1,k.shape[0]))
+        ab[bandwidth+k.row[upper]-k.col[upper],k.col[upper]] = k.data[upper]
+        self.cb = LA.cholesky_banded(ab, overwrite_ab=True, lower=False)
+
+    def solve(self, rhs):
+        """Returns solution for given right hand side(s)
+
+        :param np.array rhs: right hand side vector or matrix with one right hand side per column
+        :rtype: np.array
+        """
+        return LA.cho_solve_banded((self.cb,False), rhs)
+
+
+class LowRankUpdatedFactorization:
+    """Factorization of matrix K0+P*D*P^T, where K0 is already factorized and P selects a few equations affected by the update D
+    
+    :param base: factorization of K0 (any object with solve method)
+    :param int n: number of equations
+    """
+
+    base = None
+    """factorization of the original matrix K0"""
+    dofs = None
+    """*([int])* equations affected by the update"""
+    d = None
+    """*(np.array(2d))* accumulated update of the matrix on self.dofs"""
+    z = None
+    """*(np.array(2d))* K0^-1*P"""
+    w = None
+    """*(np.array(2d))* D*(I+S*D)^-1"""
+
+    def __init__(self, base, n):
+        self.base = base
+        self.dofs = []
+        self.d = zeros((0,0))
+        self.z = zeros((n,0))
+        self.w = zeros((0,0))
+
+    def giveRank(self):
+        """Returns number of equations affected by the accumulated update (upper bound of its rank)
+        
+        :rtype: int
+        """
+        return len(self.dofs)
+
+    def update(self, dofs, dk):
+        """Adds dk to the receiver's matrix
+        
+        :param [int] dofs: equations dk is related to
+        :param np.array(2d) dk: update of the matrix
+        """
+        newDofs = [dof for dof in dict.fromkeys(dofs) if dof not in self.dofs]
+        if newDofs:
+            n = self.z.shape[0]
+            e = zeros((n,len(newDofs)))
+            e[newDofs,arange(len(newDofs))] = 1.
+            self.z = hstack((self.z, self.base.solve(e).reshape(n,len(newDofs))))
+            m = len(self.dofs)
+            d = zeros((m+len(newDofs),m+len(newDofs)))
+            d[:m,:m] = self.d
+            self.d = d
+            self.dofs += newDofs
+        pos = [self.dofs.index(dof) for dof in dofs]
+        self.d[ix_(pos,pos)] += dk
+        m = len(self.dofs)
+        s = self.z[self.dofs,:]
+        # w = d*(I+s*d)^-1 is used in Woodbury formula x = y - z*w*P^T*y, y = K0^-1*b, z = K0^-1*P and s = P^T*z, singular d is allowed
+        self.w = linalg.solve((identity(m)+dot(s,self.d)).transpose(), self.d.transpose()).transpose()
+
+    def solve(self, rhs):
+        """Returns solution for given right hand side(s)
+
+        :param np.array rhs: right hand side vector or matrix with one right hand side per column
+        :rtype: np.array
+        """
+        y = self.base.solve(rhs)
+        if self.dofs:
+            y = y - dot(self.z, dot(self.w, y[self.dofs]))
+        return y
+
+
+class PreconditionedCGSolution:
+    """Iterative solution of symmetric positive definite system by preconditioned conjugate gradient method, used instead of factorization of very large models
+
+    :param np.array(2d)|scipy.sparse.spmatrix k: system matrix
+    :param str preconditioner: 'jacobi' (diagonal) or 'ilu' (incomplete LU factorization with threshold and symmetric ordering)
+    """
+
+    k = None
+    """*(np.array(2d)|scipy.sparse.spmatrix)* system matrix"""
+    preconditioner = None
+    """*(str)* type of preconditioner"""
+    dropTolerance = 1.e-4
+    """*(float)* drop tolerance of incomplete factorization"""
+    fillFactor = 10.
+    """*(float)* maximum ratio of nonzeros of incomplete factors to nonzeros of system matrix"""
+    iterations = None
+    """*(np.array)* number of iterations of the last solution, one for each right hand side"""
+    residuals = None
+    """*(np.array)* relative residual norms of the last solution, one for each right hand side"""
+
+    def __init__(self, k, preconditioner='jacobi'):
+        self.k = k
+        self.preconditioner = preconditioner
+        if preconditioner == 'ilu' and SP is not None:
+            # symmetric ordering without row pivoting keeps the incomplete factors close to incomplete Cholesky ones
+            self.ilu = SPLA.spilu(SP.csc_matrix(k), drop_tol=self.dropTolerance, fill_factor=self.fillFactor, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0., options=dict(SymmetricMode=True))
+        else:
+            self.preconditioner = 'jacobi'
+            d = array(k.diagonal(), dtype=float)
+            if (d <= 0.).any():
+                raise linalg.LinAlgError('Matrix is not positive definite')
+            self.dinv = 1./d
+
+    def applyPreconditioner(self, r):
+        """Returns preconditioned residuals
+
+        :param np.array(2d) r: residuals, one per column
+        :rtype: np.array(2d)
+        """
+        if self.preconditioner == 'ilu':
+            return self.ilu.solve(r)
+        return self.dinv[:,newaxis]*r
+
+    def solve(self, rhs, x0=None, tolerance=1.e-10, maxIterations=None):
+        """Returns solution for given right hand side(s). Raises linalg.LinAlgError if the iterations do not converge
+
+        :param np.array rhs: right hand side vector or matrix with one right hand side per column
+        :param np.array x0: initial guess of the same shape as rhs (zero if not given)
+        :param float tolerance: required relative residual norm ||b-K*x||/||b||
+        :param int maxIterations: maximum number of iterations (10 times number of equations if not given)
+        :rtype: np.array
+        """
+        n = self.k.shape[0]
+        b = array(rhs, dtype=float).reshape(n,-1)
+        m = b.shape[1]
+        x = zeros((n,m)) if x0 is None else array(x0, dtype=float).reshape(n,m)
+        if maxIterations is None:
+            maxIterations = 10*n
+        bnorm = sqrt((b*b).sum(axis=0))
+        bnorm[bnorm==0.] = 1.
+        r = b - self.k.dot(x)
+        self.residuals = sqrt((r*r).sum(axis=0))/bnorm
+        self.iterations = zeros(m, dtype=int)
+        active = nonzero(self.residuals > tolerance)[0]
+        z = self.applyPreconditioner(r[:,active])
+        p = zeros((n,m))
+        p[:,active] = z
+        rz = zeros(m)
+        rz[active] = (r[:,active]*z).sum(axis=0)
+        it = 0
+        # right hand sides are iterated at once, each with its own step lengths and convergence check
+        while len(active) and it < maxIterations:
+            it += 1
+            pa = p[:,active]
+            q = self.k.dot(pa)
+            pq = (pa*q).sum(axis=0)
+            if (pq <= 0.).any():
+                raise linalg.LinAlgError('Matrix is not positive definite')
+            alpha = rz[active]/pq
+            x[:,active] += alpha*pa
+            r[:,active] -= alpha*q
+            self.iterations[active] = it
+            ra = r[:,active]
+            self.residuals[active] = sqrt((ra*ra).sum(axis=0))/bnorm[active]
+            notConverged = self.residuals[active] > tolerance
+            active = active[notConverged]
+            if len(active):
+                ra = ra[:,notConverged]
+                z = self.applyPreconditioner(ra)
+                rzNew = (ra*z).sum(axis=0)
+                # Polak-Ribiere formula, robust if the preconditioner (e.g. ilu) is not exactly symmetric
+                beta = -alpha[notConverged]*(q[:,notConverged]*z).sum(axis=0)/rz[active]
+                p[:,active] = z + beta*p[:,active]
+                rz[active] = rzNew
+        if len(active):
+            raise linalg.LinAlgError('Conjugate gradient method did not converge in %d iterations, relative residual %g' % (maxIterations,self.residuals.max()))
+        return x.reshape(array(rhs).shape)
+
+
+class AssemblyPattern:
+    """Sparsity pattern of matrix of free DOFs assembled from element matrices with fixed code numbers, e.g. K+Ks(N) in iterations of :py:class:`PDeltaSolver`
+    
+    :param np.array rows: row indices of element entries in free DOFs
+    :param np.array cols: column indices of element entries in free DOFs
+    :param int n: number of equations
+    :param bool sparse: if True, CSR matrices are assembled, dense arrays otherwise
+    """
+
+    n = 0
+    """*(int)* number of equations"""
+    sparse = True
+    """*(bool)* if True, CSR matrices are assembled, dense arrays otherwise"""
+    positions = None
+    """*(np.array)* positions of element entries in data array of assembled matrix (flattened dense array for dense matrices)"""
+    indices = None
+    """*(np.array)* column indices of CSR matrix"""
+    indptr = None
+    """*(np.array)* row pointers of CSR matrix"""
+    bandwidth = None
+    """*(int)* (upper) bandwidth of the pattern"""
+    ordering = None
+    """*(np.array)* fill-reducing ordering of sparse LU factorization, None until the first one is computed"""
+
+    def __init__(self, rows, cols, n, sparse=True):
+        self.n = n
+        self.sparse = sparse
+        # positions of element entries are computed once, each matrix is then assembled by single bincount call
+        keys = rows*n+cols
+        if not sparse:
+            self.positions = keys
+            return
+        keys,self.positions = unique(keys, return_inverse=True)
+        self.indices = keys % n
+        self.indptr = concatenate(([0],cumsum(bincount(keys//n, minlength=n))))
+        self.bandwidth = int(abs(keys//n-self.indices).max()) if len(keys) else 0
+
+    def assemble(self, vals):
+        """Returns matrix assembled from values of element entries
+        
+        :param np.array vals: values of element entries in order of rows and cols given in constructor
+        :rtype: np.array(2d) | scipy.sparse.csr_matrix
+        """
+        if not self.sparse:
+            return bincount(self.positions, vals, minlength=self.n*self.n).reshape(self.n,self.n)
+        return SP.csr_matrix((bincount(self.positions, vals, minlength=len(self.indices)),self.indices,self.indptr), shape=(self.n,self.n))
+
+    def factorize(self, k, solver):
+        """Returns factorization of matrix with receiver's pattern following settings of given solver (see :py:meth:`LinearStaticSolver.factorize`)
+        
+        :param np.array(2d)|scipy.sparse.csr_matrix k: assembled matrix
+        :param LinearStaticSolver solver: solver providing settings of factorization
+        :rtype: DenseFactorization | SparseLUFactorization | BandedCholeskyFactorization | PreconditionedCGSolution
+        """
+        if solver.linearSolver == 'pcg' or not self.sparse:
+            return solver.factorize(k)
+        if solver.factorizationType == 'banded' or (solver.factorizationType == 'auto' and self.bandwidth <= solver.bandwidthThreshold):
+            try:
+                return BandedCholeskyFactorization(k,self.bandwidth)
+            except linalg.LinAlgError:
+                # not positive definite, let LU decide about singularity
+                pass
+        # fill-reducing ordering is computed for the first matrix only
+        ret = SparseLUFactorization(k,self.ordering)
+        if self.ordering is None:
+            self.ordering = ret.giveOrdering()
+        return ret
+
+
+class ResultStore:
+    """Results of all load cases stored as columns of single Fortran ordered array, dictionary like access by load case labels gives views of the columns
+    
+    :param [str] labels: load case labels, one for each column
+    :param int|np.array(2d) data: number of rows (the array is filled by zeros) or (ndofs,nlc) array to be copied
+    """
+
+    labels = None
+    """*([str])* load case labels in order of columns"""
+    index = None
+    """*(dict)* column index of each load case label"""
+    data = None
+    """*(np.array(2d))* (ndofs,nlc) array of results in Fortran order"""
+
+    def __init__(self, labels, data=0):
+        self.labels = list(labels)
+        self.index = dict((label,i) for i,label in enumerate(self.labels))
+        if isinstance(data,int):
+            self.data = zeros((data,len(self.labels)), order='F')
+        else:
+            self.data = array(data, dtype=float, order='F')
+
+    def __getitem__(self, label):
+        return self.data[:,self.index[label]]
+
+    def __setitem__(self, label, value):
+        if label not in self.index:
+            self.index[label] = len(self.labels)
+            self.labels.append(label)
+            self.data = asfortranarray(hstack((self.data,zeros((self.data.shape[0],1)))))
+        self.data[:,self.index[label]] = value
+
+    def __contains__(self, label):
+        return label in self.index
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def keys(self):
+        return list(self.labels)
+
+    def values(self):
+        return [self[label] for label in self.labels]
+
+    def items(self):
+        return [(label,self[label]) for label in self.labels]
+
+    def get(self, label, default=None):
+        return self[label] if label in self.index else default
+
+    def appendColumns(self, labels, data):
+        """Appends several columns at once
+        
+        :param [str] labels: labels of new columns
+        :param np.array(2d) data: (ndofs,len(labels)) values of new columns
+        """
+        for label in labels:
+            self.index[label] = len(self.labels)
+            self.labels.append(label)
+        self.data = asfortranarray(hstack((self.data,data)))
+
+
+class Envelope:
+    """Minimum and maximum of values over several load cases or load combinations together with labels of the governing ones
+    
+    :param np.array values: values, the last axis runs over load cases
+    :param [str] labels: labels of load cases, one for each value of the last axis
+    """
+
+    min = None
+    """*(np.array)* minimum values"""
+    max = None
+    """*(np.array)* maximum values"""
+    minLabels = None
+    """*(np.array)* labels of load cases giving minimum values"""
+    maxLabels = None
+    """*(np.array)* labels of load cases giving maximum values"""
+
+    def __init__(self, values=None, labels=None):
+        if values is not None:
+            self.update(values, labels)
+
+    def update(self, values, labels):
+        """Updates receiver by values of further load cases
+        
+        :param np.array values: values, the last axis runs over load cases
+        :param list labels: labels of load cases, one for each value of the last axis
+        """
+        labels = array(list(labels), dtype=object)
+        imin = values.argmin(axis=-1)
+        imax = values.argmax(axis=-1)
+        vmin = take_along_axis(values, imin[...,newaxis], axis=-1)[...,0]
+        vmax = take_along_axis(values, imax[...,newaxis], axis=-1)[...,0]
+        if self.min is None:
+            self.min,self.max = vmin,vmax
+            self.minLabels,self.maxLabels = labels[imin],labels[imax]
+            return
+        lower = vmin < self.min
+        higher = vmax > self.max
+        self.min = where(lower, vmin, self.min)
+        self.max = where(higher, vmax, self.max)
+        self.minLabels = where(lower, labels[imin], self.minLabels)
+        self.maxLabels = where(higher, labels[imax], self.maxLabels)
+
+
+class InfluenceLine:
+    """Influence line of a response quantity, i.e. values of the quantity due to unit force moving along given elements (see :py:meth:`LinearStaticSolver.computeInfluenceLine`)
+    
+    :param str label: description of response quantity
+    :param [Element] elems: elements along which the unit force moves
+    :param np.array(2d) x: (nelem,nst) distances of stations (positions of unit force) from the first nodes of elements
+    :param np.array(2d) values: (nelem,nst) values of response quantity
+    :param str dir: direction of unit force ('X', 'Z', 'Local X' or 'Local Z')
+    """
+
+    label = None
+    """*(str)* description of response quantity"""
+    elems = None
+    """*([Element])* elements along which the unit force moves"""
+    x = None
+    """*(np.array(2d))* (nelem,nst) distances of stations from the first nodes of elements"""
+    values = None
+    """*(np.array(2d))* (nelem,nst) values of response quantity"""
+    dir = None
+    """*(str)* direction of unit force"""
+
+    def __init__(self, label, elems, x, values, dir='Z'):
+        self.label = label
+        self.elems = list(elems)
+        self.x = x
+        self.values = values
+        self.dir = dir
+
+    def giveCoords(self):
+        """Returns (nelem,nst,3) global coordinates of stations
+        
+        :rtype: np.array(3d)
+        """
+        c1 = array([elem.nodes[0].coords for elem in self.elems], dtype=float).reshape(-1,1,3)
+        c2 = array([elem.nodes[1].coords for elem in self.elems], dtype=float).reshape(-1,1,3)
+        l = sqrt(((c2-c1)**2).sum(axis=2))
+        return c1 + (c2-c1)*(self.x[:,:,newaxis]/l[:,:,newaxis])
+
+    def exportCsv(self, fileName):
+        """Writes stations and values to csv file (element label, distance, global coordinates, value). Returns 0 if successful, 1 otherwise
+        
+        :param str fileName: name of file
+        :rtype: bool
+        """
+        try:
+            f = open(fileName,'w')
+            f.write('# %s, unit force in direction %s\n'%(self.label,self.dir))
+            f.write('element,x,X,Y,Z,value\n')
+            coords = self.giveCoords()
+            for elem,x,xyz,values in zip(self.elems,self.x,coords,self.values):
+                for i in range(len(x)):
+                    f.write('%s,%.10g,%.10g,%.10g,%.10g,%.10g\n'%(elem.label,x[i],xyz[i,0],xyz[i,1],xyz[i,2],values[i]))
+            f.close()
+            return 0
+        except IOError:
+            return 1
+
+
+class BeamDiagrams:
+    """Local displacements u, w and internal forces N, V, M of :py:class:`Beam2d` elements sampled at stations for any displacement vector (e.g. eigen mode) and load case
+
+    :param Domain domain: domain
+    :param np.array r: displacements of all DOFs
+    :param LoadCase|CombinedLoadCase loadCase: load case with element loads acting on elements, no element loads if None
+    :param [Element] elems: elements, all :py:class:`Beam2d` elements of domain if None
+    :param int nseg: number of uniform segments
+    :param tuple endValues: precomputed elements, local end forces and local end displacements containing all sampled elements (see :py:meth:`LinearStaticSolver.giveEndValues`), they are computed from r if None
+    """
+
+    elems = None
+    """*([Beam2d])* sampled elements"""
+    index = None
+    """*(dict)* row index of each element"""
+    x = None
+    """*(np.array(2d))* (nelem,nst) distances of stations from the first nodes"""
+    u = None
+    """*(np.array(2d))* (nelem,nst) local axial displacements"""
+    w = None
+    """*(np.array(2d))* (nelem,nst) local deflections"""
+    n = None
+    """*(np.array(2d))* (nelem,nst) normal forces"""
+    v = None
+    """*(np.array(2d))* (nelem,nst) shear forces"""
+    m = None
+    """*(np.array(2d))* (nelem,nst) bending moments"""
+    labelMask = None
+    """*(np.array(2d))* (nelem,nst) True for stations, where values should be plotted (ends and both sides of point forces)"""
+    fe = None
+    """*(np.array(2d))* (nelem,6) local end forces"""
+    re = None
+    """*(np.array(2d))* (nelem,6) local end displacements"""
+
+    def __init__(self, domain, r, loadCase=None, elems=None, nseg=20, endValues=None):
+        if elems is None:
+            elems = [elem for elem in domain.elements.values() if isinstance(elem,Beam2d)]
+        self.elems = list(elems)
+        self.index = dict( (elem,i) for i,elem in enumerate(self.elems) )
+        nelem = len(self.elems)
+        if nelem == 0:
+            self.x = self.u = self.w = self.n = self.v = self.m = zeros((0,nseg+1))
+            self.labelMask = zeros((0,nseg+1), dtype=bool)
+            self.fe = self.re = zeros((0,6))
+            return
+        stack = Beam2dStack(self.elems)
+        l = stack.l
+        loads = [load for load in (loadCase.elementLoads.values() if loadCase else []) if load.where in self.index]
+        q = zeros((nelem,2))
+        f = zeros((nelem,6))
+        ie = zeros(0, dtype=int)
+        a = px = pz = zeros(0)
+        if loads:
+            ie = array([self.index[load.where] for load in loads], dtype=int)
+            loaded = Beam2dStack([load.where for load in loads])
+            # temperature changes contribute by end forces only, they do not deflect doubly clamped beam
+            add.at(f, ie, loaded.computeFixedEndForces(loads))
+            qx,qz,px,pz,a = loaded.computeLocalLoads(loads)
+            add.at(q, (ie,0), qx)
+            add.at(q, (ie,1), qz)
+            sel = nonzero((px!=0.)|(pz!=0.))[0]
+            ie,a,px,pz = ie[sel],a[sel],px[sel],pz[sel]
+        if endValues is None:
+            self.fe,self.re = stack.computeEndValues(r, f)
+        else:
+            index = dict( (elem,i) for i,elem in enumerate(endValues[0]) )
+            rows = [index[elem] for elem in self.elems]
+            self.fe,self.re = endValues[1][rows],endValues[2][rows]
+        # uniform stations and both sides of point forces, padded by end stations
+        extra = [[] for i in range(nelem)]
+        for i,ai in zip(ie,a):
+            extra[i] += [ai, min(ai+1.e-9*l[i],l[i])]
+        npad = max(len(e) for e in extra)
+        x = hstack(( l[:,newaxis]*linspace(0.,1.,nseg+1), array([e+[li]*(npad-len(e)) for e,li in zip(extra,l)]).reshape(nelem,npad) ))
+        x.sort(axis=1)
+        self.x = x
+        # labels at ends and both sides of point forces, duplicate stations are labelled once
+        mask = zeros(x.shape, dtype=bool)
+        mask[:,0] = mask[:,-1] = True
+        for i,ai in zip(ie,a):
+            mask[i] |= (x[i] == ai) | (x[i] == min(ai+1.e-9*l[i],l[i]))
+        mask[:,:-1] &= x[:,1:] != x[:,:-1]
+        self.labelMask = mask
+        # internal forces
+        n,v,m = stack.computeInternalForces(x, self.fe[:,:,newaxis], q[:,:,newaxis], (ie,a,px,pz,zeros(len(ie),dtype=int)))
+        self.n,self.v,self.m = n[:,:,0],v[:,:,0],m[:,:,0]
+        # displacements from end displacements, uniform load and point forces of doubly clamped beams
+        xl = x/l[:,newaxis]
+        uw = einsum('nsij,nj->nsi', beam2dShapeFunctionsKernel(xl, l[:,newaxis]), self.re)
+        self.u,self.w = uw[:,:,0],uw[:,:,1]
+        ea,eiy = stack.e*stack.a,stack.e*stack.iy
+        self.w += (q[:,1]*l**4/eiy)[:,newaxis]*(xl**4/24.-xl**3/12.+xl*xl/24.)
+        if len(ie):
+            add.at(self.w, ie, beam2dForceDeflectionKernel(x[ie], l[ie], a, pz, eiy[ie]))
+            b = l[ie]-a
+            xx,aa = x[ie],a[:,newaxis]
+            add.at(self.u, ie, where(xx < aa, (b/l[ie]*px)[:,newaxis]*xx, (b/l[ie]*px*a)[:,newaxis] - (a/l[ie]*px)[:,newaxis]*(xx-aa))/ea[ie][:,newaxis])
+
+    def give(self, elem):
+        """Returns distances of stations, u, w, N, V, M and label mask of given element as rows of arrays
+
+        :param Beam2d elem: element
+        :rtype: (np.array,np.array,np.array,np.array,np.array,np.array,np.array)
+        """
+        i = self.index[elem]
+        return self.x[i],self.u[i],self.w[i],self.n[i],self.v[i],self.m[i],self.labelMask[i]
+
+    def giveMaxDisplacement(self):
+        """Returns maximum absolute value of local displacements u and w
+
+        :rtype: float
+        """
+        return max(abs(self.u).max(),abs(self.w).max()) if self.u.size else 0.
+
+    def giveMaxInternalForce(self):
+        """Returns maximum absolute value of internal forces N, V and M
+
+        :rtype: float
+        """
+        return max(abs(self.n).max(),abs(self.v).max(),abs(self.m).max()) if self.n.size else 0.
+
+
+class MovingLoad:
+    """Train of point forces (e.g. vehicle axles) moving along a chain of :py:class:`Beam2d` elements, its position is path coordinate of the leading force
+    
+    :param [float] forces: magnitudes of forces, the leading one first
+    :param [float] spacing: distances between consecutive forces
+    :param [Element] path: chain of elements, each one connected to the previous one
+    :param str dir: direction of forces ('X', 'Z', 'Local X' or 'Local Z')
+    """
+
+    forces = None
+    """*(np.array)* magnitudes of forces"""
+    offsets = None
+    """*(np.array)* distances of forces behind the leading one"""
+    path = None
+    """*([Element])* chain of elements"""
+    forward = None
+    """*(np.array)* True for elements oriented along the path, False for reversed ones"""
+    start = None
+    """*(np.array)* path coordinates of starts of elements"""
+    dir = None
+    """*(str)* direction of forces"""
+
+    def __init__(self, forces, spacing, path, dir='Z'):
+        self.forces = array(forces, dtype=float).ravel()
+        spacing = array(spacing, dtype=float).ravel()
+        if len(spacing) != len(self.forces)-1 or (spacing < 0.).any():
+            logger.error( langStr('Wrong spacing of moving forces', 'Chybné vzdálenosti pohyblivých sil') )
+            raise EduBeamError
+        self.offsets = concatenate(([0.],cumsum(spacing)))
+        self.path = list(path)
+        self.dir = dir
+        self.forward = ones(len(self.path), dtype=bool)
+        for i,elem in enumerate(self.path):
+            if not isinstance(elem,Beam2d):
+                logger.error( langStr('Moving load is supported only on Beam2d elements', 'Pohyblivé zatížení je podporováno pouze na prvcích Beam2d') )
+                raise EduBeamError
+            if i == 0:
+                self.forward[i] = len(self.path) == 1 or elem.nodes[1] in self.path[1].nodes
+                end = elem.nodes[1] if self.forward[i] else elem.nodes[0]
+            elif end in elem.nodes:
+                self.forward[i] = elem.nodes[0] is end
+                end = elem.nodes[1] if self.forward[i] else elem.nodes[0]
+            else:
+                logger.error( langStr('Element %s is not connected to previous element of path', 'Prvek %s nenavazuje na předchozí prvek dráhy') % elem.label )
+                raise EduBeamError
+        lengths = array([elem.computeLength() for elem in self.path], dtype=float)
+        self.start = concatenate(([0.],cumsum(lengths)[:-1]))
+
+    def giveLength(self):
+        """Returns length of path
+        
+        :rtype: float
+        """
+        return self.start[-1] + self.path[-1].computeLength()
+
+    def givePositions(self, step):
+        """Returns positions of the train from entering to leaving the path
+        
+        :param float step: distance of positions
+        :rtype: np.array
+        """
+        return arange(0., self.giveLength()+self.offsets[-1]+0.5*step, step)
+
+    def givePointForces(self, positions):
+        """Returns indices of positions col, indices of elements in path ie, distances from the first nodes a and magnitudes f of forces acting on the path
+        
+        :param np.array positions: positions of the train
+        :rtype: (np.array,np.array,np.array,np.array)
+        """
+        sp = asarray(positions, dtype=float)[:,newaxis] - self.offsets[newaxis,:]
+        col,k = nonzero((sp >= 0.) & (sp <= self.giveLength()))
+        sp = sp[col,k]
+        ie = clip(searchsorted(self.start, sp, side='right')-1, 0, len(self.path)-1)
+        lengths = array([elem.computeLength() for elem in self.path], dtype=float)
+        t = minimum(sp-self.start[ie], lengths[ie])
+        a = where(self.forward[ie], t, lengths[ie]-t)
+        return col, ie, a, self.forces[k]
+
+    def giveLocalDirections(self):
+        """Returns local components (px,pz) of unit force in direction :py:attr:`dir` for each element of path
+        
+        :rtype: (np.array,np.array)
+        """
+        geom = array([elem.computeGeom() for elem in self.path], dtype=float).reshape(-1,3)
+        c,s = geom[:,1]/geom[:,0],geom[:,2]/geom[:,0]
+        n = len(self.path)
+        return {'X':(c,-s), 'Z':(s,c), 'Local X':(ones(n),zeros(n)), 'Local Z':(zeros(n),ones(n))}[self.dir]
+
+    def giveElementLoads(self, position):
+        """Returns forces of the train at given position as point element loads, which are not added to any load case
+        
+        :param float position: position of the train
+        :rtype: [ElementLoad]
+        """
+        col,ie,a,f = self.givePointForces([position])
+        px,pz = self.giveLocalDirections()
+        ret = []
+        for i,(j,aj,fj) in enumerate(zip(ie,a,f)):
+            elem = self.path[j]
+            l,dx,dz = elem.computeGeom()
+            c,s = dx/l,dz/l
+            fx,fz = fj*(c*px[j]-s*pz[j]),fj*(s*px[j]+c*pz[j])
+            ret.append(ElementLoad(label='moving_%d'%(i+1), where=elem, value=dict(type='Force',dir=self.dir,magnitude=0.,perX=False,Fx=fx,Fz=fz,DistF=aj,dTc=0.,dTg=0.)))
+        return ret
+
+
+class LinearStaticSolver(Solver):
+    """Class for solving linear elasticity
+    
+    :param str label: string label of receiver
+    """
+
+    domain = None
+    """*(Domain)* domain being solved"""
+    neq = None
+    """*(int)* number of equations (free dofs)"""
+    pneq = None
+    """*(int)* number of prescribed dofs"""
+    r = None
+    """*(ResultStore)* displacement vectors for each load case (indexed by load cases labels)"""
+    f = None
+    """*(ResultStore)* load vectors (including reactions) for each load case (indexed by load cases labels)"""
+    dofNames = None
+    """*(dict)* disctionary of dof names"""
+    denseThreshold = 100
+    """*(int)* models with less equations are assembled and solved as dense matrices"""
+    factorization = None
+    """*(DenseFactorization|SparseLUFactorization|BandedCholeskyFactorization)* factorized kuu matrix of the last solution"""
+    equationOrdering = 'auto'
+    """*(str)* ordering of nodes for equation numbering, 'natural' (order of domain.nodes), 'rcm' (Reverse Cuthill-McKee) or 'auto' (rcm for models solved by sparse solver)"""
+    factorizationType = 'auto'
+    """*(str)* factorization of sparse kuu, 'sparse' (sparse LU), 'banded' (banded Cholesky) or 'auto' (banded if bandwidth <= bandwidthThreshold)"""
+    bandwidthThreshold = 100
+    """*(int)* maximum bandwidth of kuu for banded factorization in 'auto' mode"""
+    stiffnessKey = None
+    """*(tuple)* fingerprint of the model topology (see :py:meth:`giveStiffnessKey`) for which equations are numbered and :py:attr:`factorization` is valid"""
+    elementKeys = None
+    """*(dict)* fingerprints of elements (see :py:meth:`giveStiffnessKey`) :py:attr:`factorization` is valid for"""
+    elementStiffness = None
+    """*(dict)* global stiffness matrices of elements assembled to :py:attr:`kuu`, :py:attr:`kpp` and :py:attr:`kup`"""
+    incrementalReanalysis = True
+    """*(bool)* if True, stiffness changes of few elements are applied as low-rank update of :py:attr:`factorization` (see :py:class:`LowRankUpdatedFactorization`)"""
+    maxUpdateRank = 60
+    """*(int)* maximum number of equations affected by accumulated low-rank updates, full refactorization is performed above it"""
+    kuu = None
+    """*(np.array(2d)|scipy.sparse.csr_matrix)* assembled stiffness matrix (free-free DOFs) belonging to :py:attr:`factorization`"""
+    kpp = None
+    """*(np.array(2d)|scipy.sparse.csr_matrix)* assembled stiffness matrix (prescribed-prescribed DOFs) belonging to :py:attr:`factorization`"""
+    kup = None
+    """*(np.array(2d)|scipy.sparse.csr_matrix)* assembled stiffness matrix (free-prescribed DOFs) belonging to :py:attr:`factorization`"""
+    linearSolver = 'direct'
+    """*(str)* solution method of linear system, 'direct' (factorization) or 'pcg' (see :py:class:`PreconditionedCGSolution`)"""
+    preconditioner = 'jacobi'
+    """*(str)* preconditioner of 'pcg' method, 'jacobi' or 'ilu' (incomplete factorization)"""
+    tolerance = 1.e-10
+    """*(float)* required relative residual norm of 'pcg' method"""
+    maxIterations = None
+    """*(int)* maximum number of iterations of 'pcg' method, 10 times number of equations if None"""
+    warmStart = True
+    """*(bool)* if True, 'pcg' iterations of each load case start from its previous solution (if equations were not renumbered)"""
+    iterations = None
+    """*(dict)* number of 'pcg' iterations of the last solution for each load case"""
+    residuals = None
+    """*(dict)* relative residual norms of the last 'pcg' solution for each load case"""
+    loadMatrix = None
+    """*(np.array(2d))* (neq+pneq,nlc) matrix of nodal loads and equivalent nodal loads of element loads of the last solution, one column for each load case"""
+    influenceLine = None
+    """*(InfluenceLine)* the last computed influence line (see :py:meth:`computeInfluenceLine`), it is displayed in GUI until next solution"""
+    combinationMatrix = None
+    """*(np.array(2d))* (nlc,ncol) load factors of load cases in each column of :py:attr:`r` and :py:attr:`f`"""
+    timings = None
+    """*(dict)* wall times [s] of 'assembly', 'update', 'loads', 'factorization', 'solution' and 'postprocessing' of the last solution"""
+    solutionVersion = 0
+    """*(int)* version of results incremented by each solution and reset, results cached for the solution (see :py:meth:`giveEndValues`) are valid while it does not change"""
+    endValues = None
+    """*(dict)* end values of load cases cached for :py:attr:`solutionVersion`, see :py:meth:`giveEndValues`"""
+
+    def __init__(self,label='linearstaticsolver'):
+        Solver.__init__(self,label=label)
+        self.reset()
+        self.neq = 0
+        self.pneq = 0
+
+    def reset(self):
+        Solver.reset(self)
+        self.resultsChanged()
+
+    def resultsChanged(self):
+        """Discards results cached for the previous solution (see :py:meth:`giveEndValues`)"""
+        self.solutionVersion += 1
+        self.endValues = {}
+
+    def solve(self,domain=None):
+        """Solves the domain
+        
+        :param Domain domain: domain to be solved
+        :rtype: bool
+        """
+        if not domain:
+            if not self.session or not self.session.domain:
+                logger.error( langStr('LinearStaticSolver: No domain to solve...', 'Žádná síť pro řešení...') )
+                return 1
+        self.domain = domain if domain else self.session.domain
+        self.influenceLine = None
+        self.timings = dict( (key,0.) for key in ('assembly','update','loads','factorization','solution','postprocessing') )
+        t = time.time()
+        # numbering, stiffness matrix and its factorization are reused if only loads were changed
+        key,elementKeys = self.giveStiffnessKey()
+        renumbered = key != self.stiffnessKey
+        if renumbered or self.factorization is None:
+            self.stiffnessKey = None
+            self.factorization = None
+            # number equations first
+            self.numberEquations()
+            #assemble the system
+            #assemble stiffness
+            kuu,kpp,kup = self.assembleStiffnessMatrix()
+            #check a near zero element in the stiffness matrix on the diagonal
+            if self.checkStiffnessMatrixDiagonal(kuu):
+                return 1
+            self.kuu,self.kpp,self.kup = kuu,kpp,kup
+            self.stiffnessKey = key
+            self.timings['assembly'] = time.time()-t
+        else:
+            changed = [elem for elem in self.domain.elements.values() if elementKeys[elem] != self.elementKeys.get(elem)]
+            if changed and self.updateStiffnessMatrix(changed):
+                return 1
+            self.timings['update'] = time.time()-t
+        self.elementKeys = elementKeys
+        t = time.time()
+        # assemble load vectors
+        f = self.assembleLoadVectors()
+        # set prescribed displacement
+        r = self.assembleDsplVectors()
+        self.timings['loads'] = time.time()-t
+        
+        # actual solving
+        t = time.time()
+        x0 = self.giveInitialGuess() if self.linearSolver == 'pcg' and not renumbered else None
+        if self.solveLoadCases(self.kuu,self.kpp,self.kup,r,f,x0):
+            return 1
+        self.timings['solution'] = time.time()-t-self.timings['factorization']
+        t = time.time()
+        self.r,self.f = r,f
+        # subtract non-nodal (continuous force and temperature loads)
+        self.subtractForcesInReactions()
+        self.combineResults()
+        self.resultsChanged()
+        self.timings['postprocessing'] = time.time()-t
+        #check if huge displacements exist, which points to nearly singular stiffness matrix
+        if self.checkHugeDisplacements():
+            return 1
+        logger.info( langStr('Solution finished successfully', 'Úloha úspěšně vyřešena') )
+        return 0
+
+    def solveLoadCases(self,kuu,kpp,kup,r,f,x0=None):
+        """Solves all load cases at once, kuu is factorized only if there is no valid :py:attr:`factorization`, displacements and reactions are written to r and f
+
+        :param ResultStore r: displacements with prescribed values in supported DOFs
+        :param ResultStore f: loads in free DOFs
+        :param np.array(2d) x0: initial guess of free displacements (one column for each load case) for iterative solution
+        :rtype: bool
+        """
+        lcLabels = r.labels
+        ru,rp = r.data[:self.neq],r.data[self.neq:]
+        fu,fp = f.data[:self.neq],f.data[self.neq:]
+        rhs = fu - kup.dot(rp)
+        try:
+            if self.neq>0:
+                if self.factorization is None:
+                    t = time.time()
+                    self.factorization = self.factorize(kuu)
+                    if self.timings is not None:
+                        self.timings['factorization'] = time.time()-t
+                if isinstance(self.factorization,PreconditionedCGSolution):
+                    rulc = self.factorization.solve(rhs,x0,self.tolerance,self.maxIterations)
+                    self.iterations = dict(zip(lcLabels,self.factorization.iterations.tolist()))
+                    self.residuals = dict(zip(lcLabels,self.factorization.residuals.tolist()))
+                    for lcLabel in lcLabels:
+                        logger.info( langStr('Load case %s: %d iterations, relative residual %g', 'Zatěžovací stav %s: %d iterací, relativní reziduum %g') % (lcLabel,self.iterations[lcLabel],self.residuals[lcLabel]) )
+                else:
+                    rulc = self.factorization.solve(rhs)
+            else:
+                rulc = zeros((0,len(lcLabels)))
+            self.isSolved = True
+        except (ValueError,RuntimeError,linalg.LinAlgError) as e:
+            if isinstance(self.factorization,PreconditionedCGSolution):
+                logger.error( str(e) )
+            logger.error( langStr('Solution of linear system failed, wrong boundary conditions (supports)?', 'Řešení lineárního systému selhalo, chybně zadané okrajové podmínky (podpory)?') )
+            self.factorization = None
+            self.stiffnessKey = None
+            self.isSolved = False
+            return 1
+        ru[:] = rulc
+        if self.pneq > 0:
+            fp[:] = kup.transpose().dot(ru) + kpp.dot(rp)
+        return 0
+
+    def giveLoadKey(self):
+        """Returns fingerprint of loads, prescribed displacements and load combinations, complementary to :py:meth:`giveStiffnessKey`
+        
+        :rtype: tuple
+        """
+        lcs = []
+        for lc in self.domain.loadCases.values():
+            loads = []
+            for container in (lc.nodalLoads,lc.elementLoads,lc.prescribedDspls):
+                for load in container.values():
+                    where = load.where
+                    # material and cross section data of loaded elements affect temperature loads
+                    data = (where.mat.alpha,where.cs.h) if isinstance(load,ElementLoad) else ()
+                    loads.append( (load.__class__,load.label,id(where),tuple(sorted(load.value.items())),data) )
+            lcs.append( (lc.label,tuple(loads)) )
+        combs = tuple( (comb.label,tuple(sorted(comb.factors.items())),tuple(tuple(group) for group in comb.groups)) for comb in self.domain.loadCombinations.values() )
+        return tuple(lcs),combs
+
+    def giveStiffnessKey(self):
+        """Returns fingerprint of topology and solver settings and dictionary of element fingerprints, which the equation numbering and stiffness matrix depend on
+        
+        :rtype: (tuple,dict)
+        """
+        nodes = tuple( (id(node),node.label,tuple(node.bcs.get(dof,False) for dof in self.domain.dofsNames)) for node in self.domain.nodes.values() )
+        elems = tuple( (id(elem),tuple(id(n) for n in elem.nodes)) for elem in self.domain.elements.values() )
+        settings = (self.domain.type,self.denseThreshold,self.equationOrdering,self.factorizationType,self.bandwidthThreshold,self.linearSolver,self.preconditioner)
+        elementKeys = dict( (elem,(elem.__class__,tuple(tuple(n.coords) for n in elem.nodes),elem.mat.e,elem.mat.g,elem.cs.a,elem.cs.iy,elem.cs.k,elem.cs.j,tuple(elem.hinges))) for elem in self.domain.elements.values() )
+        return (settings,nodes,elems),elementKeys
+
+    def updateStiffnessMatrix(self,elems):
+        """Updates assembled stiffness matrices and their factorization after stiffness change of given elements. Returns False if successful, True otherwise
+        
+        :param [Element] elems: elements with changed stiffness
+        :rtype: bool
+        """
+        neq = self.neq
+        sparse = SP is not None and SP.issparse(self.kuu)
+        oldStiffness = [self.elementStiffness[elem] for elem in elems]
+        rows,cols,vals = self.giveStiffnessTriplets(elems)
+        updates = []
+        for elem,kold in zip(elems,oldStiffness):
+            loc = array(elem.giveLocationArray())
+            dk = self.elementStiffness[elem] - kold
+            if not sparse:
+                u = loc < neq
+                p = ~u
+                self.kuu[ix_(loc[u],loc[u])] += dk[ix_(u,u)]
+                self.kup[ix_(loc[u],loc[p]-neq)] += dk[ix_(u,p)]
+                self.kpp[ix_(loc[p]-neq,loc[p]-neq)] += dk[ix_(p,p)]
+            u = loc < neq
+            if u.any():
+                updates.append((loc[u].tolist(),dk[ix_(u,u)]))
+        if sparse:
+            ndofs = neq+self.pneq
+            vals = vals - concatenate([kold.ravel() for kold in oldStiffness])
+            dk = SP.coo_matrix((vals,(rows,cols)), shape=(ndofs,ndofs)).tocsr()
+            self.kuu = self.kuu + dk[:neq,:neq]
+            self.kpp = self.kpp + dk[neq:,neq:]
+            self.kup = self.kup + dk[:neq,neq:]
+        if self.checkStiffnessMatrixDiagonal(self.kuu):
+            self.factorization = None
+            self.stiffnessKey = None
+            return 1
+        # low-rank (Woodbury) update if the accumulated change affects at most maxUpdateRank equations
+        factorization = self.factorization
+        if self.incrementalReanalysis and not isinstance(factorization,PreconditionedCGSolution):
+            if not isinstance(factorization,LowRankUpdatedFactorization):
+                factorization = LowRankUpdatedFactorization(factorization,neq)
+            dofs = set(factorization.dofs)
+            for loc,dk in updates:
+                dofs.update(loc)
+            if len(dofs) <= self.maxUpdateRank:
+                try:
+                    for loc,dk in updates:
+                        factorization.update(loc,dk)
+                    self.factorization = factorization
+                    return 0
+                except (ValueError,RuntimeError,linalg.LinAlgError):
+                    # updated matrix is singular or update is ill-conditioned, try refactorization
+                    pass
+        # refactorization of already updated matrix in solveLoadCases
+        self.factorization = None
+        return 0
+
+    def factorize(self,kuu):
+        """Returns factorized kuu (see :py:attr:`factorizationType`), only the preconditioner is prepared for :py:attr:`linearSolver` 'pcg'
+
+        :param np.array(2d)|scipy.sparse.spmatrix kuu: matrix to be factorized
+        :rtype: DenseFactorization | SparseLUFactorization | BandedCholeskyFactorization | PreconditionedCGSolution
+        """
+        if self.linearSolver == 'pcg':
+            return PreconditionedCGSolution(kuu,self.preconditioner)
+        if SP is not None and SP.issparse(kuu):
+            if self.factorizationType in ('auto','banded'):
+                bandwidth = self.giveBandwidth(kuu)
+                if self.factorizationType == 'banded' or bandwidth <= self.bandwidthThreshold:
+                    try:
+                        return BandedCholeskyFactorization(kuu,bandwidth)
+                    except linalg.LinAlgError:
+                        # not positive definite, let LU decide about singularity
+                        pass
+            return SparseLUFactorization(kuu)
+        return DenseFactorization(kuu)
+
+    def giveSolveFunction(self,k):
+        """Returns function solving system with given matrix for one right hand side, see :py:meth:`factorize`
+        
+        :param np.array(2d)|scipy.sparse.csr_matrix k: system matrix
+        :rtype: function
+        """
+        factorization = self.factorize(k)
+        if isinstance(factorization,PreconditionedCGSolution):
+            return lambda rhs: factorization.solve(rhs,None,self.tolerance,self.maxIterations)
+        return factorization.solve
+
+    def giveInitialGuess(self):
+        """Returns free displacements of previous solution as initial guess of iterative solution, None if :py:attr:`warmStart` is not set or there is none
+
+        :rtype: np.array(2d) | None
+        """
+        if not self.warmStart or not self.r:
+            return None
+        lcLabels = self.domain.loadCases.keys()
+        # load cases not solved before start from zero
+        x0 = zeros((self.neq,len(lcLabels)))
+        for i,lcLabel in enumerate(lcLabels):
+            r = self.r.get(lcLabel)
+            if r is not None and len(r) == self.neq+self.pneq:
+                x0[:,i] = r[:self.neq]
+        return x0
+
+    def giveBandwidth(self,k):
+        """Returns (upper) bandwidth of given sparse matrix
+
+        :param scipy.sparse.spmatrix k: matrix
+        :rtype: int
+        """
+        k = k.tocoo()
+        if k.nnz == 0:
+            return 0
+        return int(abs(k.col-k.row).max())
+
+    def useSparseSolver(self):
+        """Returns True if the sparse assembly and solution should be used for current number of equations
+
+        :rtype: bool
+        """
+        return SP is not None and self.neq >= self.denseThreshold
+
+    def checkHugeDisplacements(self):
+        """TODO
+        
+        :rtype: bool
+        """
+        nodeProblems = []
+        absr = abs(self.r.data)
+        locProblems = nonzero((absr > 1.e+6).any(axis=1))[0].tolist()
+        MaxDisplacement = absr.max() if locProblems else 0.
+        for j in locProblems:
+            for node in self.domain.nodes.values():
+                if node.loc.count(j):
+                    if node.label not in nodeProblems:
+                        nodeProblems.append(node.label)    
+        #
+        ret = 0
+        if locProblems:
+            nodeProblemsSorted = sorted(nodeProblems, key=lambda n: natural_key(n))
+            if session.glframe: # we are in GUI
+                from ebgui import wx
                 dlg = wx.MessageDialog(parent=None, message=(langStr('Huge displacement %g within nodes: %s. Could be missing supports. Do you agree with such huge displacements?', 'Velká deformace %g nalezena mezi uzly %s. Pravděpodobně chybné podepření. Schvalujete takovéto velké deformace?') % (MaxDisplacement, ', '.join(nodeProblemsSorted))), caption=(langStr('Huge displacements','Velké deformace')), style=wx.YES_NO|wx.NO_DEFAULT)
                 try:
                     result = dlg.ShowModal()
@@ -3476,59 +5831,490 @@ class LinearStaticSolver(Solver):
         """TODO
         
         """
-        for lc in self.domain.loadCases.values():
-            flc = self.f[lc.label]
-            #substract element loads in reactions
-            for load in lc.elementLoads.values():
-                (loc,value) = load.computeLoad(self.domain.type)
-                size = len(loc)
-                for i in range(size):
-                    ii = loc[i]
-                    if ii>=self.neq:
-                        flc[ii] -= value[i]
-            #substract nodal load acting in supported DOFs to account direct transfer of those into reaction force
-            for load in lc.nodalLoads.values():
-                (loc, value) = load.computeLoad(self.domain.type)
-                size = len(loc)
-                for i in range(size):
-                    ii=loc[i]
-                    if ii>=self.neq:
-                        flc[ii] -= value[i]
+        #substract element loads in reactions and nodal loads acting in supported DOFs to account direct transfer of those into reaction force
+        #both are in prescribed part of load matrix assembled before solution
+        self.f.data[self.neq:] -= self.loadMatrix[self.neq:]
 
-    def recoverDsplVector(self,ru,rp):
-        """TODO
+    def combineResults(self):
+        """Appends results of all variants of load combinations (see :py:meth:`Domain.giveCombinationMatrix`) to :py:attr:`r` and :py:attr:`f`
+        """
+        lcLabels = list(self.r.labels)
+        labels,c = self.domain.giveCombinationMatrix(lcLabels)
+        self.combinationMatrix = hstack((eye(len(lcLabels)),c))
+        # thanks to linearity, no equations are solved
+        if labels:
+            self.r.appendColumns(labels, self.r.data.dot(c))
+            self.f.appendColumns(labels, self.f.data.dot(c))
+        if isinstance(self.domain.activeLoadCase,CombinedLoadCase):
+            self.domain.activeLoadCase.update()
+
+    def giveColumns(self, labels=None):
+        """Returns labels and indices of columns of :py:attr:`r` and :py:attr:`f` belonging to given load cases or variants of load combinations
         
-        :param np.array ru: displacement vector of free DOFs
-        :param np.array rp: displacement vector of prescribed DOFs
+        :param [str] labels: labels of load cases or variants of load combinations, all of them if None
+        :rtype: ([str],np.array)
         """
-        self.r = {}
-        for lc in self.domain.loadCases.values():
-            rlc = zeros(self.neq+self.pneq)
-            rlc[0:self.neq] = ru[lc.label]
-            rlc[self.neq:self.pneq+self.neq] = rp[lc.label]
-            self.r[lc.label] = rlc
+        labels = list(self.r.labels) if labels is None else list(labels)
+        return labels, array([self.r.index[label] for label in labels], dtype=int)
 
-    def recoverLoadVector(self,fu,fp):
-        """TODO
+    def giveElementLoadGroups(self):
+        """Returns element loads of solved load cases and indices of their load cases (rows of :py:attr:`combinationMatrix`) grouped by element class
         
-        :param np.array fu: load vector of free DOFs
-        :param np.array fp: load vector of prescribed DOFs
+        :rtype: dict
         """
-        self.f = {}
-        for lc in self.domain.loadCases.values():
-            flc = zeros(self.neq+self.pneq)
-            flc[0:self.neq] = fu[lc.label]
-            flc[self.neq:self.pneq+self.neq] = fp[lc.label]
-            self.f[lc.label] = flc
+        groups = {}
+        for i,lcLabel in enumerate(self.r.labels[:self.combinationMatrix.shape[0]]):
+            lc = self.domain.loadCases.get(lcLabel)
+            if not lc:
+                continue
+            for load in lc.elementLoads.values():
+                loads,lcs = groups.setdefault(load.where.__class__,([],[]))
+                loads.append(load)
+                lcs.append(i)
+        return groups
+
+    def computeStackEndForces(self, stack, cols, groups):
+        """Returns (nelem,6,ncol) local end forces of elements of given stack in given columns of :py:attr:`r`
+        
+        :param ElementStack stack: elements
+        :param np.array cols: column indices
+        :param dict groups: element loads, see :py:meth:`giveElementLoadGroups`
+        :rtype: np.array(3d)
+        """
+        re = einsum('nij,njc->nic', stack.computeT(), self.r.data[:,cols][stack.loc])
+        fe = einsum('nij,njc->nic', stack.computeLocalStiffness(), re)
+        f = self.computeStackFixedEndForces(stack,cols,groups)
+        if f is not None:
+            fe += stack.condenseFixedEndForces(f)
+        return fe
+
+    def computeStackFixedEndForces(self, stack, cols, groups):
+        """Returns (nelem,6,ncol) local end forces of doubly clamped elements of given stack due to element loads in given columns of :py:attr:`r`, None if there are no element loads
+        
+        :param ElementStack stack: elements
+        :param np.array cols: column indices
+        :param dict groups: element loads, see :py:meth:`giveElementLoadGroups`
+        :rtype: np.array(3d)
+        """
+        loads,lcs = groups.get(stack.elems[0].__class__,([],[]))
+        if not loads:
+            return None
+        index = dict( (elem,i) for i,elem in enumerate(stack.elems) )
+        ie = array([index[load.where] for load in loads], dtype=int)
+        b = zeros((len(stack.elems),6,self.combinationMatrix.shape[0]))
+        add.at(b, (ie[:,newaxis],arange(6)[newaxis,:],array(lcs,dtype=int)[:,newaxis]), giveElementStacks([load.where for load in loads])[0].computeFixedEndForces(loads))
+        return b.dot(self.combinationMatrix[:,cols])
+
+    def computeStackEndValues(self, stack, col, groups):
+        """Returns (nelem,6) local end forces and end displacements of elements of given stack in given column of :py:attr:`r`
+        
+        :param ElementStack stack: elements
+        :param int col: column index
+        :param dict groups: element loads, see :py:meth:`giveElementLoadGroups`
+        :rtype: (np.array(2d),np.array(2d))
+        """
+        f = self.computeStackFixedEndForces(stack,[col],groups)
+        return stack.computeEndValues(self.r.data[:,col], None if f is None else f[:,:,0])
+
+    def giveEndValues(self, label=None):
+        """Returns elements, their (nelem,6) local end forces and end displacements for given load case, cached until the next solution (see :py:attr:`solutionVersion`)
+        
+        :param str label: label of load case or variant of load combination, the active one if None
+        :rtype: ([Element],np.array(2d),np.array(2d))
+        """
+        if label is None:
+            label = self.domain.activeLoadCase.label
+        if label not in self.endValues:
+            labels,cols = self.giveColumns([label])
+            groups = self.giveElementLoadGroups()
+            elems,fe,re = [],[zeros((0,6))],[zeros((0,6))]
+            for stack in giveElementStacks(self.domain.elements.values()):
+                f,r = self.computeStackEndValues(stack,cols[0],groups)
+                elems += stack.elems
+                fe.append(f)
+                re.append(r)
+            self.endValues[label] = (elems,concatenate(fe),concatenate(re))
+        return self.endValues[label]
+
+    def giveBeamDiagrams(self, nseg=20):
+        """Returns :py:class:`BeamDiagrams` of the active load case, end values are taken from cache (see :py:meth:`giveEndValues`)
+        
+        :param int nseg: number of uniform segments
+        :rtype: BeamDiagrams
+        """
+        lc = self.domain.activeLoadCase
+        return BeamDiagrams(self.domain, self.r[lc.label], lc, nseg=nseg, endValues=self.giveEndValues(lc.label))
+
+    def computeEndForces(self, labels=None):
+        """Returns elements and (nelem,6,ncol) array of their local end forces for given load cases or variants of load combinations at once, vectorized version of :py:meth:`Beam2d.computeEndForces`
+        
+        :param [str] labels: labels of load cases or variants of load combinations, all of them if None
+        :rtype: ([Element],np.array(3d))
+        """
+        labels,cols = self.giveColumns(labels)
+        groups = self.giveElementLoadGroups()
+        elems,ret = [],[]
+        for stack in giveElementStacks(self.domain.elements.values()):
+            elems += stack.elems
+            ret.append(self.computeStackEndForces(stack,cols,groups))
+        return elems, concatenate(ret) if ret else zeros((0,6,len(cols)))
+
+    def computeEndForceEnvelope(self, labels=None):
+        """Returns elements and :py:class:`Envelope` of their (nelem,6) local end forces over given load cases or variants of load combinations
+        
+        :param [str] labels: labels of load cases or variants of load combinations, all of them if None
+        :rtype: ([Element],Envelope)
+        """
+        labels,cols = self.giveColumns(labels)
+        elems,fe = self.computeEndForces(labels)
+        return elems, Envelope(fe,labels)
+
+    def computeReactionEnvelope(self, labels=None):
+        """Returns supported DOFs as list of (Node,dofName) and :py:class:`Envelope` of their reactions over given load cases or variants of load combinations
+        
+        :param [str] labels: labels of load cases or variants of load combinations, all of them if None
+        :rtype: ([(Node,str)],Envelope)
+        """
+        labels,cols = self.giveColumns(labels)
+        dofs,rows = [],[]
+        for node in self.domain.nodes.values():
+            for dof,loc in zip(self.domain.dofsNames,node.loc):
+                if loc >= self.neq:
+                    dofs.append((node,dof))
+                    rows.append(loc)
+        return dofs, Envelope(self.f.data[ix_(rows,cols)],labels)
+
+    def computeInternalForces(self, labels=None, nseg=20):
+        """Returns elements, (nelem,nst) distances of stations and (nelem,nst,ncol) normal forces, shear forces and bending moments for given load cases, None if failed
+        
+        :param [str] labels: labels of load cases or variants of load combinations, all of them if None
+        :param int nseg: number of uniform segments
+        :rtype: ([Element],np.array(2d),(np.array(3d),np.array(3d),np.array(3d)))|None
+        """
+        labels,cols = self.giveColumns(labels)
+        w = self.combinationMatrix[:,cols]
+        nlc = w.shape[0]
+        groups = self.giveElementLoadGroups()
+        stacks = giveElementStacks(self.domain.elements.values())
+        if [stack for stack in stacks if not stack.hasInternalForces]:
+            logger.error( langStr('Internal forces are not available for domain type %s', 'Vnitřní síly nejsou k dispozici pro typ úlohy %s') % self.domain.type )
+            return None
+        elems,xs,values = [],[],[]
+        for stack in stacks:
+            nelem = len(stack.elems)
+            loads,lcs = groups.get(stack.elems[0].__class__,([],[]))
+            q = zeros((nelem,2,nlc))
+            points = None
+            if loads:
+                index = dict( (elem,i) for i,elem in enumerate(stack.elems) )
+                ie = array([index[load.where] for load in loads], dtype=int)
+                lcs = array(lcs, dtype=int)
+                qx,qz,px,pz,a = giveElementStacks([load.where for load in loads])[0].computeLocalLoads(loads)
+                add.at(q, (ie,0,lcs), qx)
+                add.at(q, (ie,1,lcs), qz)
+                sel = nonzero((px!=0.)|(pz!=0.))[0]
+                points = (ie[sel],a[sel],px[sel],pz[sel],w[lcs[sel]])
+            # uniform stations and both sides of point forces, padded by end stations
+            extra = [[] for i in range(nelem)]
+            if points is not None:
+                for i,ai in zip(points[0],points[1]):
+                    extra[i] += [ai, min(ai+1.e-9*stack.l[i],stack.l[i])]
+            npad = max(len(e) for e in extra)
+            x = hstack(( stack.l[:,newaxis]*linspace(0.,1.,nseg+1), array([e+[l]*(npad-len(e)) for e,l in zip(extra,stack.l)]).reshape(nelem,npad) ))
+            x.sort(axis=1)
+            values.append(stack.computeInternalForces(x, self.computeStackEndForces(stack,cols,groups), q.dot(w), points))
+            elems += stack.elems
+            xs.append(x)
+        if not elems:
+            return [], zeros((0,nseg+1)), tuple(zeros((0,nseg+1,len(cols))) for i in range(3))
+        nst = max(x.shape[1] for x in xs)
+        x = concatenate([pad(x,((0,0),(0,nst-x.shape[1])),mode='edge') for x in xs])
+        return elems, x, tuple(concatenate([pad(v[i],((0,0),(0,nst-v[i].shape[1]),(0,0)),mode='edge') for v in values]) for i in range(3))
+
+    def computeInternalForceEnvelope(self, labels=None, nseg=20):
+        """Returns elements, distances of stations and {'N','V','M'} :py:class:`Envelope` of internal forces over given load cases, None if failed, see :py:meth:`computeInternalForces`
+        
+        :param [str] labels: labels of load cases or variants of load combinations, all of them if None
+        :param int nseg: number of uniform segments
+        :rtype: ([Element],np.array(2d),dict)|None
+        """
+        labels,cols = self.giveColumns(labels)
+        ret = self.computeInternalForces(labels,nseg)
+        if ret is None:
+            return None
+        elems,x,values = ret
+        if not elems:
+            return [], x, {}
+        return elems, x, dict( (key,Envelope(v,labels)) for key,v in zip(('N','V','M'),values) )
+
+    def computeInfluenceLine(self, type, where, index=None, elems=None, dir='Z', nseg=20):
+        """Computes influence line of given response quantity along given :py:class:`Beam2d` elements by reciprocal theorem. Returns :py:class:`InfluenceLine` (kept in :py:attr:`influenceLine`), None if failed
+        
+        :param str type: response quantity, 'reaction' (where is node, index is dof name), 'endForce' (where is element, index is local dof 0..5), 'N', 'V' or 'M' (where is element, index is distance from its first node)
+        :param Node|Element|str where: node or element of response quantity
+        :param str|int|float index: dof name, local dof or distance, see type
+        :param [Element|str] elems: elements along which the unit force moves, all elements if None
+        :param str dir: direction of unit force ('X', 'Z', 'Local X' or 'Local Z')
+        :param int nseg: number of uniform segments of each element
+        :rtype: InfluenceLine|None
+        """
+        if not self.isSolved or self.factorization is None and self.neq > 0:
+            logger.error( langStr('Problem has not been solved yet ...', 'Úloha ještě není vypočtena ...') )
+            return None
+        domain = self.domain
+        elems = [domain.giveElement(elem) for elem in elems] if elems else list(domain.elements.values())
+        if not elems or [elem for elem in elems if not isinstance(elem,Beam2d)]:
+            logger.error( langStr('Influence lines are supported only for Beam2d elements', 'Příčinkové čáry jsou podporovány pouze pro prvky Beam2d') )
+            return None
+        neq,ndofs = self.neq,self.neq+self.pneq
+        lam = zeros(ndofs)
+        target,coeffs = None,None
+        if type == 'reaction':
+            node = domain.giveNode(where)
+            loc = node.loc[domain.dofsNames.index(index)] if node and index in domain.dofsNames else -1
+            if loc < neq:
+                logger.error( langStr('Node %s is not supported in dof %s', 'Uzel %s není podepřen ve stupni volnosti %s') % (where,index) )
+                return None
+            # R = kpu*ru - fp
+            e = zeros(self.pneq)
+            e[loc-neq] = 1.
+            rhs = self.kup.dot(e)
+            lam[loc] = -1.
+            label = 'R%s %s'%(index,node.label)
+        elif type in ('endForce','N','V','M'):
+            target = domain.giveElement(where)
+            if not isinstance(target,Beam2d):
+                logger.error( langStr('Wrong element','Špatný prvek') )
+                return None
+            coeffs = zeros(6)
+            if type == 'endForce':
+                coeffs[int(index)] = 1.
+            elif type == 'N':
+                coeffs[0] = -1.
+            elif type == 'V':
+                coeffs[1] = -1.
+            else:
+                coeffs[1:3] = float(index),1.
+            # response = coeffs*(kl*t*re + fixed end forces)
+            g = zeros(ndofs)
+            g[target.giveLocationArray()] = dot(dot(coeffs,target.computeLocalStiffness()),target.computeT())
+            rhs = g[:neq]
+            label = '%s %s %s'%(type,target.label,index)
+        else:
+            logger.error( langStr('Unknown response quantity %s', 'Neznámá veličina %s') % type )
+            return None
+        # single adjoint system with the response quantity as right hand side, response due to unit force is its work on adjoint displacements
+        if neq > 0:
+            lam[:neq] = self.factorization.solve(rhs.reshape(neq,1))[:,0]
+        # stations, discontinuity of internal force at the point of response quantity is captured from both sides
+        stack = Beam2dStack(elems)
+        nelem = len(elems)
+        x = stack.l[:,newaxis]*linspace(0.,1.,nseg+1)
+        it = elems.index(target) if target in elems else None
+        if it is not None and type in ('N','V','M'):
+            xi = float(index)
+            extra = array([[max(xi-1.e-9*stack.l[it],0.),xi] if i == it else [l,l] for i,l in enumerate(stack.l)])
+            x = hstack((x,extra))
+            x.sort(axis=1)
+        # adjoint displacements in local cs, rotations released by hinges are recovered by static condensation
+        rl = einsum('nij,nj->ni', stack.computeT(), lam[stack.loc])
+        for i,elem in enumerate(elems):
+            if elem.hasHinges():
+                a,b,kab,kbbi = elem.giveCondensationOperators()
+                rl[i,b] = -dot(kbbi, dot(kab.transpose(), rl[i,a]))
+        c,s = stack.c,stack.s
+        px,pz = {'X':(c,-s), 'Z':(s,c), 'Local X':(ones(nelem),zeros(nelem)), 'Local Z':(zeros(nelem),ones(nelem))}[dir]
+        uw = einsum('nsij,nj->nsi', beam2dShapeFunctionsKernel(x/stack.l[:,newaxis],stack.l[:,newaxis]), rl)
+        values = px[:,newaxis]*uw[:,:,0] + pz[:,newaxis]*uw[:,:,1]
+        # local contribution of force acting on the element of the response quantity
+        if it is not None:
+            a = x[it]
+            nst = len(a)
+            fe = Beam2dStack([target]*nst).condenseFixedEndForces(beam2dForceLoadKernel(stack.l[it]*ones(nst),a,px[it]*ones(nst),pz[it]*ones(nst)))
+            values[it] += dot(fe,coeffs)
+            if type in ('N','V','M'):
+                d = float(index)-a
+                h = d > 0.
+                values[it] += {'N':-px[it]*h, 'V':-pz[it]*h, 'M':pz[it]*d*h}[type]
+        self.influenceLine = InfluenceLine(label,elems,x,values,dir)
+        return self.influenceLine
+
+    def computeMovingLoadEnvelope(self, movingLoad, step=None, nseg=20, chunkSize=256):
+        """Computes envelopes of internal forces 'N', 'V', 'M', deflections 'w' and reactions 'R' due to given moving load. Returns elements of path, distances of stations, dictionary of :py:class:`Envelope` and supported DOFs of 'R', None if failed
+        
+        :param MovingLoad movingLoad: moving load
+        :param float step: distance of positions of the train, distance of stations of the shortest element if None
+        :param int nseg: number of segments of each element
+        :param int chunkSize: number of positions solved at once
+        :rtype: ([Element],np.array(2d),dict,[(Node,str)])|None
+        """
+        if not self.isSolved or self.factorization is None and self.neq > 0:
+            logger.error( langStr('Problem has not been solved yet ...', 'Úloha ještě není vypočtena ...') )
+            return None
+        neq,ndofs = self.neq,self.neq+self.pneq
+        elems = movingLoad.path
+        stack = Beam2dStack(elems)
+        nelem = len(elems)
+        x = stack.l[:,newaxis]*linspace(0.,1.,nseg+1)
+        n = beam2dShapeFunctionsKernel(x/stack.l[:,newaxis],stack.l[:,newaxis])
+        t = stack.computeT()
+        kl = stack.computeLocalStiffness()
+        eiy = stack.e*stack.iy
+        hinged = [(i,elem.giveCondensationOperators()) for i,elem in enumerate(elems) if elem.hasHinges()]
+        dirx,dirz = movingLoad.giveLocalDirections()
+        dofs,rows = [],[]
+        for node in self.domain.nodes.values():
+            for dof,loc in zip(self.domain.dofsNames,node.loc):
+                if loc >= neq:
+                    dofs.append((node,dof))
+                    rows.append(loc)
+        positions = movingLoad.givePositions(step if step else stack.l.min()/nseg)
+        envelopes = dict( (key,Envelope()) for key in ('N','V','M','w','R') )
+        # each chunk of positions is one right hand side block solved by the last factorization, no load cases are created
+        for first in range(0,len(positions),chunkSize):
+            pos = positions[first:first+chunkSize]
+            nc = len(pos)
+            col,ie,a,f = movingLoad.givePointForces(pos)
+            px,pz = dirx[ie]*f,dirz[ie]*f
+            # fixed end forces of doubly clamped elements, one column for each position
+            b = zeros((nelem,6,nc))
+            add.at(b, (ie[:,newaxis],arange(6)[newaxis,:],col[:,newaxis]), beam2dForceLoadKernel(stack.l[ie],a,px,pz))
+            bc = stack.condenseFixedEndForces(b)
+            rhs = zeros((ndofs,nc))
+            add.at(rhs, stack.loc, -einsum('nji,njc->nic',t,bc))
+            r = zeros((ndofs,nc))
+            if neq > 0:
+                r[:neq] = self.factorization.solve(rhs[:neq])
+            # reactions, loads acting directly in supports are subtracted
+            fp = self.kup.transpose().dot(r[:neq]) - rhs[neq:]
+            envelopes['R'].update(fp[array(rows,dtype=int)-neq],pos)
+            re = einsum('nij,njc->nic',t,r[stack.loc])
+            fe = einsum('nij,njc->nic',kl,re) + bc
+            nn,vv,mm = stack.computeInternalForces(x,fe,zeros((nelem,2,nc)),(ie,a,px,pz,col))
+            envelopes['N'].update(nn,pos)
+            envelopes['V'].update(vv,pos)
+            envelopes['M'].update(mm,pos)
+            # deflections, rotations released by hinges are recovered from condensed equations
+            for i,(ia,ib,kab,kbbi) in hinged:
+                re[i,ib] = dot(kbbi, -b[i,ib] - dot(kab.transpose(),re[i,ia]))
+            defl = einsum('nsj,njc->nsc',n[:,:,1,:],re)
+            add.at(defl, (ie[:,newaxis],arange(nseg+1)[newaxis,:],col[:,newaxis]), beam2dForceDeflectionKernel(x[ie],stack.l[ie],a,pz,eiy[ie]))
+            envelopes['w'].update(defl,pos)
+        return elems, x, envelopes, dofs
+
+    def computeSensitivities(self, responses, variables=('e','a','iy')):
+        """Computes derivatives of given responses with respect to properties of individual elements (ordered as in domain.elements) by adjoint method. Returns (nresp,nelem,nvar) array, None if failed
+        
+        :param [tuple] responses: responses (type,where,index,loadCase), type is 'displacement' or 'reaction' (where is node, index is dof name), or 'endForce' (where is element, index is local dof 0..5), loadCase is label of load case or variant of load combination (active load case if None)
+        :param [str] variables: properties of elements, 'e', 'g', 'a', 'iy', 'k' or 'j'
+        :rtype: np.array(3d) | None
+        """
+        if not self.isSolved or self.factorization is None and self.neq > 0:
+            logger.error( langStr('Problem has not been solved yet ...', 'Úloha ještě není vypočtena ...') )
+            return None
+        for variable in variables:
+            if variable not in ('e','g','a','iy','k','j'):
+                logger.error( langStr('Unknown design variable %s', 'Neznámá návrhová proměnná %s') % variable )
+                return None
+        neq,ndofs = self.neq,self.neq+self.pneq
+        domain = self.domain
+        elems = list(domain.elements.values())
+        index = dict( (elem,i) for i,elem in enumerate(elems) )
+        nresp,nvar = len(responses),len(variables)
+        responses = [(tuple(response)+(None,None))[:4] for response in responses]
+        labels,cols = self.giveColumns([loadCase if loadCase else domain.activeLoadCase.label for type,where,i,loadCase in responses])
+        # right hand sides of adjoint systems, reactions and end forces have also explicit derivatives
+        c = zeros((ndofs,nresp))
+        reactionDofs = -ones(nresp, dtype=int)
+        endForces = {}
+        for i,(type,where,dof,loadCase) in enumerate(responses):
+            if type in ('displacement','reaction'):
+                node = domain.giveNode(where)
+                if not node or dof not in domain.dofsNames:
+                    logger.error( langStr('Wrong response %s %s %s', 'Chybná odezva %s %s %s') % (type,where,dof) )
+                    return None
+                loc = node.loc[domain.dofsNames.index(dof)]
+                if type == 'displacement':
+                    c[loc,i] = 1.
+                elif loc >= neq:
+                    kup = self.kup[:,[loc-neq]]
+                    c[:neq,i] = (kup.toarray() if SP is not None and SP.issparse(kup) else kup)[:,0]
+                    reactionDofs[i] = loc
+            elif type == 'endForce':
+                elem = domain.giveElement(where)
+                if not elem or dof not in range(6):
+                    logger.error( langStr('Wrong response %s %s %s', 'Chybná odezva %s %s %s') % (type,where,dof) )
+                    return None
+                stack = giveElementStacks([elem])[0]
+                add.at(c[:,i], stack.loc[0], dot(stack.computeT()[0].transpose(),stack.computeLocalStiffness()[0][dof]))
+                endForces.setdefault(elem,[]).append((i,dof))
+            else:
+                logger.error( langStr('Unknown response %s', 'Neznámá odezva %s') % type )
+                return None
+        # adjoint systems of all responses at once, derivatives of element matrices and loads are analytical
+        lam = zeros((ndofs,nresp))
+        if neq > 0:
+            lam[:neq] = self.factorization.solve(c[:neq])
+        w = self.combinationMatrix[:,cols]
+        nlc = w.shape[0]
+        groups = self.giveElementLoadGroups()
+        ret = zeros((nresp,len(elems),nvar))
+        for stack in giveElementStacks(elems):
+            nelem = len(stack.elems)
+            ie = array([index[elem] for elem in stack.elems], dtype=int)
+            t = stack.computeT()
+            re = einsum('nij,njc->nic', t, self.r.data[:,cols][stack.loc])
+            lame = lam[stack.loc]
+            loads,lcs = groups.get(stack.elems[0].__class__,([],[]))
+            if loads:
+                local = dict( (elem,i) for i,elem in enumerate(stack.elems) )
+                il = array([local[load.where] for load in loads], dtype=int)
+                lcs = array(lcs, dtype=int)
+                loadStack = giveElementStacks([load.where for load in loads])[0]
+                f0 = zeros((nelem,6,nlc))
+                add.at(f0, (il[:,newaxis],arange(6)[newaxis,:],lcs[:,newaxis]), loadStack.computeFixedEndForces(loads))
+                f0 = f0.dot(w)
+            reaction = (stack.loc[:,:,newaxis] == reactionDofs[newaxis,newaxis,:])
+            try:
+                for iv,variable in enumerate(variables):
+                    # derivatives of local end forces at fixed displacements
+                    dfe = einsum('nij,njc->nic', stack.computeLocalStiffnessDerivative(variable), re)
+                    if loads:
+                        df0 = zeros((nelem,6,nlc))
+                        add.at(df0, (il[:,newaxis],arange(6)[newaxis,:],lcs[:,newaxis]), loadStack.computeFixedEndForceDerivative(loads,variable))
+                        dfe += stack.condenseFixedEndForceDerivative(f0, df0.dot(w), variable)
+                    g = einsum('nji,njc->nic', t, dfe)
+                    ret[:,ie,iv] = einsum('nic,nic->cn', reaction, g) - einsum('nic,nic->cn', lame, g)
+                    for n,elem in enumerate(stack.elems):
+                        for i,dof in endForces.get(elem,()):
+                            ret[i,ie[n],iv] += dfe[n,dof,i]
+            except NotImplementedError:
+                logger.error( langStr('Sensitivities are not supported for %s elements', 'Citlivosti nejsou podporovány pro prvky %s') % stack.elems[0].__class__.__name__ )
+                return None
+        return ret
+
+    def computeSensitivity(self, type, where, index=None, loadCase=None, variables=('e','a','iy')):
+        """Returns (nelem,nvar) derivatives of one response with respect to properties of individual elements (ordered as in domain.elements), None if failed, see :py:meth:`computeSensitivities`
+        
+        :param str type: 'displacement', 'reaction' or 'endForce'
+        :param str where: label of node or element
+        :param str|int index: dof name or local dof
+        :param str loadCase: label of load case or variant of load combination, active load case if None
+        :param [str] variables: properties of elements
+        :rtype: np.array(2d) | None
+        """
+        ret = self.computeSensitivities([(type,where,index,loadCase)],variables)
+        return ret[0] if ret is not None else None
 
     def checkStiffnessMatrixDiagonal(self,kuu):
         """Checks if there are 0 on diagonal. Returns True if yes, False if it is OK
         
-        :param np.array(2d) kuu: matrix to be checked
+        :param np.array(2d)|scipy.sparse.spmatrix kuu: matrix to be checked
         :rtype: bool
         """
+        diag = kuu.diagonal()
         for i in range(kuu.shape[1]):
-            if kuu[i,i]<1.e-8:
+            if diag[i]<1.e-8:
                 for node in self.domain.nodes.values():
                     if node.loc.count(i):
                         break
@@ -3538,77 +6324,146 @@ class LinearStaticSolver(Solver):
         return 0
 
     def assembleLoadVectors(self):
-        """Assembles load vectors, returns (fu,fp), u stands for free DOFs, p for supported DOFs
+        """Assembles load vectors of all load cases, free DOFs contain loads, supported DOFs are zero (to be filled by reactions). Complete load matrix is kept in :py:attr:`loadMatrix`
         
-        :rtype: (np.array,np.array,np.array)
+        :rtype: ResultStore
         """
-        # TODO
-        fu = {}
-        fp = {}
-        for lc in self.domain.loadCases.values():
-            fulc = zeros(self.neq)
-            fplc = zeros(self.pneq)
-            for container in (lc.nodalLoads,lc.elementLoads):
-                for load in container.values():
-                    loc,value = load.computeLoad(self.domain.type)
-                    size = len(loc)
-                    for i in range(size):
-                        ii = loc[i]
-                        if ii < self.neq:
-                            fulc[ii] += value[i]
-            fu[lc.label] = fulc
-            fp[lc.label] = fplc
-        return fu,fp
+        self.loadMatrix = self.assembleLoadMatrix()
+        f = ResultStore(self.domain.loadCases.keys(), self.loadMatrix)
+        f.data[self.neq:] = 0.
+        return f
+
+    def assembleLoadMatrix(self):
+        """Assembles (neq+pneq,nlc) matrix of nodal loads and equivalent nodal loads of element loads, one column for each load case
+        
+        :rtype: np.array(2d)
+        """
+        lcs = list(self.domain.loadCases.values())
+        rows,cols,vals = [],[],[]
+        groups = {}
+        for i,lc in enumerate(lcs):
+            for load in lc.nodalLoads.values():
+                loc,value = load.computeLoad(self.domain.type)
+                rows.append(loc)
+                cols.append([i]*len(loc))
+                vals.append(value)
+            for load in lc.elementLoads.values():
+                groups.setdefault(load.where.__class__,[]).append((load,i))
+        # element loads are evaluated at once for each element class
+        for group in groups.values():
+            loads = [load for load,i in group]
+            stack = giveElementStacks([load.where for load in loads])[0]
+            loc,value = stack.computeLoadVectors(loads,self.domain.type)
+            rows.append(loc.ravel())
+            cols.append(repeat([i for load,i in group],loc.shape[1]))
+            vals.append(value.ravel())
+        f = zeros((self.neq+self.pneq,len(lcs)))
+        if rows:
+            add.at(f, (concatenate(rows).astype(int),concatenate(cols).astype(int)), concatenate(vals).astype(float))
+        return f
 
     def assembleDsplVectors(self):
-        """Assembles displacement vectors, returns (ru,rp), u stands for free DOFs, p for supported DOFs
+        """Assembles displacement vectors of all load cases, supported DOFs contain prescribed displacements, free DOFs are zero (to be filled by solution)
         
-        :rtype: (np.array,np.array,np.array)
+        :rtype: ResultStore
         """
-        ru = {}
-        rp = {}
-        for lc in self.domain.loadCases.values():
-            rulc = zeros(self.neq)
-            rplc = zeros(self.pneq)
-            #
+        r = ResultStore(self.domain.loadCases.keys(), self.neq+self.pneq)
+        for j,lc in enumerate(self.domain.loadCases.values()):
+            rlc = r.data[:,j]
             for pDspl in lc.prescribedDspls.values():
                 loc,value = pDspl.computeLoad(self.domain.type)
                 size = len(loc)
                 for i in range(size):
                     ii = loc[i]
                     if ii >= self.neq:
-                        rplc[ii-self.neq] = value[i] # NOT += ???
-            ru[lc.label] = rulc
-            rp[lc.label] = rplc
-        return ru,rp
+                        rlc[ii] = value[i] # NOT += ???
+        return r
 
-    def assembleStiffnessMatrix(self):
+    def assembleStiffnessMatrix(self,sparse=None):
         """Assembles stiffness matrix, returns (kuu,kpp,kup), u stands for free DOFs, p for supported DOFs
         
-        :rtype: (np.array,np.array,np.array)
+        :param bool sparse: if True, matrices are assembled from COO triplets of all elements and returned in CSR format, if False, dense arrays are returned. If None, :py:meth:`useSparseSolver` decides
+        :rtype: (np.array,np.array,np.array) | (scipy.sparse.csr_matrix,scipy.sparse.csr_matrix,scipy.sparse.csr_matrix)
+        """
+        if sparse is None:
+            sparse = self.useSparseSolver()
+        if sparse:
+            return self.assembleSparseStiffnessMatrix()
+        rows,cols,vals = self.giveStiffnessTriplets()
+        ndofs = self.neq+self.pneq
+        k = zeros((ndofs,ndofs))
+        add.at(k, (rows,cols), vals)
+        kuu = k[:self.neq,:self.neq]
+        kpp = k[self.neq:,self.neq:]
+        kup = k[:self.neq,self.neq:]
+        return kuu,kpp,kup
+
+    def assembleSparseStiffnessMatrix(self):
+        """Assembles stiffness matrix from COO triplets of all elements, returns (kuu,kpp,kup) in CSR format. Duplicate entries are summed during conversion
+        
+        :rtype: (scipy.sparse.csr_matrix,scipy.sparse.csr_matrix,scipy.sparse.csr_matrix)
         """
-        kuu = zeros((self.neq,self.neq))
-        kpp = zeros((self.pneq,self.pneq))
-        kup = zeros((self.neq,self.pneq))
-        for elem in self.domain.elements.values():
-            loc = elem.giveLocationArray()
-            k = elem.computeStiffness()
-            size=len(loc)
-            for i in range(size):
-                ii = loc[i]
-                if ii<self.neq:
-                    for j in range(size):
-                        jj = loc[j]
-                        if jj<self.neq:
-                            kuu[ii,jj] += k[i,j]
-                        else:
-                            kup[ii,jj-self.neq] += k[i,j]
-                else:   #ii>=neq prescribed row
-                    for j in range(size):
-                        jj = loc[j]
-                        if jj>=self.neq:
-                            kpp[ii-self.neq,jj-self.neq] += k[i,j]
+        rows,cols,vals = self.giveStiffnessTriplets()
+        ndofs = self.neq+self.pneq
+        k = SP.coo_matrix((vals,(rows,cols)), shape=(ndofs,ndofs)).tocsr()
+        # e.g. zero couplings of grid beams are not stored
+        k.eliminate_zeros()
+        kuu = k[:self.neq,:self.neq]
+        kpp = k[self.neq:,self.neq:]
+        kup = k[:self.neq,self.neq:]
         return kuu,kpp,kup
+
+    def assembleMassMatrix(self, lumped=False, sparse=None):
+        """Assembles mass matrix of free DOFs from mass matrices of elements computed by batched kernels (see :py:meth:`ElementStack.computeMass`). Equations must be numbered
+        
+        :param bool lumped: if True, lumped mass matrices are used, consistent ones otherwise
+        :param bool sparse: if True, the matrix is returned in CSR format, if False, dense array is returned. If None, :py:meth:`useSparseSolver` decides
+        :rtype: np.array(2d) | scipy.sparse.csr_matrix
+        """
+        if sparse is None:
+            sparse = self.useSparseSolver()
+        neq = self.neq
+        rows = [zeros(0,dtype=int)]
+        cols = [zeros(0,dtype=int)]
+        vals = [zeros(0)]
+        for stack in giveElementStacks(self.domain.elements.values()):
+            m = stack.computeMass(lumped)
+            size = stack.loc.shape[1]
+            rows.append(repeat(stack.loc,size,axis=1).ravel())
+            cols.append(tile(stack.loc,(1,size)).ravel())
+            vals.append(m.ravel())
+        rows,cols,vals = concatenate(rows),concatenate(cols),concatenate(vals)
+        free = (rows < neq) & (cols < neq)
+        rows,cols,vals = rows[free],cols[free],vals[free]
+        if sparse:
+            m = SP.coo_matrix((vals,(rows,cols)), shape=(neq,neq)).tocsr()
+            m.eliminate_zeros()
+            return m
+        m = zeros((neq,neq))
+        add.at(m, (rows,cols), vals)
+        return m
+
+    def giveStiffnessTriplets(self, elems=None):
+        """Returns COO triplets (rows,cols,values) of global stiffness matrices of given elements (all elements of the domain by default)
+        
+        :param [Element] elems: list of elements
+        :rtype: (np.array,np.array,np.array)
+        """
+        if elems is None:
+            elems = list(self.domain.elements.values())
+            self.elementStiffness = {}
+        rows = [zeros(0,dtype=int)]
+        cols = [zeros(0,dtype=int)]
+        vals = [zeros(0)]
+        for stack in giveElementStacks(elems):
+            # batched kernels, matrices are kept in elementStiffness
+            k = stack.computeStiffness()
+            self.elementStiffness.update(zip(stack.elems,k))
+            size = stack.loc.shape[1]
+            rows.append(repeat(stack.loc,size,axis=1).ravel())
+            cols.append(tile(stack.loc,(1,size)).ravel())
+            vals.append(k.ravel())
+        return concatenate(rows),concatenate(cols),concatenate(vals)
         
     def numberEquations(self):
         self.neq = 0
@@ -3623,7 +6478,7 @@ class LinearStaticSolver(Solver):
         #assign code numbers in 2nd pass
         ineq = 0 # unknowns numbering starts from 0..neq-1
         ipneq = self.neq #prescribed unknowns numbering starts neq..neq+pneq-1
-        for node in self.domain.nodes.values():
+        for node in self.giveNodeOrdering():
             nodeLoc = []
             for idof in self.domain.dofsNames:
                 if node.hasPrescribedBcInDof(idof): # support
@@ -3641,6 +6496,30 @@ class LinearStaticSolver(Solver):
             self.dofNames[node.loc[1]] = node.label+'_z'
             self.dofNames[node.loc[2]] = node.label+'_Y'
 
+    def giveNodeOrdering(self):
+        """Returns list of nodes in order of equation numbering, see :py:attr:`equationOrdering`
+        
+        :rtype: [Node]
+        """
+        nodes = list(self.domain.nodes.values())
+        ordering = self.equationOrdering
+        if ordering == 'auto':
+            ordering = 'rcm' if self.useSparseSolver() else 'natural'
+        if ordering != 'rcm' or SPCG is None or len(nodes) < 3:
+            return nodes
+        index = dict( (node,i) for i,node in enumerate(nodes) )
+        rows = []
+        cols = []
+        for elem in self.domain.elements.values():
+            for n1 in elem.nodes:
+                for n2 in elem.nodes:
+                    rows.append(index[n1])
+                    cols.append(index[n2])
+        # reverse Cuthill-McKee ordering of node adjacency graph minimizes bandwidth, it depends only on order of nodes and elements
+        graph = SP.csr_matrix((ones(len(rows)),(rows,cols)), shape=(len(nodes),len(nodes)))
+        perm = SPCG.reverse_cuthill_mckee(graph, symmetric_mode=True)
+        return [nodes[i] for i in perm]
+
     def giveActiveSolutionVector(self):
         # when combination of LCS active, shoud return combined solution vector
         if self.isSolved:
@@ -3650,6 +6529,229 @@ class LinearStaticSolver(Solver):
 
 
 
+class PDeltaSolver(LinearStaticSolver):
+    """Second-order (P-Delta) static solver, linear results of load cases and variants of load combinations are replaced by solutions of (K+Ks(N))*r = f
+    
+    :param str label: string label of receiver
+    """
+    maxPDeltaIterations = 50
+    """*(int)* maximum number of second-order iterations of each load case"""
+    pdeltaTolerance = 1.e-8
+    """*(float)* iterations stop if relative change of displacements (in Euclidean norm) is below pdeltaTolerance"""
+    normalForces = None
+    """*(np.array(2d))* (nelem,ncol) normal forces (positive in tension) of the last iterate of each column of :py:attr:`r`, rows are given by :py:attr:`elementIndex`"""
+    elementIndex = None
+    """*(dict)* row of :py:attr:`normalForces` of each element"""
+    convergence = None
+    """*(dict)* history of iterations of each load case {label:[(relative change of displacements,relative change of normal forces)]}"""
+    iterationTimings = None
+    """*(dict)* wall times [s] of iterations of each load case {label:[float]}"""
+    converged = None
+    """*(dict)* True for load cases whose iterations converged {label:bool}"""
+
+    def __init__(self,label='pdeltasolver'):
+        LinearStaticSolver.__init__(self,label=label)
+
+    def solve(self,domain=None):
+        """Solves the domain, linear solution is the first iterate. Timings of linear solution are completed by 'iterations'
+        
+        :param Domain domain: domain to be solved
+        :rtype: bool
+        """
+        self.normalForces = None
+        if LinearStaticSolver.solve(self,domain):
+            return 1
+        self.isSolved = False
+        t = time.time()
+        stacks = giveElementStacks(self.domain.elements.values())
+        if not stacks:
+            logger.error( langStr('PDeltaSolver: no elements to solve', 'Žádné prvky pro řešení') )
+            return 1
+        if [stack for stack in stacks if not stack.hasInitialStress]:
+            logger.error( langStr('PDeltaSolver: initial stress matrices are not available for domain type %s', 'Matice počátečních napětí nejsou k dispozici pro typ úlohy %s') % self.domain.type )
+            return 1
+        self.elementIndex = dict( (elem,i) for i,elem in enumerate(elem for stack in stacks for elem in stack.elems) )
+        k = concatenate([stack.computeStiffness() for stack in stacks])
+        loc = concatenate([stack.loc for stack in stacks])
+        size = loc.shape[1]
+        rows,cols = repeat(loc,size,axis=1).ravel(),tile(loc,(1,size)).ravel()
+        free = nonzero((rows < self.neq) & (cols < self.neq))[0]
+        # all iterations share one pattern, only numeric values are assembled and factorized
+        pattern = AssemblyPattern(rows[free],cols[free],self.neq,SP is not None and SP.issparse(self.kuu))
+        # local end forces due to element loads (zero displacements) are constant during iterations
+        labels,columns = self.giveColumns()
+        groups = self.giveElementLoadGroups()
+        r = self.r.data.copy()
+        self.r.data[:] = 0.
+        fixed = concatenate([self.computeStackEndForces(stack,columns,groups) for stack in stacks])
+        self.r.data[:] = r
+        loads = self.loadMatrix.dot(self.combinationMatrix)
+        self.normalForces = zeros((len(loc),len(labels)))
+        self.convergence,self.iterationTimings,self.converged = {},{},{}
+        # superposition does not hold, variants of load combinations are iterated separately
+        for col,label in enumerate(labels):
+            try:
+                failed = self.iterate(label,col,stacks,k,loc,free,pattern,fixed[:,:,col],loads[:,col])
+            except (ValueError,RuntimeError,linalg.LinAlgError):
+                logger.error( langStr('Solution of linear system failed in second-order iterations of load case %s, load exceeds critical value?', 'Řešení lineárního systému selhalo v iteracích druhého řádu zatěžovacího stavu %s, zatížení překračuje kritickou hodnotu?') % label )
+                failed = True
+            if failed:
+                self.normalForces = None
+                return 1
+        self.timings['iterations'] = time.time()-t
+        if isinstance(self.domain.activeLoadCase,CombinedLoadCase):
+            self.domain.activeLoadCase.update()
+        if self.checkHugeDisplacements():
+            return 1
+        # displacements were changed by iterations
+        self.resultsChanged()
+        self.isSolved = True
+        return 0
+
+    def iterate(self, label, col, stacks, k, loc, free, pattern, fixed, load):
+        """Performs second-order iterations of one column of :py:attr:`r` and :py:attr:`f` starting from linear solution. Returns False if successful, True otherwise
+        
+        :param str label: label of load case or variant of load combination
+        :param int col: index of column
+        :param [ElementStack] stacks: elements
+        :param np.array(3d) k: (nelem,6,6) global stiffness matrices of elements
+        :param np.array(2d) loc: (nelem,6) code numbers of elements
+        :param np.array free: indices of entries of element matrices in free DOFs
+        :param AssemblyPattern pattern: pattern of assembled matrices
+        :param np.array(2d) fixed: (nelem,6) local end forces due to element loads
+        :param np.array load: load vector
+        :rtype: bool
+        """
+        neq = self.neq
+        r = self.r.data[:,col]
+        rp = r.copy()
+        rp[:neq] = 0.
+        n = self.computeNormalForces(stacks,r,fixed)
+        history,timings = [],[]
+        self.convergence[label],self.iterationTimings[label],self.converged[label] = history,timings,False
+        # fixed-point iterations, initial stress matrices are given by normal forces of the previous iterate
+        for i in range(self.maxPDeltaIterations):
+            t = time.time()
+            kt = k + self.computeInitialStress(stacks,n)
+            factorization = pattern.factorize(pattern.assemble(kt.reshape(-1)[free]),self)
+            rhs = load[:neq] - self.computeElementProduct(kt,rp,loc)[:neq]
+            if isinstance(factorization,PreconditionedCGSolution):
+                ru = factorization.solve(rhs[:,newaxis],r[:neq,newaxis],self.tolerance,self.maxIterations)[:,0]
+            else:
+                ru = factorization.solve(rhs)
+            dr = linalg.norm(ru-r[:neq])/max(linalg.norm(ru),1.e-300)
+            r[:neq] = ru
+            nNew = self.computeNormalForces(stacks,r,fixed)
+            dn = abs(nNew-n).max()/max(abs(nNew).max(),1.e-300)
+            n = nNew
+            timings.append(time.time()-t)
+            history.append((dr,dn))
+            if dr < self.pdeltaTolerance:
+                self.converged[label] = True
+                break
+        if self.converged[label] and not self.isPositiveDefinite(factorization,pattern):
+            logger.error( langStr('Load case %s: load exceeds critical value, stiffness matrix K+Ks(N) is not positive definite', 'Zatěžovací stav %s: zatížení překračuje kritickou hodnotu, matice tuhosti K+Ks(N) není pozitivně definitní') % label )
+            self.converged[label] = False
+            return 1
+        self.normalForces[:,col] = n
+        if self.pneq > 0:
+            self.f.data[neq:,col] = self.computeElementProduct(k+self.computeInitialStress(stacks,n),r,loc)[neq:] - load[neq:]
+        if self.converged[label]:
+            logger.info( langStr('Load case %s: second-order iterations converged in %d iterations', 'Zatěžovací stav %s: iterace druhého řádu konvergovaly v %d iteracích') % (label,len(history)) )
+            return 0
+        logger.error( langStr('Load case %s: second-order iterations did not converge in %d iterations (relative change %g), load exceeds critical value?', 'Zatěžovací stav %s: iterace druhého řádu nekonvergovaly v %d iteracích (relativní změna %g), zatížení překračuje kritickou hodnotu?') % (label,len(history),history[-1][0]) )
+        return 1
+
+    def isPositiveDefinite(self, factorization, pattern):
+        """Returns True if factorized matrix is positive definite (the load is below its critical value) or if it can not be decided
+        
+        :param factorization: factorization of matrix (see :py:meth:`AssemblyPattern.factorize`)
+        :param AssemblyPattern pattern: pattern of the matrix
+        :rtype: bool
+        """
+        # banded Cholesky factorization exists for positive definite matrices only, signs of pivots are checked for sparse LU with symmetric pivoting
+        if isinstance(factorization,DenseFactorization):
+            try:
+                linalg.cholesky(factorization.k)
+                return True
+            except linalg.LinAlgError:
+                return False
+        if isinstance(factorization,SparseLUFactorization):
+            lu = factorization.lu
+            if (lu.perm_r == lu.perm_c).all():
+                return bool((lu.U.diagonal() > 0.).all())
+        return True
+
+    def computeNormalForces(self, stacks, r, fixed):
+        """Returns normal forces (positive in tension, mean value of both ends) of elements computed from vectorized local end forces
+        
+        :param [ElementStack] stacks: elements
+        :param np.array r: displacements of all DOFs
+        :param np.array(2d) fixed: (nelem,6) local end forces due to element loads
+        :rtype: np.array
+        """
+        re = concatenate([einsum('nij,nj->ni', stack.computeT(), r[stack.loc]) for stack in stacks])
+        kl = concatenate([stack.computeLocalStiffness() for stack in stacks])
+        return 0.5*(einsum('nj,nj->n', kl[:,3]-kl[:,0], re) + fixed[:,3] - fixed[:,0])
+
+    def computeInitialStress(self, stacks, n):
+        """Returns (nelem,6,6) global initial stress matrices of elements for given normal forces
+        
+        :param [ElementStack] stacks: elements
+        :param np.array n: normal forces in order of :py:attr:`elementIndex`
+        :rtype: np.array(3d)
+        """
+        ret,i = [],0
+        for stack in stacks:
+            ret.append(stack.computeInitialStress(n[i:i+len(stack.elems)]))
+            i += len(stack.elems)
+        return concatenate(ret)
+
+    def computeElementProduct(self, k, r, loc):
+        """Returns product of assembled matrix and vector of all DOFs evaluated element by element, i.e. without assembling
+        
+        :param np.array(3d) k: (nelem,6,6) global element matrices
+        :param np.array r: vector of all DOFs
+        :param np.array(2d) loc: (nelem,6) code numbers of elements
+        :rtype: np.array
+        """
+        return bincount(loc.ravel(), einsum('nij,nj->ni', k, r[loc]).ravel(), minlength=self.neq+self.pneq)
+
+    def computeStackEndForces(self, stack, cols, groups):
+        """Returns (nelem,6,ncol) local end forces of elements of given stack in given columns of :py:attr:`r` including contribution of initial stress matrices
+        
+        :param ElementStack stack: elements
+        :param np.array cols: column indices
+        :param dict groups: element loads, see :py:meth:`LinearStaticSolver.giveElementLoadGroups`
+        :rtype: np.array(3d)
+        """
+        fe = LinearStaticSolver.computeStackEndForces(self,stack,cols,groups)
+        if self.normalForces is None:
+            return fe
+        n = self.normalForces[[self.elementIndex[elem] for elem in stack.elems]]
+        re = einsum('nij,njc->nic', stack.computeT(), self.r.data[:,cols][stack.loc])
+        for i,col in enumerate(cols):
+            fe[:,:,i] += einsum('nij,nj->ni', stack.computeLocalInitialStress(n[:,col]), re[:,:,i])
+        return fe
+
+    def computeStackEndValues(self, stack, col, groups):
+        """Returns (nelem,6) local end forces including contribution of initial stress matrices and (nelem,6) local end displacements of elements of given stack in given column of :py:attr:`r`
+        
+        :param ElementStack stack: elements
+        :param int col: column index
+        :param dict groups: element loads, see :py:meth:`LinearStaticSolver.giveElementLoadGroups`
+        :rtype: (np.array(2d),np.array(2d))
+        """
+        fe,re = LinearStaticSolver.computeStackEndValues(self,stack,col,groups)
+        if self.normalForces is None:
+            return fe,re
+        n = self.normalForces[[self.elementIndex[elem] for elem in stack.elems],col]
+        # condensed initial stress matrices do not act on DOFs released by hinges
+        fe += einsum('nij,nj->ni', stack.computeLocalInitialStress(n), re)
+        return fe,re
+
+
+
 try:
     import scipy.linalg as LA
 except ImportError as e:
@@ -3657,63 +6759,172 @@ except ImportError as e:
     raise
 
 class LinearStabilitySolver(Solver):
-    """ Class implementing solver for linear stability problem
+    """ Class implementing solver for linear stability problem K*r = eigval*Ks*r of load cases in :py:attr:`loadCaseLabels`, the critical load factor is -eigval
     """
     domain = None
     """*(Domain)* domain being solved"""
     linsolver = None
     """ Linear solver instance"""
     eigval = None
-    """ eigen values (critical load levels)"""
+    """ eigen values (critical load levels) of the active load case"""
     eigvec = None
-    """ eigen vectors"""
+    """ eigen vectors of the active load case"""
     activeEigVal = 0
     """ active eigen value"""
+    loadCaseLabels = None
+    """*([str])* labels of load cases and variants of load combinations to be solved, all ones solved by :py:attr:`linsolver` if None"""
+    eigenPairs = None
+    """*(dict)* eigen values and eigen vectors (eigval,eigvec) of each solved load case label"""
+    failures = None
+    """*(dict)* error messages of load case labels, for which the solution failed (e.g. zero normal forces)"""
+    nmodes = 6
+    """*(int)* number of eigen values with the smallest magnitude computed by 'sparse' :py:attr:`eigenSolver`"""
+    eigenSolver = 'sparse'
+    """*(str)* 'sparse' for :py:attr:`nmodes` eigen values of symmetric problem, 'dense' for all complex eigen values by dense nonsymmetric solver"""
+    tolerance = 1.e-10
+    """*(float)* relative accuracy of eigen values computed by Lanczos method"""
+    normalForces = None
+    """*(dict)* average normal forces of elements (see :py:meth:`LinearStaticSolver.giveEndValues`) the initial stress matrix of each load case label was assembled for"""
+    solutionKey = None
+    """*(tuple)* fingerprint of model, loads and settings of the last solution, see :py:meth:`giveSolutionKey`"""
 
     def __init__(self,label='linearstabilitysolver'):
         Solver.__init__(self,label=label)
         self.linsolver = LinearStaticSolver()
         self.reset()
 
+    def reset(self):
+        Solver.reset(self)
+        self.eigenPairs = {}
+        self.failures = {}
+        self.normalForces = {}
+        self.solutionKey = None
+
     def solve(self,domain=None):
-        """Solves the domain
+        """Solves the domain for all labels of :py:attr:`loadCaseLabels`. Labels already present in :py:attr:`eigenPairs` are not solved again if the model was not changed
         :param Domain domain: domain to be solved
         :rtype: bool
         """
-        print ("LinearStabilitySolver::solve ", session, session.domain)
         if not domain:
             if not self.session or not self.session.domain:
                 logger.error( langStr('LinearStabilitySolver: No domain to solve...', 'Žádná síť pro řešení...') )
                 return 1
         self.domain = domain if domain else self.session.domain
-        # solve the linear system first
-        self.linsolver.solve(self.domain)
+        self.linsolver.domain = self.domain
+        # eigen pairs cached in eigenPairs are kept unless the model changes
+        key = self.giveSolutionKey()
+        if key != self.solutionKey:
+            self.reset()
+            # solve the linear system first, its numbering, stiffness matrix and factorization are shared
+            if self.linsolver.solve(self.domain):
+                return 1
+            self.solutionKey = key
+        labels = [label for label in self.giveLoadCaseLabels() if label not in self.eigenPairs and label not in self.failures]
+        if not labels:
+            logger.info( langStr('Model was not changed, previous solution is used', 'Model nebyl změněn, je použito předchozí řešení') )
+        else:
+            stacks = giveElementStacks(self.domain.elements.values())
+            if not stacks:
+                logger.error( langStr('LinearStabilitySolver: no elements to solve', 'Žádné prvky pro řešení') )
+                return 1
+            if [stack for stack in stacks if not stack.hasInitialStress]:
+                logger.error( langStr('LinearStabilitySolver: initial stress matrices are not available for domain type %s', 'Matice počátečních napětí nejsou k dispozici pro typ úlohy %s') % self.domain.type )
+                return 1
         # 
-        # actual solving
-        try:
-            # assemble the system 
-            k_uu,k_pp,k_up = self.linsolver.assembleStiffnessMatrix() # assemble stifness again (better reused form linsolver)
-            ks_uu = self.assembleInitialStressMatrix(self.linsolver.r[session.domain.activeLoadCase.label]) # can throw value error
-            self.eigval, self.eigvec =LA.eig(k_uu, ks_uu, left=False, right=True, overwrite_a=False, overwrite_b=False)
-        except LA.LinAlgError as error:
-            logger.error( langStr('Eigen problem solution failed\n', 'Chyba při řešení problému vlastních čísel\n') + str(error))
+        # actual solving, stiffness matrix is shared by all load cases
+        k_uu = self.linsolver.kuu
+        sparse = SP is not None and SP.issparse(k_uu)
+        if self.eigenSolver != 'sparse' and sparse and labels:
+            k_uu = k_uu.toarray()
+        for label in labels:
+            error = self.solveLoadCase(label, k_uu, sparse)
+            if error:
+                self.failures[label] = error
+                logger.info( langStr('Eigen problem solution of %s failed\n', 'Chyba při řešení problému vlastních čísel %s\n') % label + error )
+        if not self.eigenPairs:
+            logger.error( langStr('Eigen problem solution failed\n', 'Chyba při řešení problému vlastních čísel\n') + '\n'.join(self.failures.values()) )
             self.isSolved = False
             return 1
-        except ValueError as error:
-            logger.error( langStr('Eigen problem solution failed\n', 'Chyba při řešení problému vlastních čísel\n') + str(error))
-            self.isSolved = False
+        self.lcsChanged()
+        if not self.isSolved:
+            lc = self.domain.activeLoadCase
+            logger.error( langStr('Eigen problem solution failed\n', 'Chyba při řešení problému vlastních čísel\n') + self.failures.get(lc.label if lc else None, langStr('Active load case %s was not solved', 'Aktivní zatěžovací stav %s nebyl řešen') % (lc.label if lc else None)) )
             return 1
-           
+        logger.info( langStr('Solution finished successfully', 'Úloha úspěšně vyřešena') )
+        return 0
+
+    def solveLoadCase(self, label, k_uu, sparse):
+        """Solves eigen problem of one load case and stores its sorted eigen pairs in :py:attr:`eigenPairs`. Returns error message if the solution failed, None otherwise
+        
+        :param str label: label of load case or variant of load combination solved by :py:attr:`linsolver`
+        :param np.array(2d)|scipy.sparse.csr_matrix k_uu: stiffness matrix of :py:attr:`linsolver` (dense one for 'dense' :py:attr:`eigenSolver`)
+        :param bool sparse: True if the matrices are assembled in CSR format
+        :rtype: str
+        """
+        try:
+            # assemble the system 
+            ks_uu = self.assembleInitialStressMatrix(label, sparse) # can throw value error
+            if self.eigenSolver == 'sparse':
+                eigval, eigvec = self.solveSymmetricEigenProblem(k_uu, ks_uu)
+            else:
+                ks_uu = ks_uu.toarray() if sparse else ks_uu
+                eigval, eigvec =LA.eig(k_uu, ks_uu, left=False, right=True, overwrite_a=False, overwrite_b=False)
+        except (LA.LinAlgError,RuntimeError,ValueError) as error:
+            return str(error)
 
         #sort eigenvalues and eigenvectors
-        abseig=absolute(self.eigval)
+        abseig=absolute(eigval)
         idx = abseig.argsort()   
-        self.eigval = self.eigval[idx]
-        self.eigvec = self.eigvec[:,idx]
+        self.eigenPairs[label] = (eigval[idx], eigvec[:,idx])
+        return None
 
-        logger.info( langStr('Solution finished successfully', 'Úloha úspěšně vyřešena') )
-        self.isSolved = True
-        #print "Eigen values: ", self.eigval
+    def giveLoadCaseLabels(self):
+        """Returns labels of load cases and variants of load combinations to be solved, i.e. :py:attr:`loadCaseLabels` or all labels solved by :py:attr:`linsolver`, and the active load case
+        
+        :rtype: [str]
+        """
+        labels = self.linsolver.r.labels
+        ret = [label for label in (labels if self.loadCaseLabels is None else self.loadCaseLabels) if label in self.linsolver.r.index]
+        lc = self.domain.activeLoadCase
+        if lc and lc.label in self.linsolver.r.index and lc.label not in ret:
+            ret.append(lc.label)
+        return ret
+
+    def giveSolutionKey(self):
+        """Returns fingerprint of stiffness, loads and eigen solver settings the solution of all load cases depends on
+        
+        :rtype: tuple
+        """
+        # the active load case is not included, eigen pairs of the other ones are kept when it changes
+        key,elementKeys = self.linsolver.giveStiffnessKey()
+        return key,elementKeys,self.linsolver.giveLoadKey(),self.nmodes,self.eigenSolver,self.tolerance
+
+    def solveSymmetricEigenProblem(self, kuu, ksuu):
+        """Returns :py:attr:`nmodes` real eigen values with the smallest magnitude and eigen vectors of symmetric problem K*r = eigval*Ks*r
+        
+        :param np.array(2d)|scipy.sparse.csr_matrix kuu: stiffness matrix of :py:attr:`linsolver`, its factorization is used
+        :param np.array(2d)|scipy.sparse.csr_matrix ksuu: initial stress matrix
+        :rtype: (np.array,np.array(2d))
+        """
+        neq = kuu.shape[0]
+        if SP is not None and SP.issparse(kuu) and self.nmodes < neq-1:
+            # inverted problem Ks*r = mu*K*r, mu = 1/eigval, K is positive definite, so Lanczos method needs only its factorization
+            factorization = self.linsolver.factorization
+            if isinstance(factorization,PreconditionedCGSolution):
+                solve = lambda rhs: factorization.solve(rhs,None,self.linsolver.tolerance,self.linsolver.maxIterations)
+            else:
+                solve = factorization.solve
+            minv = SPLA.LinearOperator((neq,neq), matvec=solve, dtype=float)
+            mu,v = SPLA.eigsh(ksuu, k=self.nmodes, M=kuu, Minv=minv, which='LM', tol=self.tolerance)
+        else:
+            k = kuu.toarray() if SP is not None and SP.issparse(kuu) else kuu
+            ks = ksuu.toarray() if SP is not None and SP.issparse(ksuu) else ksuu
+            mu,v = LA.eigh(ks, k)
+            order = argsort(-abs(mu))[:self.nmodes]
+            mu,v = mu[order],v[:,order]
+        # zero mu correspond to infinite eigen values (e.g. axial DOFs)
+        valid = abs(mu) > 1.e-12*abs(mu).max() if len(mu) and abs(mu).max() > 0. else zeros(len(mu),dtype=bool)
+        return 1./mu[valid], v[:,valid]
                 
     def recoverDsplVector(self,ru,rp):
         """TODO
@@ -3728,50 +6939,55 @@ class LinearStabilitySolver(Solver):
             rlc[self.neq:self.pneq+self.neq] = rp[lc.label]
             self.r[lc.label] = rlc
 
-    def assembleInitialStressMatrix(self, r):
-        """Assembles initial stress matrix, returns (ks_uu), u stands for part with free DOFs only
-        :rtype: (np.array)
+    def assembleInitialStressMatrix(self, lcLabel, sparse=False):
+        """Assembles initial stress matrix of normal forces of given load case of :py:attr:`linsolver`, returns (ks_uu), u stands for part with free DOFs only
+        :param str lcLabel: label of load case or variant of load combination solved by :py:attr:`linsolver`
+        :param bool sparse: if True, the matrix is returned in CSR format
+        :rtype: (np.array) | scipy.sparse.csr_matrix
         """
         neq = self.linsolver.neq
-        ks_uu = zeros((neq,neq))
 
-        # get minimun nonzero normal element force
-        _init = True
-        minn = 0.0 # minn will be set to the first nonzero normal force; this is to handle the case when all normal forces are zero.
-        elemn=[] # element nodal forces
-        for elem in self.domain.elements.values():
-            # compute average normal force on element
-            nn = elem.computeNormalForce(self.linsolver.r[session.domain.activeLoadCase.label])
-            n = 0.5*(nn[0]-nn[1]) # take an average value
-            if abs(n) > 0.0:
-                if _init:
-                    minn = n
-                    _init=False
-                else:
-                    minn = min(minn, abs(n))
-            elemn.append(n)
+        # average normal forces of both ends (positive in tension) from cached end forces
+        elems,fe,re = self.linsolver.giveEndValues(lcLabel)
+        normalForces = 0.5*(fe[:,3]-fe[:,0])
+        self.normalForces[lcLabel] = normalForces
+        # get minimun nonzero normal element force, forces below round-off level of the largest one are considered zero
+        absn = abs(normalForces)
+        maxn = absn.max() if len(absn) else 0.0
+        minn = absn[absn > 1.e-10*maxn].min() if maxn > 0.0 else 0.0
 
-        if minn <= 1.e-8:
+        if maxn <= 1.e-8:
             raise ValueError(langStr('Linear Stability: problem may be ill-posed (zero normal forces)\n', 'Problém může být špatně podmíněný (nulové normálové síly\n'))
-        
-        _i=0
-        for elem in self.domain.elements.values():
-            loc = elem.giveLocationArray()
-            n = elemn[_i] # take cached value
-            _i = _i+1 
-            if abs(n) < minn:
-                n = minn
-
-            # print "n=", n
-            k = elem.computeInitialStressMatrix(N=n)
-            size=len(loc)
-            for i in range(size):
-                ii = loc[i]
-                if ii<neq:
-                    for j in range(size):
-                        jj = loc[j]
-                        if jj<neq:
-                            ks_uu[ii,jj] += k[i,j]
+        # small normal forces are replaced by the smallest nonzero one
+        n = where(absn < minn, minn, normalForces)
+
+        rows = [zeros(0,dtype=int)]
+        cols = [zeros(0,dtype=int)]
+        vals = [zeros(0)]
+        i = 0
+        for stack in giveElementStacks(elems):
+            ns = n[i:i+len(stack.elems)]
+            i += len(stack.elems)
+            k = stack.computeLocalInitialStress(ns)
+            # small axial stiffness regularizes the matrix like in Beam2d.computeLocalInitialStressMatrix, condensation does not affect axial DOFs
+            raw = stack.computeLocalInitialStress(ns, condense=False)
+            cc = minimum(abs(raw[:,1,1]),abs(raw[:,2,2]))/1000.0
+            k[:,0,0] += cc
+            k[:,3,3] += cc
+            k[:,0,3] -= cc
+            k[:,3,0] -= cc
+            k = transformKernel(k, stack.computeT())
+            size = stack.loc.shape[1]
+            rows.append(repeat(stack.loc,size,axis=1).ravel())
+            cols.append(tile(stack.loc,(1,size)).ravel())
+            vals.append(k.ravel())
+        rows,cols,vals = concatenate(rows),concatenate(cols),concatenate(vals)
+        free = (rows < neq) & (cols < neq)
+        rows,cols,vals = rows[free],cols[free],vals[free]
+        if sparse:
+            return SP.coo_matrix((vals,(rows,cols)), shape=(neq,neq)).tocsr()
+        ks_uu = zeros((neq,neq))
+        add.at(ks_uu, (rows,cols), vals)
         return ks_uu
 
     def giveActiveSolutionVector(self):
@@ -3788,8 +7004,346 @@ class LinearStabilitySolver(Solver):
         return None
         
     def lcsChanged(self):
-         self.reset()
+        """Activates cached eigen pairs of the active load case, the receiver is not solved if they are not available (e.g. a new load combination)
+        """
+        lc = self.domain.activeLoadCase if self.domain else None
+        pair = self.eigenPairs.get(lc.label) if lc else None
+        if pair is None:
+            self.isSolved = False
+            return
+        self.eigval, self.eigvec = pair
+        self.activeEigVal = min(self.activeEigVal,max(len(self.eigval)-1,0))
+        self.isSolved = True
+
+
+
+class ModalSolver(Solver):
+    """Solver of free vibration of the domain, natural circular frequencies omega and modes r satisfy K*r = omega^2*M*r
+    
+    :param str label: string label of receiver
+    """
+    domain = None
+    """*(Domain)* domain being solved"""
+    linsolver = None
+    """*(LinearStaticSolver)* linear solver providing numbering of equations, stiffness matrix and its factorization"""
+    eigval = None
+    """*(np.array)* eigen values (squared natural circular frequencies omega^2 [rad2/s2]) in ascending order"""
+    eigvec = None
+    """*(np.array(2d))* (neq,nmodes) eigen vectors (natural modes) normalized with respect to mass matrix"""
+    activeEigVal = 0
+    """*(int)* index of active eigen value"""
+    nmodes = 10
+    """*(int)* number of computed modes"""
+    lumpedMass = False
+    """*(bool)* if True, lumped mass matrices are used, consistent ones otherwise"""
+    shift = 0.
+    """*(float)* eigen values (omega^2) closest to shift are computed, the lowest ones for zero shift"""
+    tolerance = 1.e-10
+    """*(float)* relative accuracy of eigen values computed by Lanczos method"""
+    muu = None
+    """*(np.array(2d)|scipy.sparse.csr_matrix)* assembled mass matrix (free-free DOFs) of the last solution"""
+    timings = None
+    """*(dict)* wall times [s] of phases 'stiffness', 'mass' and 'eigen' of the last solution"""
+
+    def __init__(self,label='modalsolver'):
+        Solver.__init__(self,label=label)
+        self.linsolver = LinearStaticSolver()
+        self.reset()
+
+    def solve(self,domain=None):
+        """Solves the domain
+        
+        :param Domain domain: domain to be solved
+        :rtype: bool
+        """
+        if not domain:
+            if not self.session or not self.session.domain:
+                logger.error( langStr('ModalSolver: No domain to solve...', 'Žádná síť pro řešení...') )
+                return 1
+        self.domain = domain if domain else self.session.domain
+        self.isSolved = False
+        self.timings = {}
+        t = time.time()
+        # numbering of equations, stiffness matrix and its factorization are reused from linsolver
+        if self.linsolver.solve(self.domain):
+            return 1
+        self.timings['stiffness'] = time.time()-t
+        neq = self.linsolver.neq
+        if neq == 0:
+            logger.error( langStr('ModalSolver: no free DOFs', 'Žádné volné stupně volnosti') )
+            return 1
+        t = time.time()
+        self.muu = self.assembleMassMatrix()
+        self.timings['mass'] = time.time()-t
+        t = time.time()
+        try:
+            self.eigval,self.eigvec = self.solveEigenProblem(self.linsolver.kuu, self.muu)
+        except (ValueError,RuntimeError,linalg.LinAlgError) as error:
+            logger.error( langStr('Eigen problem solution failed\n', 'Chyba při řešení problému vlastních čísel\n') + str(error))
+            return 1
+        self.timings['eigen'] = time.time()-t
+        if len(self.eigval) == 0:
+            logger.error( langStr('ModalSolver: no mass in free DOFs (zero densities?)', 'Žádná hmotnost ve volných stupních volnosti (nulové hustoty?)') )
+            return 1
+        self.activeEigVal = min(self.activeEigVal,len(self.eigval)-1)
+        logger.info( langStr('Solution finished successfully, the lowest natural frequency %g Hz', 'Úloha úspěšně vyřešena, nejnižší vlastní frekvence %g Hz') % self.giveFrequencies()[0] )
+        self.isSolved = True
+        return 0
+
+    def solveEigenProblem(self, kuu, muu):
+        """Returns :py:attr:`nmodes` eigen values closest to :py:attr:`shift` in ascending order and eigen vectors normalized with respect to mass matrix
+        
+        :param np.array(2d)|scipy.sparse.csr_matrix kuu: stiffness matrix
+        :param np.array(2d)|scipy.sparse.csr_matrix muu: mass matrix
+        :rtype: (np.array,np.array(2d))
+        """
+        neq = kuu.shape[0]
+        if SP is not None and SP.issparse(kuu) and self.nmodes < neq-1:
+            # shift-invert Lanczos method, (K-shift*M)^-1 is applied by factorization of linsolver for zero shift
+            factorization = self.linsolver.factorization
+            opinv = None
+            if self.shift == 0. and not isinstance(factorization,PreconditionedCGSolution):
+                opinv = SPLA.LinearOperator((neq,neq), matvec=factorization.solve, dtype=float)
+            w,v = SPLA.eigsh(kuu, k=self.nmodes, M=muu, sigma=self.shift, which='LM', OPinv=opinv, tol=self.tolerance)
+        else:
+            k = kuu.toarray() if SP is not None and SP.issparse(kuu) else kuu
+            m = muu.toarray() if SP is not None and SP.issparse(muu) else muu
+            # M*r = mu*(K-shift*M)*r, mu = 1/(omega^2-shift), allows singular mass matrix
+            mu,v = LA.eigh(m, k-self.shift*m)
+            order = argsort(-abs(mu))
+            order = order[abs(mu[order]) > 1.e-12*abs(mu).max()][:self.nmodes] if abs(mu).max() > 0. else order[:0]
+            w,v = self.shift+1./mu[order],v[:,order]
+        order = argsort(w)
+        w,v = w[order],v[:,order]
+        # normalization with respect to mass matrix
+        norm = sqrt(abs(einsum('ij,ij->j', v, muu.dot(v))))
+        return w, v/where(norm > 0., norm, 1.)
+
+    def assembleMassMatrix(self, lumped=None):
+        """Assembles mass matrix of free DOFs (see :py:meth:`LinearStaticSolver.assembleMassMatrix`) in the same format as stiffness matrix of :py:attr:`linsolver`
+        
+        :param bool lumped: if True, lumped mass matrices are used, consistent ones otherwise, :py:attr:`lumpedMass` if None
+        :rtype: np.array(2d) | scipy.sparse.csr_matrix
+        """
+        return self.linsolver.assembleMassMatrix(self.lumpedMass if lumped is None else lumped, SP is not None and SP.issparse(self.linsolver.kuu))
 
+    def giveFrequencies(self):
+        """Returns natural frequencies [Hz] of computed modes
+        
+        :rtype: np.array
+        """
+        return sqrt(abs(self.eigval))/(2.*pi) if self.eigval is not None else None
+
+    def giveActiveSolutionVector(self):
+        if self.isSolved:
+            r=zeros(self.linsolver.neq+self.linsolver.pneq)
+            r[0:self.linsolver.neq] = self.eigvec[:, self.activeEigVal]
+            return r
+        else:
+            return None
+
+    def giveActiveEigenValue(self):
+        if self.isSolved:
+            return self.eigval[self.activeEigVal]
+        return None
+
+
+def removeFile(fileName):
+    """Deletes file, nothing is done if it does not exist
+
+    :param str fileName: name of file
+    """
+    try:
+        os.remove(fileName)
+    except OSError:
+        pass
+
+
+class TimeHistorySolver(Solver):
+    """Solver of forced vibration of the domain M*a + C*v + K*r = F(t) by HHT-alpha method, loads of load cases are scaled by their time histories (see :py:attr:`LoadCase.history`)
+    
+    :param str label: string label of receiver
+    """
+    domain = None
+    """*(Domain)* domain being solved"""
+    linsolver = None
+    """*(LinearStaticSolver)* linear solver providing numbering of equations, stiffness and load matrices"""
+    dt = 0.01
+    """*(float)* time step [s]"""
+    nsteps = 100
+    """*(int)* number of time steps"""
+    alpha = 0.
+    """*(float)* HHT-alpha parameter from [-1/3,0], negative values introduce numerical damping of high frequencies, 0 gives Newmark average acceleration method"""
+    massDamping = 0.
+    """*(float)* mass proportional coefficient of Rayleigh damping [1/s]"""
+    stiffnessDamping = 0.
+    """*(float)* stiffness proportional coefficient of Rayleigh damping [s]"""
+    lumpedMass = False
+    """*(bool)* if True, lumped mass matrices are used, consistent ones otherwise"""
+    outputStride = 1
+    """*(int)* every outputStride-th time step is written to :py:attr:`displacements`"""
+    fileName = None
+    """*(str)* name of .npy file of :py:attr:`displacements`, temporary file is used if None"""
+    times = None
+    """*(np.array)* times of records of :py:attr:`displacements`"""
+    displacements = None
+    """*(np.memmap)* (nrec,neq+pneq) displacements of all DOFs in times :py:attr:`times`"""
+    activeStep = 0
+    """*(int)* index of displayed record of :py:attr:`displacements`"""
+    muu = None
+    """*(np.array(2d)|scipy.sparse.csr_matrix)* assembled mass matrix (free-free DOFs) of the last solution"""
+    timings = None
+    """*(dict)* wall times [s] of phases 'stiffness', 'mass', 'factorization' and 'integration' of the last solution"""
+    temporaryFile = None
+    """*(weakref.finalize)* finalizer deleting temporary file of :py:attr:`displacements`, called by :py:meth:`closeOutput` or when :py:attr:`displacements` is released"""
+
+    def __init__(self,label='timehistorysolver'):
+        Solver.__init__(self,label=label)
+        self.linsolver = LinearStaticSolver()
+        self.reset()
+
+    def reset(self):
+        Solver.reset(self)
+        self.closeOutput()
+
+    def solve(self,domain=None):
+        """Solves the domain
+        
+        :param Domain domain: domain to be solved
+        :rtype: bool
+        """
+        if not domain:
+            if not self.session or not self.session.domain:
+                logger.error( langStr('TimeHistorySolver: No domain to solve...', 'Žádná síť pro řešení...') )
+                return 1
+        self.domain = domain if domain else self.session.domain
+        self.isSolved = False
+        if not -1./3. <= self.alpha <= 0. or self.dt <= 0. or self.nsteps < 1 or self.outputStride < 1:
+            logger.error( langStr('TimeHistorySolver: wrong parameters (alpha from [-1/3,0], positive dt, nsteps and outputStride)', 'Chybné parametry (alpha z [-1/3,0], kladné dt, nsteps a outputStride)') )
+            return 1
+        self.timings = {}
+        t = time.time()
+        if self.linsolver.solve(self.domain):
+            return 1
+        self.timings['stiffness'] = time.time()-t
+        if self.linsolver.neq == 0:
+            logger.error( langStr('TimeHistorySolver: no free DOFs', 'Žádné volné stupně volnosti') )
+            return 1
+        lcs = list(self.domain.loadCases.values())
+        if not [lc for lc in lcs if lc.history]:
+            logger.error( langStr('TimeHistorySolver: no load case with time history', 'Žádný zatěžovací stav s časovým průběhem') )
+            return 1
+        t = time.time()
+        self.muu = self.linsolver.assembleMassMatrix(self.lumpedMass, SP is not None and SP.issparse(self.linsolver.kuu))
+        self.timings['mass'] = time.time()-t
+        try:
+            self.integrate(lcs)
+        except (ValueError,RuntimeError,linalg.LinAlgError) as error:
+            logger.error( langStr('Time integration failed\n', 'Chyba při integraci v čase\n') + str(error))
+            return 1
+        self.activeStep = min(self.activeStep,len(self.times)-1)
+        logger.info( langStr('Solution finished successfully, %d time steps, %d records', 'Úloha úspěšně vyřešena, %d časových kroků, %d záznamů') % (self.nsteps,len(self.times)) )
+        self.isSolved = True
+        return 0
+
+    def integrate(self, lcs):
+        """Performs time stepping from zero initial displacements and velocities and writes records to :py:attr:`displacements`
+        
+        :param [LoadCase] lcs: load cases in order of columns of load matrix of :py:attr:`linsolver`
+        """
+        linsolver = self.linsolver
+        neq = linsolver.neq
+        kuu,muu = linsolver.kuu,self.muu
+        dt,alpha,a0,a1 = self.dt,self.alpha,self.massDamping,self.stiffnessDamping
+        beta,gamma = 0.25*(1.-alpha)**2,0.5-alpha
+        c0,c1,c2 = 1./(beta*dt*dt),gamma/(beta*dt),1./(beta*dt)
+        c3,c4,c5 = 0.5/beta-1.,gamma/beta-1.,dt*(0.5*gamma/beta-1.)
+        # load factors of load cases in all steps, loads of free DOFs include effect of prescribed displacements acting quasi-statically
+        nlc = len(lcs)
+        factors = array([lc.giveLoadFactors(arange(self.nsteps+1)*dt) for lc in lcs]).T
+        rp = linsolver.r.data[neq:,:nlc]
+        loads = linsolver.loadMatrix[:neq] - linsolver.kup.dot(rp)
+        # Rayleigh damping C = a0*M + a1*K, the effective stiffness matrix is factorized once
+        t = time.time()
+        keff = (c0+(1.+alpha)*c1*a0)*muu + (1.+alpha)*(1.+c1*a1)*kuu
+        solve = self.linsolver.giveSolveFunction(keff)
+        self.timings['factorization'] = time.time()-t
+        t = time.time()
+        self.openOutput(neq+linsolver.pneq)
+        u,v = zeros(neq),zeros(neq)
+        a = self.giveInitialAcceleration(loads.dot(factors[0]))
+        self.displacements[0,neq:] = rp.dot(factors[0])
+        for n in range(self.nsteps):
+            # (1+alpha)*F(t_n+1) - alpha*F(t_n) + M*(..) + C*(..) + K*(..) with C expanded to Rayleigh damping
+            w = c1*u + c4*v + c5*a
+            cv = (1.+alpha)*w + alpha*v
+            rhs = loads.dot((1.+alpha)*factors[n+1]-alpha*factors[n]) + muu.dot(c0*u+c2*v+c3*a+a0*cv) + kuu.dot(alpha*u+a1*cv)
+            un = solve(rhs)
+            an = c0*(un-u) - c2*v - c3*a
+            v = v + dt*((1.-gamma)*a + gamma*an)
+            u,a = un,an
+            if (n+1) % self.outputStride == 0:
+                record = self.displacements[(n+1)//self.outputStride]
+                record[:neq] = u
+                record[neq:] = rp.dot(factors[n+1])
+        self.displacements.flush()
+        self.timings['integration'] = time.time()-t
+
+    def giveInitialAcceleration(self, f0):
+        """Returns initial accelerations M^-1*f0 in equilibrium with initial loads f0, zeros for zero loads or singular mass matrix
+        
+        :param np.array f0: initial loads of free DOFs
+        :rtype: np.array
+        """
+        if not f0.any():
+            return zeros(f0.shape)
+        try:
+            return self.linsolver.giveSolveFunction(self.muu)(f0)
+        except (ValueError,RuntimeError,linalg.LinAlgError):
+            logger.warning( langStr('Singular mass matrix, initial accelerations are set to zero', 'Singulární matice hmotnosti, počáteční zrychlení jsou nulová') )
+            return zeros(f0.shape)
+
+    def openOutput(self, ndofs):
+        """Creates memory-mapped array :py:attr:`displacements` in .npy file :py:attr:`fileName` (temporary one if None) and :py:attr:`times` of its records
+        
+        :param int ndofs: number of all DOFs
+        """
+        self.closeOutput()
+        fileName = self.fileName
+        if not fileName:
+            handle,fileName = tempfile.mkstemp(prefix='edubeam',suffix='.npy')
+            os.close(handle)
+        self.times = arange(0,self.nsteps+1,self.outputStride)*self.dt
+        self.displacements = open_memmap(fileName, mode='w+', dtype=float, shape=(len(self.times),ndofs))
+        if not self.fileName:
+            # the file is deleted also if the solver is discarded without closing the output
+            self.temporaryFile = weakref.finalize(self.displacements, removeFile, fileName)
+
+    def closeOutput(self):
+        """Releases :py:attr:`displacements` and deletes its temporary file"""
+        self.displacements = None
+        if self.temporaryFile:
+            self.temporaryFile()
+            self.temporaryFile = None
+
+    def giveDofHistory(self, dof):
+        """Returns displacements of one DOF in all times :py:attr:`times`
+        
+        :param int dof: code number of DOF (see :py:attr:`Node.loc`)
+        :rtype: np.array
+        """
+        return array(self.displacements[:,dof])
+
+    def giveActiveSolutionVector(self):
+        if self.isSolved:
+            return array(self.displacements[self.activeStep])
+        else:
+            return None
+
+    def giveActiveTime(self):
+        if self.isSolved:
+            return self.times[self.activeStep]
+        return None
 
 
 class Session:
@@ -3833,6 +7387,7 @@ class Session:
         Domain.addNode           : Domain.delNode,
         Domain.addElement        : Domain.delElement,
         Domain.addLoadCase       : Domain.delLoadCase,
+        Domain.addLoadCombination : Domain.delLoadCombination,
         Domain.addNodalLoad      : Domain.delNodalLoad,
         Domain.addPrescribedDspl : Domain.delPrescribedDspl,
         Domain.addElementLoad    : Domain.delElementLoad,
@@ -3842,6 +7397,7 @@ class Session:
         Domain.delNode           : Domain.addNode,
         Domain.delElement        : Domain.addElement,
         Domain.delLoadCase       : Domain.addLoadCase,
+        Domain.delLoadCombination : Domain.addLoadCombination,
         Domain.delNodalLoad      : Domain.addNodalLoad,
         Domain.delPrescribedDspl : Domain.addPrescribedDspl,
         Domain.delElementLoad    : Domain.addElementLoad,
@@ -3854,6 +7410,7 @@ class Session:
         Domain.addNode           : langStr('add node','přidat uzel'),
         Domain.addElement        : langStr('add element','přidat prvek'),
         Domain.addLoadCase       : langStr('add load case','přidat zatěžovací stav'),
+        Domain.addLoadCombination : langStr('add load combination','přidat kombinaci zatížení'),
         Domain.addNodalLoad      : langStr('add nodal load','přidat uzlové zatížení'),
         Domain.addPrescribedDspl : langStr('add prescribed displacement','přidat předepsané přemístění'),
         Domain.addElementLoad    : langStr('add element load','přidat prvkové zatížení'),
@@ -3863,6 +7420,7 @@ class Session:
         Domain.delNode           : langStr('delete node','smazat uzel'),
         Domain.delElement        : langStr('delete element','smazat prvek'),
         Domain.delLoadCase       : langStr('delete load case','smazat zatěžovací stav'),
+        Domain.delLoadCombination : langStr('delete load combination','smazat kombinaci zatížení'),
         Domain.delNodalLoad      : langStr('delete nodal load','smazat uzlové zatížení'),
         Domain.delPrescribedDspl : langStr('delete prescribed displacement','smazat předepsané přemístění'),
         Domain.delElementLoad    : langStr('delete element load','smazat prvkové zatížení'),
@@ -3872,6 +7430,7 @@ class Session:
         Domain.changeNode           : langStr('change node','změnit uzel'),
         Domain.changeElement        : langStr('change element','změnit prvek'),
         Domain.changeLoadCase       : langStr('change load case','změnit zatěžovací stav'),
+        Domain.changeLoadCombination : langStr('change load combination','změnit kombinaci zatížení'),
         Domain.changeNodalLoad      : langStr('change nodal load','změnit uzlové zatížení'),
         Domain.changePrescribedDspl : langStr('change prescribed displacement','změnit předepsané přemístění'),
         Domain.changeElementLoad    : langStr('change element load','změnit prvkové zatížení'),
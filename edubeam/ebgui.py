@@ -306,6 +306,10 @@ def createPostProcesorBox (self, parent, id, glframe):
     return LinearStabilityPostProcessBox(parent, id, glframe)
 LinearStabilitySolver.postProcesorBox = createPostProcesorBox
 
+def createPostProcesorBox (self, parent, id, glframe):
+    return ModalPostProcessBox(parent, id, glframe)
+ModalSolver.postProcesorBox = createPostProcesorBox
+
 ##################################################################
 #
 # Context
@@ -749,7 +753,7 @@ class GLFrame(wx.Frame):
         
         ### Create glFrame toolBar###
         self.toolBar = wx.ToolBar(self, -1, style=wx.TB_HORIZONTAL|wx.TB_FLAT|wx.TB_DOCKABLE)
-        self.loadCaseChoice = ComboBoxWithHelp( self.toolBar, wx.NewId(), size=(200, -1), value=session.domain.activeLoadCase.label, choices=list(session.domain.loadCases.keys()), style=wx.CB_DROPDOWN, help = langStr('Load Case','Zatěžovací stav') )
+        self.loadCaseChoice = ComboBoxWithHelp( self.toolBar, wx.NewId(), size=(200, -1), value=session.domain.activeLoadCase.label, choices=list(session.domain.loadCases.keys())+list(session.domain.giveCombinedLoadCases().keys()), style=wx.CB_DROPDOWN, help = langStr('Load Case','Zatěžovací stav') )
         self.loadCaseChoice.Bind(wx.EVT_COMBOBOX,self.onChangeLoadCaseChoice)
         self.toolBar.AddControl(self.loadCaseChoice)
         self.toolBar.Realize()
@@ -1145,18 +1149,10 @@ class GLFrame(wx.Frame):
             return
         ratio = 0.2 # maximal displayed value has size ratio*dim
         dim = session.domain.giveMaxDim()
-        maxw,maxf = 1.e-6, 1.e-6 # max deflection, max internal force, set to prevent zero division
-        for elem in session.domain.elements.values():
-            u,w = elem.computeDefl(session.solver.giveActiveSolutionVector())
-            w = max(max([abs(i) for i in u]),max([abs(i) for i in w]))
-            if w > maxw:
-                maxw = w
-            distances, N, labelMask = elem.computeNormalForce(session.solver.giveActiveSolutionVector())
-            distances, V, labelMask = elem.computeShearForce(session.solver.giveActiveSolutionVector())
-            distances, M = elem.computeMoment(session.solver.giveActiveSolutionVector())
-            f = max(max([abs(i) for i in N]),max([abs(i) for i in V]),max([abs(i) for i in M]))
-            if f > maxf:
-                maxf = f
+        diagrams = session.solver.giveBeamDiagrams()
+        # max deflection, max internal force, set to prevent zero division
+        maxw = max(1.e-6, diagrams.giveMaxDisplacement())
+        maxf = max(1.e-6, diagrams.giveMaxInternalForce())
         globalSizesScales.deformationScale = ratio*dim/maxw
         self.context.scaleBox.defGeom.SetValue(str('{0:.3g}'.format(float(globalSizesScales.deformationScale))))
         globalSizesScales.intForceScale = ratio*dim/maxf
@@ -1195,6 +1191,9 @@ class GLFrame(wx.Frame):
         #update autoscale in post processor
         if session.solver.isSolved:
             self.autoScale(event)
+        #update results of the load case in post processor
+        if hasattr(self.context.postProcessBox, 'onLoadCaseChange'):
+            self.context.postProcessBox.onLoadCaseChange(event)
         #update opened spreadsheet
         if self.context.postProcessBox.spreadSheet:
             self.context.postProcessBox.ResultsToSpreadsheet(event)
@@ -1457,6 +1456,8 @@ class GLFrame(wx.Frame):
     def updateLoadCaseChoice(self):
         self.loadCaseChoice.Clear()
         self.loadCaseChoice.Append(sorted([*session.domain.loadCases]))
+        # variants of load combinations follow load cases
+        self.loadCaseChoice.Append([*session.domain.giveCombinedLoadCases()])
         self.loadCaseChoice.SetValue( session.domain.activeLoadCase.label if session.domain.activeLoadCase else '' )
        
     def checkSolve(self, event):
@@ -1838,11 +1839,17 @@ class GLFrame(wx.Frame):
                 if not session.solver.isSolved:
                     raise EduBeamError
                 if isBeamResultFlag():
+                    rr = session.solver.giveActiveSolutionVector()
+                    # all elements are sampled at once, end values are cached by solver
+                    diagrams = session.solver.giveBeamDiagrams()
                     for elem in session.domain.elements.values():
-                        elem.OnDrawResults(session.solver.giveActiveSolutionVector())
+                        elem.OnDrawResults(rr, diagrams)
                 if globalFlags.intForcesDisplayFlag[3]:
                     for node in session.domain.nodes.values():
                         node.OnDrawResults(useUniformSize=useUniformSize)
+            # influence line computed e.g. from Python box by session.solver.computeInfluenceLine(...)
+            if session.solver.isSolved and getattr(session.solver,'influenceLine',None) is not None:
+                session.solver.influenceLine.OnDraw()
         #
         except EduBeamError:
             logger.warning( langStr('Problem has not been solved yet ...', 'Úloha ještě není vypočtena ...') )
@@ -4162,7 +4169,12 @@ class LinearStabilityPostProcessBox(wx.Panel):
         self.activeEigvalLabel = wx.StaticText(self, -1, langStr('Active mode:', 'Aktivní tvar:'), (xx2, zz))
         self.activeEigValSpin =  wx.SpinCtrl(self, value='0', pos=(xx2+100, zz), size=(50, -1))
         self.activeEigValSpin.SetRange(0, 1)
-        self.Bind( wx.EVT_SPINCTRL, self.OnActiveEigValSpin )
+        self.Bind( wx.EVT_SPINCTRL, self.OnActiveEigValSpin, self.activeEigValSpin )
+        # number of computed modes
+        wx.StaticText(self, -1, langStr('Modes:', 'Počet tvarů:'), (xx2, zz+dz))
+        self.nModesSpin =  wx.SpinCtrl(self, value='1', pos=(xx2+100, zz+dz), size=(50, -1))
+        self.nModesSpin.SetRange(1, 100)
+        self.Bind( wx.EVT_SPINCTRL, self.OnNModesSpin, self.nModesSpin )
         self.activeEigvalValue = wx.StaticText(self, -1, '', (xx2, zz+2*dz))
         #
         self.defGeoCB = wx.CheckBox(self, -1, langStr('Eigen mode', 'Vlastní tvar'), (xx2, zz+4*dz))
@@ -4206,7 +4218,27 @@ class LinearStabilityPostProcessBox(wx.Panel):
             return
         session.solver.activeEigVal = self.activeEigValSpin.GetValue()
         if session.solver.isSolved:
-            self.activeEigvalValue.SetLabel(langStr("Eigen value","Vl. hodnota") + ": %e"%session.solver.giveActiveEigenValue().real)
+            self.activeEigvalValue.SetLabel(self.giveActiveValueLabel())
+        self.glframe.Refresh(False)
+
+    def OnNModesSpin( self, event ):
+        # more or less modes require new solution
+        session.solver.nmodes = self.nModesSpin.GetValue()
+        self.glframe.solve()
+        self.enable(True)
+        self.glframe.Refresh(False)
+
+    def giveActiveValueLabel(self):
+        return langStr("Eigen value","Vl. hodnota") + ": %e"%session.solver.giveActiveEigenValue().real
+
+    def onLoadCaseChange(self, event=None):
+        # eigen pairs of the new active load case are cached by the solver
+        if session.solver.isSolved:
+            self.activeEigValSpin.SetRange(0, max(len(session.solver.eigval)-1, 0))
+            self.activeEigValSpin.SetValue(session.solver.activeEigVal)
+            self.activeEigvalValue.SetLabel(self.giveActiveValueLabel())
+        else:
+            self.activeEigvalValue.SetLabel('')
         self.glframe.Refresh(False)
 
     def OnAutoScale(self, event):
@@ -4218,9 +4250,10 @@ class LinearStabilityPostProcessBox(wx.Panel):
         # update label (necessary if a new file opened)
         self.defGeom.SetValue(str('{0:.3g}'.format(float(globalSizesScales.deformationScale))))
         self.intForces.SetValue(str('{0:.3g}'.format(float(globalSizesScales.intForceScale))))
+        self.nModesSpin.SetValue(session.solver.nmodes)
         if session.solver.isSolved:
-            self.activeEigValSpin.SetRange(0, min (10, len(session.solver.giveActiveSolutionVector())/3))
-            self.activeEigvalValue.SetLabel(langStr("Eigen value","Vl. hodnota") + ": %e"%session.solver.giveActiveEigenValue().real)
+            self.activeEigValSpin.SetRange(0, max(len(session.solver.eigval)-1, 0))
+            self.activeEigvalValue.SetLabel(self.giveActiveValueLabel())
 
         self.Show(show)
         self.parent.currentBox = self
@@ -4298,6 +4331,13 @@ class LinearStabilityPostProcessBox(wx.Panel):
         self.glframe.canvas.SetFocus()
 
 
+class ModalPostProcessBox(LinearStabilityPostProcessBox):
+    """Panel for postprocess control of modal analysis, natural modes are shown like buckling modes"""
+
+    def giveActiveValueLabel(self):
+        return langStr("Frequency","Frekvence") + ": %g Hz"%session.solver.giveFrequencies()[session.solver.activeEigVal]
+
+
 class SelectSolverBox(wx.Panel):
     """Panel for postprocess control"""
     
@@ -4306,7 +4346,9 @@ class SelectSolverBox(wx.Panel):
         self.parent = parent
         #
         problemTypes = [langStr('Linear static', 'Lineární statika'),
-                        langStr('Linear stability', 'Lineární stabilita')]
+                        langStr('Linear stability', 'Lineární stabilita'),
+                        langStr('Modal analysis', 'Modální analýza'),
+                        langStr('Second-order (P-Delta)', 'Teorie druhého řádu (P-Delta)')]
                         
 
         # 
@@ -4346,6 +4388,12 @@ class SelectSolverBox(wx.Panel):
             elif item == 1:
                 session.setSolver(LinearStabilitySolver())
                 self.ShowStabilityOptions()
+            elif item == 2:
+                session.setSolver(ModalSolver())
+                self.HideStabilityOptions()
+            elif item == 3:
+                session.setSolver(PDeltaSolver())
+                self.HideStabilityOptions()
         ##elif ctrl == self.stabilityLcsCTRL:
         ##    session.solver.activeLCS = item
         ##    print "Selected ", item, " as active LCS"
@@ -4708,7 +4756,7 @@ class Notebook(wx.Frame):
             print('Notebook.importData: wrong argument')
 
     def importData_linStatGlobMatrix(self):
-        kuu,kpp,kup = session.solver.assembleStiffnessMatrix()
+        kuu,kpp,kup = session.solver.assembleStiffnessMatrix(sparse=False)
         r,f = session.solver.r[session.domain.activeLoadCase.label], session.solver.f[session.domain.activeLoadCase.label]
         self.k = MySheet(self.nb,1)
         self.r = MySheet(self.nb,2)
@@ -4768,7 +4816,8 @@ class Notebook(wx.Frame):
             self.parent.ResultsToSpreadsheetClose()
         kl  = elem.computeLocalStiffness()
         kg  = elem.computeStiffness()
-        f,r = elem.computeEndValues(session.solver.r[session.domain.activeLoadCase.label])
+        elems,fe,re = session.solver.giveEndValues(session.domain.activeLoadCase.label)
+        f,r = fe[elems.index(elem)],re[elems.index(elem)]
         self.kl = MySheet(self.nb,1)
         self.kg = MySheet(self.nb,2)
         self.r  = MySheet(self.nb,3)
@@ -4841,8 +4890,10 @@ class Notebook(wx.Frame):
             self.Elements.SetCellValue(0,i, header[i])
         row = 1
         sortedElems = sorted(session.domain.elements.values(), key=lambda n: natural_key(n.label))
+        elems,fe,re = session.solver.giveEndValues(session.domain.activeLoadCase.label)
+        index = dict( (e,i) for i,e in enumerate(elems) )
         for e in sortedElems:
-            l,d = e.computeEndValues(session.solver.r[session.domain.activeLoadCase.label])
+            l,d = fe[index[e]],re[index[e]]
             data = []
             data.append(smart_str(e.label))
             data.append(e.nodes[0].label + '-' + e.nodes[1].label)
@@ -5276,12 +5327,15 @@ def OnDraw (self):
             glCircle(c2[0]-h*c, c2[1], c2[2]-h*s,h)
     glDefaultColor()
 
-def OnDrawResults(self, rr, nseg=20):
-    """Draw element deformed shape and internal forces N, V, M"""
+def OnDrawResults(self, rr, diagrams=None, nseg=20):
+    """Draw element deformed shape and internal forces N, V, M, values are taken from diagrams (see :py:class:`BeamDiagrams`) sampled for all elements at once"""
     if not isBeamResultFlag():
         return
     if not self.domain.session.solver.isSolved:
         raise EduBeamError
+    if diagrams is None or self not in diagrams.index:
+        diagrams = BeamDiagrams(self.domain, rr, self.domain.activeLoadCase, [self], nseg)
+    x,u,w,N,V,M,labelMask = diagrams.give(self)
     c1 = self.nodes[0].coords
     c2 = self.nodes[1].coords
     l,dx,dz = self.computeGeom()
@@ -5291,93 +5345,72 @@ def OnDrawResults(self, rr, nseg=20):
     if globalFlags.deformationDisplayFlag:
         (r,g,b) = globalSettings.defgeoColor
         glColor3f(r,g,b)
-        rl = self.computeEndDspl(rr)
-        u,w = self.computeDefl(rl=rl, fzloc=None, geom=(l,dx,dz))
         glBegin(GL_LINE_STRIP )
-        for i in range(nseg+1):
-            xl = float(i)/float(nseg)
+        for i in range(len(x)):
+            xl = x[i]/l
             xc = (1.-xl)*c1[0]+xl*c2[0]+(c*u[i]-s*w[i])*float(globalSizesScales.deformationScale)
             zc = (1.-xl)*c1[2]+xl*c2[2]+(s*u[i]+c*w[i])*float(globalSizesScales.deformationScale)
             glVertex3f (xc, 0.0, zc)
         glEnd()
         if globalFlags.valuesDisplayFlag:
-            minw = min(w)
-            posmin = w.index(minw)
-            maxw = max(w)
-            posmax = w.index(maxw)
-            if posmin!=0 and posmin!=nseg:
-               posmin *= l/float(nseg)
-               glPrintString(c1[0]+c*posmin-s*minw*float(globalSizesScales.deformationScale), c1[1], c1[2]+s*posmin+c*minw*float(globalSizesScales.deformationScale),'{0:.2e}'.format(abs(minw)))
-            if posmax!=0 and posmax!=nseg:
-               posmax *= l/float(nseg)
-               glPrintString(c1[0]+c*posmax-s*maxw*float(globalSizesScales.deformationScale), c1[1], c1[2]+s*posmax+c*maxw*float(globalSizesScales.deformationScale),'{0:.2e}'.format(abs(maxw)))
+            posmin = w.argmin()
+            minw = w[posmin]
+            posmax = w.argmax()
+            maxw = w[posmax]
+            if 0 < x[posmin] < l:
+               pos = x[posmin]
+               glPrintString(c1[0]+c*pos-s*minw*float(globalSizesScales.deformationScale), c1[1], c1[2]+s*pos+c*minw*float(globalSizesScales.deformationScale),'{0:.2e}'.format(abs(minw)))
+            if 0 < x[posmax] < l:
+               pos = x[posmax]
+               glPrintString(c1[0]+c*pos-s*maxw*float(globalSizesScales.deformationScale), c1[1], c1[2]+s*pos+c*maxw*float(globalSizesScales.deformationScale),'{0:.2e}'.format(abs(maxw)))
         glDefaultColor()
     #
     if not (globalFlags.intForcesDisplayFlag[0] or globalFlags.intForcesDisplayFlag[1] or globalFlags.intForcesDisplayFlag[2]):
         return
     #
-    F = self.computeEndForces(rr)
+    F = diagrams.fe[diagrams.index[self]]
     #
     if globalFlags.intForcesDisplayFlag[0]: # N force
         (r,g,b) = globalSettings.nForceColor
         glColor3f(r,g,b)
         glBegin(GL_LINE_STRIP )
         glVertex3f (c1[0], c1[1], c1[2])
-        distances,N,labelMask = self.computeNormalForce(F=F)
-        for i in range(0,len(distances)):
-            xl = distances[i]
+        for i in range(len(x)):
+            xl = x[i]
             glVertex3f (
                 c1[0]+c*xl+s*N[i]*float(globalSizesScales.intForceScale),
                 c1[1],
                 c1[2]+s*xl-c*N[i]*float(globalSizesScales.intForceScale))
-        #glVertex3f (c1[0]-s*F[0]*float(globalSizesScales.intForceScale), c1[1], c1[2]+c*F[0]*float(globalSizesScales.intForceScale))
-        #glVertex3f (c2[0]+s*F[3]*float(globalSizesScales.intForceScale), c2[1], c2[2]-c*F[3]*float(globalSizesScales.intForceScale))
         glVertex3f (c2[0], c2[1], c2[2])
         glEnd()
         if globalFlags.valuesDisplayFlag:
-            for i in range(0,len(labelMask)):
-                if labelMask[i]:
-                    xl = distances[i]
-                    glPrintString (c1[0]+c*xl+s*N[i]*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*xl-c*N[i]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(posZero(N[i])))
-        
-            #glPrintString (c1[0]-s*F[0]*float(globalSizesScales.intForceScale), c1[1], c1[2]+c*F[0]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(-F[0]))
-            #glPrintString (c2[0]+s*F[3]*float(globalSizesScales.intForceScale), c2[1], c2[2]-c*F[3]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(F[3]))
+            for i in nonzero(labelMask)[0]:
+                xl = x[i]
+                glPrintString (c1[0]+c*xl+s*N[i]*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*xl-c*N[i]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(posZero(N[i])))
     if globalFlags.intForcesDisplayFlag[1]: # V force
         (r,g,b) = globalSettings.vForceColor
         glColor3f(r,g,b)
         glBegin(GL_LINE_STRIP )
         glVertex3f (c1[0], c1[1], c1[2])
-        distances,V,labelMask = self.computeShearForce(F=F)
-        for i in range(0,len(distances)):
-            xl = distances[i]
+        for i in range(len(x)):
+            xl = x[i]
             glVertex3f (
                 c1[0]+c*xl+s*V[i]*float(globalSizesScales.intForceScale),
                 c1[1],
                 c1[2]+s*xl-c*V[i]*float(globalSizesScales.intForceScale))
         glVertex3f (c2[0], c2[1], c2[2])
         glEnd()
-        
-        
-        #glVertex3f (c1[0]-s*F[1]*float(globalSizesScales.intForceScale), c1[1], c1[2]+c*F[1]*float(globalSizesScales.intForceScale))
-        #glVertex3f (c2[0]+s*F[4]*float(globalSizesScales.intForceScale), c2[1], c2[2]-c*F[4]*float(globalSizesScales.intForceScale))
-        #glVertex3f (c2[0], c2[1], c2[2])
-        #glEnd()
         if globalFlags.valuesDisplayFlag:
-            for i in range(0,len(labelMask)):
-                if labelMask[i]:
-                    xl = distances[i]
-                    glPrintString (c1[0]+c*xl+s*V[i]*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*xl-c*V[i]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(posZero(V[i])))
-            
-            #glPrintString (c1[0]-s*F[1]*float(globalSizesScales.intForceScale), c1[1], c1[2]+c*F[1]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(-F[1]))
-            #glPrintString (c2[0]+s*F[4]*float(globalSizesScales.intForceScale), c2[1], c2[2]-c*F[4]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(F[4]))
+            for i in nonzero(labelMask)[0]:
+                xl = x[i]
+                glPrintString (c1[0]+c*xl+s*V[i]*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*xl-c*V[i]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(posZero(V[i])))
     if globalFlags.intForcesDisplayFlag[2]: # M function
         (r,g,b) = globalSettings.mForceColor
         glColor3f(r,g,b)
         glBegin(GL_LINE_STRIP )
         glVertex3f (c1[0], c1[1], c1[2])
-        distances,M = self.computeMoment(F=F, fzloc=None, geom=(l,dx,dz))
-        for i in range(0,len(distances)):
-            xl = distances[i]
+        for i in range(len(x)):
+            xl = x[i]
             glVertex3f (
                 c1[0]+c*xl+s*M[i]*float(globalSizesScales.intForceScale),
                 c1[1],
@@ -5387,14 +5420,14 @@ def OnDrawResults(self, rr, nseg=20):
         if globalFlags.valuesDisplayFlag:
             glPrintString (c1[0]+s*F[2]*float(globalSizesScales.intForceScale), c1[1], c1[2]-c*F[2]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(abs(F[2])))
             glPrintString (c2[0]-s*F[5]*float(globalSizesScales.intForceScale), c2[1], c2[2]+c*F[5]*float(globalSizesScales.intForceScale),'{0:.2f}'.format(abs(F[5])))
-            minM = min(M)
-            posmin = M.index(minM)
-            maxM = max(M)
-            posmax = M.index(maxM)
-            if posmin!=0 and posmin!=len(distances)-1:
-                glPrintString(c1[0]+c*distances[posmin]+s*minM*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*distances[posmin]-c*minM*float(globalSizesScales.intForceScale),'{0:.2f}'.format(abs(minM)))
-            if posmax!=0 and posmax!=len(distances)-1:
-                glPrintString(c1[0]+c*distances[posmax]+s*maxM*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*distances[posmax]-c*maxM*float(globalSizesScales.intForceScale),'{0:.2f}'.format(abs(maxM)))
+            posmin = M.argmin()
+            minM = M[posmin]
+            posmax = M.argmax()
+            maxM = M[posmax]
+            if 0 < x[posmin] < l:
+                glPrintString(c1[0]+c*x[posmin]+s*minM*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*x[posmin]-c*minM*float(globalSizesScales.intForceScale),'{0:.2f}'.format(abs(minM)))
+            if 0 < x[posmax] < l:
+                glPrintString(c1[0]+c*x[posmax]+s*maxM*float(globalSizesScales.intForceScale), c1[1], c1[2]+s*x[posmax]-c*maxM*float(globalSizesScales.intForceScale),'{0:.2f}'.format(abs(maxM)))
             glDefaultColor()
 
 def isInside(self, bbox):
@@ -5583,3 +5616,38 @@ def OnDraw(self, useUniformSize=True):
 
 ElementLoad.OnDraw = OnDraw
 ##################################################################
+
+
+##################################################################
+# InfluenceLine
+##################################################################
+def OnDraw(self):
+    """Draw influence line along its elements, scaled as internal forces"""
+    (r,g,b) = globalSettings.mForceColor
+    glColor3f(r,g,b)
+    glLineWidth(float(globalSettings.defaultthick)*float(globalSizesScales.lineWidthCoeff))
+    scale = float(globalSizesScales.intForceScale)
+    coords = self.giveCoords()
+    for elem,xyz,values in zip(self.elems,coords,self.values):
+        l,dx,dz = elem.computeGeom()
+        c = dx/l
+        s = dz/l
+        c1 = elem.nodes[0].coords
+        c2 = elem.nodes[1].coords
+        glBegin(GL_LINE_STRIP)
+        glVertex3f (c1[0], c1[1], c1[2])
+        for i in range(len(values)):
+            glVertex3f (xyz[i,0]+s*values[i]*scale, xyz[i,1], xyz[i,2]-c*values[i]*scale)
+        glVertex3f (c2[0], c2[1], c2[2])
+        glEnd()
+    if globalFlags.valuesDisplayFlag and len(self.elems):
+        for i in (self.values.argmin(),self.values.argmax()):
+            ie,ist = divmod(i,self.values.shape[1])
+            l,dx,dz = self.elems[ie].computeGeom()
+            xyz,v = coords[ie,ist],self.values[ie,ist]
+            glPrintString (xyz[0]+dz/l*v*scale, xyz[1], xyz[2]-dx/l*v*scale, '{0:.3g}'.format(posZero(v,3)))
+    if globalFlags.labelDisplayFlag and len(self.elems):
+        glPrintString (coords[0,0,0], coords[0,0,1], coords[0,0,2], self.label)
+    glDefaultColor()
+
+InfluenceLine.OnDraw = OnDraw
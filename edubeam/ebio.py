@@ -236,6 +236,9 @@ def xmlStringFromDomain(domain):
         for container in (lc.nodalLoads,lc.elementLoads,lc.prescribedDspls):
             for val in container.values():
                 createDomElem(val.__class__.__name__,val.dict(),lcDom)
+    loadCombinations = createDomElem('loadCombinations',parent=d)
+    for comb in domain.loadCombinations.values():
+        createDomElem(comb.__class__.__name__,comb.dict(),loadCombinations)
     return doc.toprettyxml(encoding="utf-8") # do not use utf-8 as a parameter: encoding='utf-8'
 
 
@@ -259,6 +262,7 @@ def loadDomainFromXmlFile(f,newDomain=None):
     domainNodalLoads   = domain.find('nodalLoads') # version 2.2.6
     domainElementLoads = domain.find('elementLoads') # version 2.2.6
     loadCases = domain.find('loadCases')
+    loadCombinations = domain.find('loadCombinations')
     newDomain = newDomain if newDomain else Domain()
     newDomain.reset(verbose=False)
     newDomain.delPredefinedItems()
@@ -315,7 +319,9 @@ def loadDomainFromXmlFile(f,newDomain=None):
         for lc in loadCases:
             if lc.tag == 'LoadCase':
                 label = lc.get('label')
-                newDomain.addLoadCase(label=label, verbose=False)
+                history = lc.get('history')
+                history = eval(history) if history else None
+                newDomain.addLoadCase(label=label, history=history, verbose=False)
                 # TODO activeLoadCase
                 alc = newDomain.loadCases[label]
                 newDomain.activeLoadCase = alc
@@ -406,6 +412,13 @@ def loadDomainFromXmlFile(f,newDomain=None):
                     # version 2.2.6
                     value = {'fx':0., 'fz':0., 'dTc':value[0], 'dTg':value[1]}
                     newDomain.addElementLoad(label=label, where=elem, value=value, loadCase=loadCase, verbose=False)
+    if loadCombinations is not None:
+        for comb in loadCombinations:
+            if comb.tag == 'LoadCombination':
+                label = comb.get('label')
+                factors = eval(comb.get('factors','{}'))
+                groups = eval(comb.get('groups','[]'))
+                newDomain.addLoadCombination(label=label, factors=factors, groups=groups, verbose=False)
     #
     newDomain.postLoad(pDspls=pDspls)
     return newDomain
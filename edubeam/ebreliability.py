@@ -0,0 +1,622 @@
+# -*- coding: utf-8 -*
+
+#
+#          EduBeam is an education project to develop a free structural
+#                   analysis code for educational purposes.
+#
+#                             (c) 2011 Borek Patzak 
+#
+#       EduBeam is free software; you can redistribute it and/or modify it 
+#         under the terms of the GNU General Public License as published 
+#        by the Free Software Foundation; either version 2 of the License, 
+#                        or (at your option) any later version.
+#
+# EduBeam is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; 
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  
+# See the GNU General Public License for more details. You should have received a copy of 
+# the GNU General Public License along with File Hunter; if not, write to 
+# the Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+
+##################################################################
+#
+# ebreliability.py file
+# defines EduBeam reliability analysis (Monte Carlo simulation)
+#
+##################################################################
+
+"""
+EduBeam module providing Monte Carlo reliability analysis of domains solved by the computational part (:py:mod:`ebfem`)
+"""
+
+
+from ebinit import *
+from ebfem import *
+from ebanalysis import ParameterSweep, giveSweepComponent, giveSweepParameterValue
+
+
+reliabilityDistributions = ('normal','lognormal','uniform','gumbel')
+"""*(tuple)* probability distributions of random variables of :py:class:`MonteCarloAnalysis`"""
+
+def drawRandomSamples(variables, rng, nsample):
+    """Returns (nsample,nvar) array of realizations of independent random variables of :py:class:`MonteCarloAnalysis`
+
+    :param [tuple] variables: random variables (label,kind,where,attribute,distribution,mean,std)
+    :param numpy.random.Generator rng: random number generator
+    :param int nsample: number of realizations
+    :rtype: np.array(2d)
+    """
+    ret = empty((nsample,len(variables)))
+    for i,(label,kind,where,attribute,distribution,mean,std) in enumerate(variables):
+        if distribution == 'normal':
+            ret[:,i] = rng.normal(mean,std,nsample)
+        elif distribution == 'lognormal':
+            # variables with negative mean are mirrored
+            s2 = log(1.+(std/mean)**2)
+            ret[:,i] = sign(mean)*rng.lognormal(log(abs(mean))-0.5*s2,sqrt(s2),nsample)
+        elif distribution == 'uniform':
+            ret[:,i] = rng.uniform(mean-sqrt(3.)*std,mean+sqrt(3.)*std,nsample)
+        elif distribution == 'gumbel':
+            scale = std*sqrt(6.)/pi
+            ret[:,i] = rng.gumbel(mean-euler_gamma*scale,scale,nsample)
+    return ret
+
+def giveSampledStack(stack, variables, samples):
+    """Returns copy of element stack representing realizations of random material and cross section properties, see :py:meth:`ElementStack.giveSampledCopy`
+
+    :param ElementStack stack: elements
+    :param [tuple] variables: random variables (label,kind,where,attribute,distribution,mean,std)
+    :param np.array(2d) samples: (nsample,nvar) realizations of the variables
+    :rtype: ElementStack
+    """
+    values = {}
+    for i,(label,kind,where,attribute,distribution,mean,std) in enumerate(variables):
+        if kind not in ('material','crossSection'):
+            continue
+        mask = array([(elem.mat if kind == 'material' else elem.cs).label == where for elem in stack.elems], dtype=bool)
+        if mask.any():
+            value = values.setdefault(attribute,tile(getattr(stack,attribute),(len(samples),1)))
+            value[:,mask] = samples[:,i:i+1]
+    return stack.giveSampledCopy(values,len(samples))
+
+def giveRandomLoadTerms(domain, variables, samples, lcLabels):
+    """Returns (nsample,nlc) load factors of load cases and terms (load,lc,factors) of loads of given load cases proportional to random variables of :py:class:`MonteCarloAnalysis`
+
+    :param Domain domain: domain
+    :param [tuple] variables: random variables (label,kind,where,attribute,distribution,mean,std)
+    :param np.array(2d) samples: (nsample,nvar) realizations of the variables
+    :param [str] lcLabels: labels of load cases
+    :rtype: (np.array(2d),[tuple])
+    """
+    lcFactors = ones((len(samples),len(lcLabels)))
+    loadVariables = {}
+    for i,(label,kind,where,attribute,distribution,mean,std) in enumerate(variables):
+        if kind == 'loadCase':
+            lcFactors[:,lcLabels.index(where)] *= samples[:,i]
+        elif kind in ('nodalLoad','elementLoad'):
+            loadVariables.setdefault(id(giveSweepComponent(domain,kind,where)),[]).append((attribute,i))
+    terms = []
+    for j,lcLabel in enumerate(lcLabels):
+        lc = domain.loadCases[lcLabel]
+        for load in list(lc.nodalLoads.values())+list(lc.elementLoads.values()):
+            randomKeys = loadVariables.get(id(load))
+            if not randomKeys:
+                terms.append((load,j,lcFactors[:,j]))
+                continue
+            # the load is split to its copy with random values set to zero and unit copies of each random value
+            base = load.giveScaledCopy(1.)
+            for attribute,i in randomKeys:
+                base.value[attribute] = 0.
+                unit = load.giveScaledCopy(0.)
+                unit.value[attribute] = 1.
+                terms.append((unit,j,lcFactors[:,j]*samples[:,i]))
+            terms.append((base,j,lcFactors[:,j]))
+    return lcFactors,terms
+
+def solveMonteCarloBlock(solver, variables, responses, samples):
+    """Returns (nsample,nresp) values of responses of a block of realizations of random variables of :py:class:`MonteCarloAnalysis`, NaN for singular stiffness matrix
+
+    :param LinearStaticSolver solver: solver of the domain with solved nominal values (numbered equations, load cases and load combinations)
+    :param [tuple] variables: random variables (label,kind,where,attribute,distribution,mean,std)
+    :param [tuple] responses: responses (label,type,where,index,loadCase,lower,upper)
+    :param np.array(2d) samples: (nsample,nvar) realizations of the variables
+    :rtype: np.array(2d)
+    """
+    domain = solver.domain
+    nsample = len(samples)
+    neq,pneq = solver.neq,solver.pneq
+    ndofs = neq+pneq
+    cm = solver.combinationMatrix
+    nlc = cm.shape[0]
+    lcLabels = list(solver.r.labels[:nlc])
+    sample = arange(nsample)
+    # stiffness matrices and equivalent nodal loads of all realizations are evaluated by single calls of batched kernels, no copies of domain are made
+    stacks = [giveSampledStack(stack,variables,samples) for stack in giveElementStacks(domain.elements.values())]
+    # loads
+    lcFactors,terms = giveRandomLoadTerms(domain,variables,samples,lcLabels)
+    f = zeros((nsample,ndofs,nlc))
+    groups = {}
+    for load,j,factors in terms:
+        if isinstance(load,ElementLoad):
+            groups.setdefault(load.where.__class__,[]).append((load,j,factors))
+            continue
+        loc,value = load.computeLoad(domain.type)
+        f[:,loc,j] += factors[:,newaxis]*array(value,dtype=float)
+    fixedEndForces = {}
+    for cls,group in groups.items():
+        loads = [load for load,j,factors in group]
+        nload = len(loads)
+        stack = giveSampledStack(giveElementStacks([load.where for load in loads])[0],variables,samples)
+        lcs = array([j for load,j,factors in group], dtype=int)
+        fe = stack.computeFixedEndForces(loads*nsample)*array([factors for load,j,factors in group]).T.reshape(-1,1)
+        add.at(f, (sample[:,newaxis,newaxis],stack.loc[newaxis,:nload],lcs[newaxis,:,newaxis]), stack.condenseLoadVectors(fe).reshape(nsample,nload,-1))
+        fixedEndForces[cls] = (loads,lcs,fe.reshape(nsample,nload,6))
+    rp = solver.r.data[neq:,:nlc]*lcFactors[:,newaxis,:]
+    fu,fp = f[:,:neq],f[:,neq:]
+    # stiffness and solution
+    r = zeros((nsample,ndofs,nlc))
+    r[:,neq:] = rp
+    react = f.copy()
+    # small models are solved by one batched dense solution, large ones by one factorization of block diagonal matrix of all realizations
+    if not solver.useSparseSolver():
+        k = zeros(nsample*ndofs*ndofs)
+        for stack in stacks:
+            loc = stack.loc + repeat(sample*ndofs,len(stack.elems)//nsample)[:,newaxis]
+            k += bincount((loc[:,:,newaxis]*ndofs+stack.loc[:,newaxis,:]).ravel(), stack.computeStiffness().ravel(), minlength=len(k))
+        k = k.reshape(nsample,ndofs,ndofs)
+        kuu,kup,kpp = k[:,:neq,:neq],k[:,:neq,neq:],k[:,neq:,neq:]
+        rhs = fu - matmul(kup,rp)
+        try:
+            r[:,:neq] = linalg.solve(kuu,rhs)
+        except linalg.LinAlgError:
+            for s in range(nsample):
+                try:
+                    r[s,:neq] = linalg.solve(kuu[s],rhs[s])
+                except linalg.LinAlgError:
+                    r[s] = nan
+        react[:,neq:] = matmul(kup.transpose(0,2,1),r[:,:neq]) + matmul(kpp,rp) - fp
+    else:
+        # block diagonal system, free DOFs of all realizations first
+        dofs = arange(ndofs)
+        dofMap = where(dofs < neq, sample[:,newaxis]*neq+dofs, nsample*neq+sample[:,newaxis]*pneq+dofs-neq)
+        rows,cols,vals = [],[],[]
+        for stack in stacks:
+            loc = dofMap[repeat(sample,len(stack.elems)//nsample)[:,newaxis],stack.loc]
+            size = loc.shape[1]
+            rows.append(repeat(loc,size,axis=1).ravel())
+            cols.append(tile(loc,(1,size)).ravel())
+            vals.append(stack.computeStiffness().ravel())
+        n = nsample*neq
+        k = SP.coo_matrix((concatenate(vals),(concatenate(rows),concatenate(cols))), shape=(nsample*ndofs,nsample*ndofs)).tocsr()
+        k.eliminate_zeros()
+        kuu,kup,kpp = k[:n,:n],k[:n,n:],k[n:,n:]
+        rpb = rp.reshape(-1,nlc)
+        rhs = fu.reshape(-1,nlc) - kup.dot(rpb)
+        try:
+            factorization = solver.factorize(kuu)
+            if isinstance(factorization,PreconditionedCGSolution):
+                ru = factorization.solve(rhs,None,solver.tolerance,solver.maxIterations)
+            else:
+                ru = factorization.solve(rhs)
+            r[:,:neq] = ru.reshape(nsample,neq,nlc)
+            react[:,neq:] = (kup.transpose().dot(ru) + kpp.dot(rpb)).reshape(nsample,pneq,nlc) - fp
+        except (ValueError,RuntimeError,linalg.LinAlgError):
+            r[:] = nan
+    # load combinations, results have the same columns as solver.r
+    r = r.dot(cm)
+    react = react.dot(cm)
+    # end forces of elements needed by responses
+    endForces = {}
+    labels = set(where for label,type,where,index,loadCase,lower,upper in responses if type == 'endForce')
+    for stack in stacks:
+        nelem = len(stack.elems)//nsample
+        index = dict( (elem.label,i) for i,elem in enumerate(stack.elems[:nelem]) )
+        if not labels.intersection(index):
+            continue
+        fe = matmul(stack.computeLocalStiffness(), matmul(stack.computeT(), r[repeat(sample,nelem)[:,newaxis],stack.loc]))
+        loads,lcs,f0 = fixedEndForces.get(stack.elems[0].__class__,([],[],None))
+        if loads:
+            ie = array([index[load.where.label] for load in loads], dtype=int)
+            b = zeros((nsample,nelem,6,nlc))
+            add.at(b, (sample[:,newaxis,newaxis],ie[newaxis,:,newaxis],arange(6)[newaxis,newaxis,:],lcs[newaxis,:,newaxis]), f0)
+            fe += stack.condenseFixedEndForces(b.reshape(-1,6,nlc).dot(cm))
+        fe = fe.reshape(nsample,nelem,6,-1)
+        for label in labels.intersection(index):
+            endForces[label] = fe[:,index[label]]
+    # responses
+    ret = empty((nsample,len(responses)))
+    for i,(label,type,component,index,loadCase,lower,upper) in enumerate(responses):
+        col = solver.r.index[loadCase]
+        if type in ('reaction','displacement'):
+            loc = domain.giveNode(component).loc[domain.dofsNames.index(index)]
+            ret[:,i] = (react if type == 'reaction' else r)[:,loc,col]
+        elif type == 'endForce':
+            ret[:,i] = endForces[component][:,index,col]
+        elif type == 'maxDisplacement':
+            nodes = [domain.giveNode(node) for node in component] if component else domain.nodes.values()
+            loc = [node.loc[domain.dofsNames.index(index)] for node in nodes]
+            ret[:,i] = abs(r[:,loc,col]).max(axis=1)
+    return ret
+
+def giveResponseExceedances(responses, values):
+    """Returns (nsample,nresp) flags of values of responses of :py:class:`MonteCarloAnalysis` being out of their limits
+
+    :param [tuple] responses: responses (label,type,where,index,loadCase,lower,upper)
+    :param np.array(2d) values: (nsample,nresp) values of responses
+    :rtype: np.array(2d)
+    """
+    ret = zeros(values.shape, dtype=bool)
+    for i,(label,type,where,index,loadCase,lower,upper) in enumerate(responses):
+        if lower is not None:
+            ret[:,i] |= values[:,i] < lower
+        if upper is not None:
+            ret[:,i] |= values[:,i] > upper
+    return ret
+
+def runMonteCarloBlocks(solver, variables, responses, blocks, edges):
+    """Evaluates given blocks of realizations of :py:class:`MonteCarloAnalysis` one after another and returns their statistics
+
+    :param LinearStaticSolver solver: solver of the domain with solved nominal values
+    :param [tuple] variables: random variables (label,kind,where,attribute,distribution,mean,std)
+    :param [tuple] responses: responses (label,type,where,index,loadCase,lower,upper)
+    :param [(numpy.random.SeedSequence,int)] blocks: seeds and numbers of realizations of blocks
+    :param np.array(2d) edges: edges of histogram bins, see :py:class:`StreamingStatistics`
+    :rtype: StreamingStatistics
+    """
+    ret = StreamingStatistics(edges)
+    # realizations of each block are drawn from its own seed, results do not depend on distribution of blocks over processes
+    for seed,nsample in blocks:
+        values = solveMonteCarloBlock(solver,variables,responses,drawRandomSamples(variables,random.default_rng(seed),nsample))
+        ret.update(values,giveResponseExceedances(responses,values))
+    return ret
+
+def runMonteCarloBlocksFromXml(xmlString, variables, responses, blocks, edges, settings=None):
+    """Worker of :py:class:`MonteCarloAnalysis` evaluating given blocks of domain passed as xml string (see :py:func:`ebio.xmlStringFromDomain`), see :py:func:`runMonteCarloBlocks`
+
+    :param bytes xmlString: xml representation of domain
+    :param dict settings: attributes of :py:class:`LinearStaticSolver` to be set
+    :rtype: StreamingStatistics
+    """
+    import io
+    from ebio import loadDomainFromXmlFile
+    # messages below errors are suppressed in workers, the domain is loaded once for all blocks
+    logger.setLevel('ERROR')
+    domain = loadDomainFromXmlFile(io.BytesIO(xmlString))
+    solver = LinearStaticSolver()
+    for key,value in (settings or {}).items():
+        setattr(solver,key,value)
+    Session(domain=domain,solver=solver)
+    if solver.solve(domain):
+        ret = StreamingStatistics(edges)
+        ret.invalid = int(sum([nsample for seed,nsample in blocks]))
+        return ret
+    return runMonteCarloBlocks(solver,variables,responses,blocks,edges)
+
+
+class StreamingStatistics:
+    """Statistics of several quantities (moments, extremes, histograms and exceedances of limits) accumulated from blocks of samples without storing them
+
+    :param np.array(2d) edges: (nvalue,nbins+1) increasing edges of histogram bins of each quantity, values outside them are counted in underflow and overflow bins
+    """
+
+    count = 0
+    """*(int)* number of valid samples"""
+    invalid = 0
+    """*(int)* number of samples with non-finite values (e.g. singular stiffness matrix), they are not included in statistics"""
+    mean = None
+    """*(np.array)* means"""
+    m2 = None
+    """*(np.array)* sums of squared deviations from means"""
+    min = None
+    """*(np.array)* minimum values"""
+    max = None
+    """*(np.array)* maximum values"""
+    edges = None
+    """*(np.array(2d))* (nvalue,nbins+1) edges of histogram bins"""
+    histogram = None
+    """*(np.array(2d))* (nvalue,nbins+2) counts of values in bins, the first and the last bins are underflow and overflow"""
+    exceedances = None
+    """*(np.array)* numbers of samples exceeding limits of each quantity"""
+    failures = 0
+    """*(int)* number of samples exceeding limit of at least one quantity (failures of series system)"""
+
+    def __init__(self, edges):
+        self.edges = array(edges, dtype=float)
+        nvalue = self.edges.shape[0]
+        self.mean = zeros(nvalue)
+        self.m2 = zeros(nvalue)
+        self.min = empty(nvalue)
+        self.min.fill(inf)
+        self.max = empty(nvalue)
+        self.max.fill(-inf)
+        self.histogram = zeros((nvalue,self.edges.shape[1]+1), dtype=int)
+        self.exceedances = zeros(nvalue, dtype=int)
+
+    def update(self, values, exceeded=None):
+        """Adds a block of samples
+
+        :param np.array(2d) values: (nsample,nvalue) values
+        :param np.array(2d) exceeded: (nsample,nvalue) flags of values exceeding their limits
+        """
+        valid = isfinite(values).all(axis=1)
+        self.invalid += int(len(values)-valid.sum())
+        values = values[valid]
+        if not len(values):
+            return
+        mean = values.mean(axis=0)
+        self.mergeMoments(len(values), mean, ((values-mean)**2).sum(axis=0))
+        self.min = minimum(self.min, values.min(axis=0))
+        self.max = maximum(self.max, values.max(axis=0))
+        nbin = self.histogram.shape[1]
+        for i in range(len(self.edges)):
+            self.histogram[i] += bincount(searchsorted(self.edges[i], values[:,i], side='right'), minlength=nbin)
+        if exceeded is not None:
+            exceeded = exceeded[valid]
+            self.exceedances += exceeded.sum(axis=0)
+            self.failures += int(exceeded.any(axis=1).sum())
+
+    def mergeMoments(self, count, mean, m2):
+        """Merges number of samples, means and sums of squared deviations of another set of samples to receiver
+
+        :param int count: number of samples
+        :param np.array mean: means
+        :param np.array m2: sums of squared deviations from means
+        """
+        # parallel algorithm of Chan et al., which is numerically stable
+        total = self.count+count
+        delta = mean-self.mean
+        self.mean = self.mean + delta*count/total
+        self.m2 = self.m2 + m2 + delta*delta*self.count*count/total
+        self.count = total
+
+    def merge(self, other):
+        """Merges statistics of another set of samples with the same histogram bins to receiver
+
+        :param StreamingStatistics other: statistics
+        """
+        if other.count:
+            self.mergeMoments(other.count, other.mean, other.m2)
+        self.min = minimum(self.min, other.min)
+        self.max = maximum(self.max, other.max)
+        self.histogram += other.histogram
+        self.exceedances += other.exceedances
+        self.failures += other.failures
+        self.invalid += other.invalid
+
+    def giveVariance(self):
+        """Returns sample variances
+
+        :rtype: np.array
+        """
+        return self.m2/(self.count-1) if self.count > 1 else zeros(len(self.mean))
+
+    def giveStd(self):
+        """Returns sample standard deviations
+
+        :rtype: np.array
+        """
+        return sqrt(self.giveVariance())
+
+    def giveQuantiles(self, q):
+        """Returns quantiles estimated from histograms by linear interpolation within bins
+
+        :param [float] q: probabilities
+        :rtype: np.array(2d)
+        """
+        q = atleast_1d(array(q, dtype=float))
+        ret = empty((len(q),len(self.edges)))
+        ret.fill(nan)
+        if not self.count:
+            return ret
+        for i,edges in enumerate(self.edges):
+            lower = concatenate(([self.min[i]],edges))
+            upper = concatenate((edges,[self.max[i]]))
+            cum = cumsum(self.histogram[i])
+            target = q*self.count
+            ib = minimum(searchsorted(cum, target, side='left'), len(cum)-1)
+            inbin = self.histogram[i][ib]
+            before = cum[ib]-inbin
+            frac = where(inbin > 0, (target-before)/maximum(inbin,1), 0.)
+            # underflow and overflow bins are bounded by extremes, the lowest and the highest quantiles are exact
+            lo = maximum(lower[ib], self.min[i])
+            hi = minimum(upper[ib], self.max[i])
+            ret[:,i] = lo + clip(frac,0.,1.)*(hi-lo)
+        return ret
+
+    def giveExceedanceProbabilities(self):
+        """Returns estimated probabilities of exceeding limits of each quantity
+
+        :rtype: np.array
+        """
+        return self.exceedances/float(max(self.count,1))
+
+    def giveFailureProbability(self):
+        """Returns estimated probability of exceeding limit of at least one quantity
+
+        :rtype: float
+        """
+        return self.failures/float(max(self.count,1))
+
+
+class MonteCarloAnalysis:
+    """Monte Carlo reliability analysis of domain with random material and cross section properties, load values and load case factors
+
+    :param Domain domain: analyzed domain, it is not changed
+    :param str label: string label of receiver
+    """
+
+    label = None
+    """*(str)* string label"""
+    domain = None
+    """*(Domain)* analyzed domain"""
+    variables = None
+    """*([tuple])* independent random variables (label,kind,where,attribute,distribution,mean,std), see :py:meth:`addVariable`"""
+    responses = None
+    """*([tuple])* responses (label,type,where,index,loadCase,lower,upper), see :py:meth:`addResponse`"""
+    statistics = None
+    """*(StreamingStatistics)* statistics of responses of the last analysis"""
+    blockSize = 256
+    """*(int)* number of realizations solved at once"""
+    nbins = 1000
+    """*(int)* number of histogram bins of each response for quantiles, the bins cover the range of values of the first block extended by half of it on both sides"""
+    variableAttributes = {'material':('e','g','alpha'), 'crossSection':('a','iy','h','k','j'), 'nodalLoad':('fx','fz','mx','my'), 'elementLoad':('magnitude','Fx','Fz','dTc','dTg'), 'loadCase':('factor',)}
+    """*(dict)* attributes of domain components which may be random"""
+    solverSettings = ParameterSweep.solverSettings
+    """*(tuple)* attributes of session solver copied to solvers of the analysis"""
+
+    def __init__(self, domain=None, label='montecarloanalysis'):
+        self.label = label
+        self.domain = domain
+        self.variables = []
+        self.responses = []
+
+    def addVariable(self, kind, where, attribute, distribution='normal', mean=None, std=None, cov=None, label=None):
+        """Adds independent random variable. Returns False if successful, True otherwise
+
+        :param str kind: kind of domain component, 'material' (attribute 'e', 'g' or 'alpha'), 'crossSection' (attribute 'a', 'iy', 'h', 'k' or 'j'), 'nodalLoad' (key of value 'fx', 'fz', 'mx' or 'my'), 'elementLoad' (key of value 'magnitude', 'Fx', 'Fz', 'dTc' or 'dTg') or 'loadCase' (attribute 'factor' multiplying all loads and prescribed displacements of load case)
+        :param str where: label of the component
+        :param str attribute: random attribute
+        :param str distribution: 'normal', 'lognormal', 'uniform' or 'gumbel'
+        :param float mean: mean value, current value of the attribute (1 for load case factor) if None
+        :param float std: standard deviation
+        :param float cov: coefficient of variation, used if std is None
+        :param str label: label of the variable, kind/where/attribute if None
+        :rtype: bool
+        """
+        if not self.domain or giveSweepComponent(self.domain,kind,where) is None or attribute not in self.variableAttributes.get(kind,()):
+            logger.error( langStr('Random variable %s of %s %s can not be added', 'Náhodnou veličinu %s %s %s nelze přidat') % (attribute,kind,where) )
+            return 1
+        if distribution not in reliabilityDistributions:
+            logger.error( langStr('Unknown distribution %s', 'Neznámé rozdělení %s') % distribution )
+            return 1
+        if mean is None:
+            mean = 1. if kind == 'loadCase' else float(giveSweepParameterValue(self.domain,(label,kind,where,attribute,[])))
+        if std is None:
+            std = abs(mean)*cov if cov is not None else None
+        if std is None or std < 0. or (distribution == 'lognormal' and mean == 0.):
+            logger.error( langStr('Wrong parameters of random variable %s of %s %s', 'Chybné parametry náhodné veličiny %s %s %s') % (attribute,kind,where) )
+            return 1
+        label = label if label else '%s/%s/%s'%(kind,where,attribute)
+        self.variables.append((label,kind,where,attribute,distribution,float(mean),float(std)))
+        return 0
+
+    def addResponse(self, type, where=None, index=None, loadCase=None, lower=None, upper=None, label=None):
+        """Adds response of the analysis. Returns False if successful, True otherwise
+
+        :param str type: 'reaction' or 'displacement' (where is node, index is dof name), 'endForce' (where is element, index is local dof 0..5) or 'maxDisplacement' (maximum absolute displacement in dof index over nodes where, all nodes if None)
+        :param str|[str] where: label of node or element, labels of nodes for 'maxDisplacement'
+        :param str|int index: dof name or local dof
+        :param str loadCase: label of load case or variant of load combination, active load case if None
+        :param float lower: lower limit of response, realizations below it are failures
+        :param float upper: upper limit of response, realizations above it are failures
+        :param str label: label of the response
+        :rtype: bool
+        """
+        loadCase = loadCase if loadCase else self.domain.activeLoadCase.label if self.domain and self.domain.activeLoadCase else None
+        if type not in ('reaction','displacement','endForce','maxDisplacement'):
+            logger.error( langStr('Unknown output %s', 'Neznámý výstup %s') % type )
+            return 1
+        if type == 'maxDisplacement' and index is None:
+            index = 'z'
+        if not label:
+            label = '/'.join(str(v) for v in (type,where if isinstance(where,str) or where is None else ' '.join(where),index,loadCase) if v is not None)
+        self.responses.append((label,type,where,index,loadCase,lower,upper))
+        return 0
+
+    def giveSolverSettings(self):
+        """Returns settings of session solver to be used by solvers of the analysis
+
+        :rtype: dict
+        """
+        solver = self.domain.session.solver if self.domain.session and isinstance(self.domain.session.solver,LinearStaticSolver) else LinearStaticSolver
+        return dict( (key,getattr(solver,key)) for key in self.solverSettings )
+
+    def giveHistogramEdges(self, values):
+        """Returns edges of histogram bins covering given values extended by half of their range on both sides
+
+        :param np.array(2d) values: (nsample,nresp) values of responses
+        :rtype: np.array(2d)
+        """
+        valid = values[isfinite(values).all(axis=1)]
+        lo = valid.min(axis=0) if len(valid) else zeros(values.shape[1])
+        hi = valid.max(axis=0) if len(valid) else zeros(values.shape[1])
+        span = hi-lo
+        span = where(span > 0., span, where(hi != 0., 1.e-3*abs(hi), 1.))
+        return lo[:,newaxis] + span[:,newaxis]*linspace(-0.5,1.5,self.nbins+1)[newaxis,:]
+
+    def run(self, nsample, workers=None, seed=None):
+        """Runs the analysis in this process or in given number of processes, fills and returns :py:attr:`statistics`, None if the analysis can not be run
+
+        :param int nsample: number of realizations
+        :param int workers: number of processes, number of processors if None
+        :param int seed: seed of random numbers, random if None
+        :rtype: StreamingStatistics | None
+        """
+        if not self.domain or not self.variables or not self.responses or nsample < 1:
+            logger.error( langStr('Monte Carlo analysis needs domain, random variables and responses', 'Analýza Monte Carlo potřebuje síť, náhodné veličiny a výstupy') )
+            return None
+        settings = self.giveSolverSettings()
+        blocks = [min(self.blockSize,nsample-i) for i in range(0,nsample,self.blockSize)]
+        # seeds of blocks are spawned from the given one, so results are reproducible regardless of number of processes
+        blocks = list(zip(random.SeedSequence(seed).spawn(len(blocks)),blocks))
+        level = logger.level
+        logger.setLevel('ERROR')
+        try:
+            solver = LinearStaticSolver()
+            for key,value in settings.items():
+                setattr(solver,key,value)
+            if solver.solve(self.domain):
+                logger.error( langStr('Monte Carlo analysis: solution of domain failed', 'Analýza Monte Carlo: řešení sítě selhalo') )
+                return None
+            unknown = [response[4] for response in self.responses if response[4] not in solver.r.index]
+            if unknown:
+                logger.error( langStr('Load case %s not found', 'Zatěžovací stav %s nenalezen') % unknown[0] )
+                return None
+            # the first block is solved in this process and defines histogram bins
+            seed,n = blocks[0]
+            values = solveMonteCarloBlock(solver,self.variables,self.responses,drawRandomSamples(self.variables,random.default_rng(seed),n))
+            edges = self.giveHistogramEdges(values)
+            self.statistics = StreamingStatistics(edges)
+            self.statistics.update(values,giveResponseExceedances(self.responses,values))
+            blocks = blocks[1:]
+            if workers == 1 or not blocks:
+                self.statistics.merge(runMonteCarloBlocks(solver,self.variables,self.responses,blocks,edges))
+            else:
+                # each process loads its own copy of domain once
+                import concurrent.futures
+                from ebio import xmlStringFromDomain
+                xmlString = xmlStringFromDomain(self.domain)
+                with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+                    # contiguous chunks of blocks, several for each process to balance the load
+                    nchunk = min(len(blocks),4*(workers or os.cpu_count() or 1))
+                    bounds = linspace(0,len(blocks),nchunk+1).astype(int)
+                    futures = [executor.submit(runMonteCarloBlocksFromXml,xmlString,self.variables,self.responses,blocks[i:j],edges,settings) for i,j in zip(bounds[:-1],bounds[1:])]
+                    for future in concurrent.futures.as_completed(futures):
+                        self.statistics.merge(future.result())
+        finally:
+            logger.setLevel(level)
+        if self.statistics.invalid:
+            logger.warning( langStr('Monte Carlo analysis: %d of %d realizations failed', 'Analýza Monte Carlo: %d z %d realizací selhalo') % (self.statistics.invalid,nsample) )
+        logger.info( langStr('Monte Carlo analysis finished, %d realizations, probability of failure %g', 'Analýza Monte Carlo dokončena, %d realizací, pravděpodobnost poruchy %g') % (self.statistics.count,self.statistics.giveFailureProbability()) )
+        return self.statistics
+
+    def exportCsv(self, fileName, q=(0.001,0.01,0.05,0.5,0.95,0.99,0.999)):
+        """Writes statistics of responses of the last analysis to csv file, one row for each response. Returns 0 if successful, 1 otherwise
+
+        :param str fileName: name of file
+        :param [float] q: probabilities of reported quantiles
+        :rtype: bool
+        """
+        stats = self.statistics
+        if stats is None:
+            return 1
+        quantiles = stats.giveQuantiles(q)
+        try:
+            f = open(fileName,'w')
+            f.write(','.join(['response','mean','std','min','max']+['q%g'%v for v in q]+['exceedance'])+'\n')
+            for i,response in enumerate(self.responses):
+                f.write(','.join([response[0]]+['%.10g'%v for v in [stats.mean[i],stats.giveStd()[i],stats.min[i],stats.max[i]]+list(quantiles[:,i])+[stats.giveExceedanceProbabilities()[i]]])+'\n')
+            f.close()
+            return 0
+        except IOError:
+            return 1
@@ -0,0 +1,98 @@
+"""
+Test of free vibration (ebfem.ModalSolver) of simply supported beam against analytic frequencies and of its response to step load (ebfem.TimeHistorySolver)
+"""
+
+import gc
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebfem
+from ebinit import logger
+logger.setLevel('ERROR')
+
+length = 10.
+e,d,a,iy = 210.e9, 7850., 0.01, 1.e-4
+
+
+def buildBeam(solver, nelem):
+    # simply supported beam, axial DOFs are restrained and shear deformation is suppressed (Euler-Bernoulli beam)
+    domain = ebfem.Domain()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='steel', e=e, g=1.e6*e, alpha=12.e-6, d=d)
+    domain.addCrossSect(label='c', a=a, iy=iy, h=0.3, k=0.83)
+    domain.addLoadCase(label='lc1')
+    for i in range(nelem+1):
+        domain.addNode(label='n%d'%i, coords=(length*i/nelem,0.,0.), bcs={'x':True, 'z':i in (0,nelem), 'Y':False})
+    for i in range(nelem):
+        domain.addElement(label='e%d'%i, nodes=['n%d'%i,'n%d'%(i+1)], mat='steel', cs='c')
+    return domain
+
+
+def checkFrequencies(nelem):
+    solver = ebfem.ModalSolver()
+    solver.nmodes = 5
+    domain = buildBeam(solver, nelem)
+    assert solver.solve(domain) == 0
+    f1 = numpy.pi/(2.*length**2)*numpy.sqrt(e*iy/(d*a))
+    exact = f1*numpy.arange(1,6)**2
+    frequencies = solver.giveFrequencies()
+    assert len(frequencies) == 5
+    # consistent mass matrix gives upper bounds
+    assert (frequencies >= exact*(1.-1.e-9)).all()
+    assert (frequencies <= exact*1.002).all()
+    # modes are normalized with respect to mass matrix
+    muu = solver.muu.toarray() if hasattr(solver.muu,'toarray') else solver.muu
+    assert abs(solver.eigvec.T.dot(muu).dot(solver.eigvec)-numpy.identity(5)).max() <= 1.e-8
+
+
+def test_dense_frequencies():
+    checkFrequencies(20)
+
+
+def test_sparse_frequencies():
+    checkFrequencies(60)
+
+
+def solveStepLoad():
+    # force suddenly applied in the middle of the span and held constant, no damping
+    solver = ebfem.TimeHistorySolver()
+    solver.dt = 0.002
+    solver.nsteps = 150
+    domain = buildBeam(solver, 10)
+    domain.changeLoadCase('lc1', history=[(0.,1.)])
+    domain.addNodalLoad(label='F', where='n5', value={'fx':0., 'fy':0., 'fz':10.e3, 'mx':0., 'my':0., 'mz':0.}, loadCase='lc1')
+    assert solver.solve(domain) == 0
+    return domain, solver
+
+
+def test_step_load():
+    domain,solver = solveStepLoad()
+    loc = domain.nodes['n5'].loc[domain.dofsNames.index('z')]
+    static = solver.linsolver.r['lc1'][loc]
+    assert abs(static-10.e3*length**3/(48.*e*iy)) <= 1.e-6*static
+    # dynamic amplification factor of undamped response to step load is 2
+    history = solver.giveDofHistory(loc)
+    assert history[0] == 0.
+    assert abs(history.max()/static-2.) <= 0.01
+    fileName = solver.displacements.filename
+    assert os.path.exists(fileName)
+    solver.closeOutput()
+    assert not os.path.exists(fileName)
+
+
+def test_temporary_file_of_discarded_solver():
+    domain,solver = solveStepLoad()
+    fileName = solver.displacements.filename
+    assert os.path.exists(fileName)
+    del domain,solver
+    gc.collect()
+    assert not os.path.exists(fileName)
+
+
+if __name__ == '__main__':
+    test_dense_frequencies()
+    test_sparse_frequencies()
+    test_step_load()
+    test_temporary_file_of_discarded_solver()
+    print('dynamics test passed')
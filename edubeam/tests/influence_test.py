@@ -0,0 +1,85 @@
+"""
+Test of influence lines by reciprocal theorem (ebfem.LinearStaticSolver.computeInfluenceLine) against closed form and direct solutions
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebfem
+from ebinit import logger
+logger.setLevel('CRITICAL')
+
+
+def buildBeam(spans, hinges=[False,False]):
+    # continuous beam, the first node is clamped and the first element is hinged to it, the other supports are rollers
+    solver = ebfem.LinearStaticSolver()
+    domain = ebfem.Domain()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='m', e=30.e9, g=12.e9, alpha=12.e-6, d=2500.)
+    domain.addCrossSect(label='c', a=0.06, iy=4.5e-4, h=0.3, k=0.83)
+    domain.addLoadCase(label='lc1')
+    x = numpy.concatenate(([0.],numpy.cumsum(spans)))
+    for i,xi in enumerate(x):
+        domain.addNode(label='n%d'%i, coords=(xi,0.,0.), bcs={'x':i==0, 'z':True, 'Y':i==0})
+    for i in range(len(spans)):
+        domain.addElement(label='e%d'%i, nodes=['n%d'%i,'n%d'%(i+1)], mat='m', cs='c', hinges=[i==0,False])
+    return domain, solver
+
+
+def addForce(domain, label, where, a):
+    domain.addLoadCase(label=label)
+    domain.addElementLoad(label='F'+label, where=where, value={'type':'Force','dir':'Z','magnitude':0.,'perX':False,'Fx':0.,'Fz':1.,'DistF':a,'dTc':0.,'dTg':0.}, loadCase=label)
+
+
+def test_moment_closed_form():
+    # simply supported span of 4 m, bending moment at x=1 m
+    l,xm = 4.,1.
+    domain,solver = buildBeam([l])
+    assert solver.solve(domain) == 0
+    line = solver.computeInfluenceLine('M', 'e0', xm, nseg=8)
+    a = line.x[0]
+    # unit force in direction Z gives negative bending moments of the span
+    exact = -numpy.where(a <= xm, a*(l-xm)/l, xm*(l-a)/l)
+    assert abs(line.values[0]-exact).max() <= 1.e-10
+    assert abs(line.values[0][numpy.argmin(abs(a-1.5))]+0.625) <= 1.e-10
+    # the same ordinate by direct solution
+    addForce(domain, 'p', 'e0', 1.5)
+    assert solver.solve(domain) == 0
+    elems,x,(n,v,m) = solver.computeInternalForces(['p'], nseg=4)
+    assert abs(m[0,numpy.argmin(abs(x[0]-xm)),0]+0.625) <= 1.e-10
+
+
+def test_reaction_direct_solutions():
+    # reaction of the middle support of statically indeterminate beam compared with direct solutions of unit forces
+    domain,solver = buildBeam([4.,6.])
+    assert solver.solve(domain) == 0
+    line = solver.computeInfluenceLine('reaction', 'n1', 'z', nseg=20)
+    stations = [(0,3), (0,14), (1,1), (1,10), (1,17)]
+    for i,(ie,st) in enumerate(stations):
+        addForce(domain, 'p%d'%i, line.elems[ie].label, line.x[ie,st])
+    assert solver.solve(domain) == 0
+    loc = domain.nodes['n1'].loc[domain.dofsNames.index('z')]
+    for i,(ie,st) in enumerate(stations):
+        assert abs(line.values[ie,st]-solver.f['p%d'%i][loc]) <= 1.e-10
+
+
+def test_grid_not_supported():
+    domain = ebfem.Domain(type='grid2d')
+    solver = ebfem.LinearStaticSolver()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='m', e=20.e9, g=8.e9, alpha=12.e-6, d=2400.)
+    domain.addCrossSect(label='c', a=0.35, iy=1.7e-4, h=0.7, j=1.7e-4)
+    domain.addLoadCase(label='lc1')
+    domain.addNode(label='n1', coords=(0.,0.,0.), bcs={'z':True, 'X':True, 'Y':True})
+    domain.addNode(label='n2', coords=(3.,0.,0.), bcs={'z':True, 'X':True, 'Y':False})
+    domain.elements['e1'] = ebfem.BeamGrid2d(label='e1', nodes=[domain.nodes['n1'],domain.nodes['n2']], mat=domain.materials['m'], cs=domain.crossSects['c'], domain=domain)
+    assert solver.solve(domain) == 0
+    assert solver.computeInfluenceLine('reaction', 'n1', 'z') is None
+
+
+if __name__ == '__main__':
+    test_moment_closed_form()
+    test_reaction_direct_solutions()
+    test_grid_not_supported()
+    print('influence line test passed')
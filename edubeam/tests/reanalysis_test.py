@@ -0,0 +1,67 @@
+"""
+Test of low-rank (Woodbury) update of factorization after change of sections of a few elements (ebfem.LinearStaticSolver.updateStiffnessMatrix)
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebfem
+from ebinit import logger
+logger.setLevel('ERROR')
+
+
+def buildBeam(solver, nelem):
+    # continuous beam on four supports loaded by uniform load and nodal forces
+    domain = ebfem.Domain()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='m', e=30.e9, g=12.e9, alpha=12.e-6, d=2500.)
+    domain.addCrossSect(label='c', a=0.06, iy=4.5e-4, h=0.3, k=0.83)
+    domain.addCrossSect(label='c2', a=0.12, iy=3.6e-3, h=0.6, k=0.83)
+    domain.addLoadCase(label='lc1')
+    for i in range(nelem+1):
+        domain.addNode(label='n%d'%i, coords=(0.5*i,0.,0.), bcs={'x':i==0, 'z':i%(nelem//3)==0, 'Y':False})
+    for i in range(nelem):
+        domain.addElement(label='e%d'%i, nodes=['n%d'%i,'n%d'%(i+1)], mat='m', cs='c')
+        domain.addElementLoad(label='q%d'%i, where='e%d'%i, value={'type':'Uniform','dir':'Z','magnitude':10.e3,'perX':False,'Fx':0.,'Fz':0.,'DistF':0.,'dTc':0.,'dTg':0.}, loadCase='lc1')
+    domain.addNodalLoad(label='F1', where='n%d'%(nelem//2), value={'fx':5.e3, 'fy':0., 'fz':20.e3, 'mx':0., 'my':3.e3, 'mz':0.}, loadCase='lc1')
+    return domain
+
+
+def checkUpdates(nelem, factorizationType='auto'):
+    solver = ebfem.LinearStaticSolver()
+    solver.factorizationType = factorizationType
+    domain = buildBeam(solver, nelem)
+    assert solver.solve(domain) == 0
+    # two consecutive changes, the second one is accumulated to the first one
+    for labels in (('e1','e2'), ('e%d'%(nelem//2),)):
+        for label in labels:
+            domain.elements[label].change(cs=domain.crossSects['c2'])
+        assert solver.solve(domain) == 0
+        assert isinstance(solver.factorization, ebfem.LowRankUpdatedFactorization)
+        fresh = ebfem.LinearStaticSolver()
+        fresh.factorizationType = factorizationType
+        ebfem.Session(domain, fresh)
+        assert fresh.solve(domain) == 0
+        ebfem.Session(domain, solver)
+        for store,reference in ((solver.r,fresh.r), (solver.f,fresh.f)):
+            assert abs(store['lc1']-reference['lc1']).max() <= 1.e-12*abs(reference['lc1']).max()
+
+
+def test_dense_update():
+    checkUpdates(12)
+
+
+def test_sparse_lu_update():
+    checkUpdates(60, 'sparse')
+
+
+def test_banded_update():
+    checkUpdates(60, 'banded')
+
+
+if __name__ == '__main__':
+    test_dense_update()
+    test_sparse_lu_update()
+    test_banded_update()
+    print('reanalysis test passed')
@@ -0,0 +1,44 @@
+"""
+Test of merging of statistics accumulated from blocks of samples (ebreliability.StreamingStatistics)
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebreliability
+
+
+def test_merge_of_split_blocks():
+    rng = numpy.random.default_rng(7)
+    values = numpy.column_stack(( rng.normal(1.e3, 2., 1000), rng.lognormal(0., 0.5, 1000), rng.uniform(-1., 1., 1000) ))
+    values[[17,512]] = numpy.nan # invalid samples
+    exceeded = values > numpy.array([1.002e3, 2., 0.9])
+    edges = numpy.array([numpy.linspace(995., 1005., 21), numpy.linspace(0., 4., 21), numpy.linspace(-1., 1., 21)])
+
+    # single pass
+    single = ebreliability.StreamingStatistics(edges)
+    single.update(values, exceeded)
+
+    # uneven blocks accumulated independently (e.g. in several processes) and merged
+    merged = ebreliability.StreamingStatistics(edges)
+    for start,end in ((0,1),(1,250),(250,250),(250,731),(731,1000)):
+        block = ebreliability.StreamingStatistics(edges)
+        block.update(values[start:end], exceeded[start:end])
+        merged.merge(block)
+
+    assert merged.count == single.count == 998
+    assert merged.invalid == single.invalid == 2
+    assert numpy.allclose(merged.mean, single.mean, rtol=1.e-14, atol=0.)
+    assert numpy.allclose(merged.m2, single.m2, rtol=1.e-12, atol=0.)
+    assert numpy.allclose(merged.giveStd(), numpy.nanstd(values, axis=0, ddof=1), rtol=1.e-12, atol=0.)
+    assert (merged.min == single.min).all() and (merged.max == single.max).all()
+    assert (merged.histogram == single.histogram).all()
+    assert (merged.exceedances == single.exceedances).all()
+    assert merged.failures == single.failures
+    assert numpy.allclose(merged.giveQuantiles([0.05,0.5,0.95]), single.giveQuantiles([0.05,0.5,0.95]), rtol=1.e-14, atol=0.)
+
+
+if __name__ == '__main__':
+    test_merge_of_split_blocks()
+    print('reliability test passed')
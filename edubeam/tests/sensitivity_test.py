@@ -0,0 +1,126 @@
+"""
+Test of sensitivities by adjoint method (ebfem.LinearStaticSolver.computeSensitivities) against central finite differences
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebfem
+from ebinit import logger
+logger.setLevel('ERROR')
+
+
+def individualize(domain):
+    # every element gets its own material and cross section, so that finite differences perturb one element only
+    for i,elem in enumerate(list(domain.elements.values())):
+        mat = domain.addMaterial(label='m%d'%i, e=elem.mat.e*(1.+0.1*i), g=elem.mat.g*(1.+0.02*i), alpha=elem.mat.alpha, d=elem.mat.d, verbose=False)
+        cs = domain.addCrossSect(label='cs%d'%i, a=elem.cs.a*(1.+0.05*i), iy=elem.cs.iy*(1.+0.07*i), h=elem.cs.h, k=elem.cs.k, j=elem.cs.j*(1.+0.03*i), verbose=False)
+        elem.change(mat=mat, cs=cs)
+
+
+def buildFrame():
+    # two bay frame with fixed and pinned supports (statically indeterminate) and hinges in beams
+    solver = ebfem.LinearStaticSolver()
+    domain = ebfem.Domain()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='m', e=30.e9, g=12.e9, alpha=12.e-6, d=2500.)
+    domain.addCrossSect(label='c', a=0.06, iy=4.5e-4, h=0.3, k=0.83)
+    domain.addCrossSect(label='c2', a=0.09, iy=8.5e-4, h=0.4, k=0.83)
+    domain.addLoadCase(label='lc1')
+    domain.addLoadCase(label='lc2')
+    for i in range(3):
+        domain.addNode(label='b%d'%i, coords=(4.*i,0.,0.), bcs={'x':True, 'z':True, 'Y':i==0})
+        domain.addNode(label='t%d'%i, coords=(4.*i,0.,-3.5), bcs={'x':False, 'z':False, 'Y':False})
+        domain.addElement(label='c%d'%i, nodes=['b%d'%i,'t%d'%i], mat='m', cs='c')
+    domain.addElement(label='e1', nodes=['t0','t1'], mat='m', cs='c2', hinges=[False,True])
+    domain.addElement(label='e2', nodes=['t1','t2'], mat='m', cs='c2', hinges=[False,False])
+    domain.addNodalLoad(label='n1', where='t0', value={'fx':10.e3, 'fy':0., 'fz':0., 'mx':0., 'my':2.e3, 'mz':0.}, loadCase='lc1')
+    domain.addElementLoad(label='u1', where='e1', value={'type':'Uniform', 'dir':'Z', 'magnitude':12.e3, 'perX':False, 'Fx':0., 'Fz':0., 'DistF':0., 'dTc':0., 'dTg':0.}, loadCase='lc1')
+    domain.addElementLoad(label='u2', where='c0', value={'type':'Uniform', 'dir':'Local Z', 'magnitude':3.e3, 'perX':False, 'Fx':0., 'Fz':0., 'DistF':0., 'dTc':0., 'dTg':0.}, loadCase='lc1')
+    domain.addElementLoad(label='f1', where='e2', value={'type':'Force', 'dir':'Z', 'magnitude':0., 'perX':False, 'Fx':2.e3, 'Fz':20.e3, 'DistF':1.5, 'dTc':0., 'dTg':0.}, loadCase='lc2')
+    domain.addElementLoad(label='t1', where='e1', value={'type':'Temperature', 'dir':'Z', 'magnitude':0., 'perX':False, 'Fx':0., 'Fz':0., 'DistF':0., 'dTc':10., 'dTg':5.}, loadCase='lc2')
+    domain.addPrescribedDspl(label='p1', where='b1', value={'x':0.001, 'z':0.002, 'Y':0.}, loadCase='lc2')
+    individualize(domain)
+    return domain, solver
+
+
+def buildGrid():
+    # grid of three beams with hinge, ends are fixed or restrained in deflection and torsion
+    solver = ebfem.LinearStaticSolver()
+    domain = ebfem.Domain(type='grid2d')
+    ebfem.Session(domain, solver)
+    material = ebfem.Material(label='m', e=20.e9, alpha=12.e-6, d=2400., g=8.333e9)
+    domain.addMaterial(material)
+    cs = ebfem.CrossSection(label='c', a=0.35, iy=1.728e-4, h=0.7, j=1.747e-4)
+    domain.addCrossSect(cs)
+    loadCase = ebfem.LoadCase(label='lc1')
+    domain.addLoadCase(loadCase)
+    domain.activeLoadCase = loadCase
+    n1 = domain.addNode(label='n1', coords=(0.,0.,0.), bcs={'z':True, 'X':True, 'Y':True})
+    n2 = domain.addNode(label='n2', coords=(6.,0.,0.), bcs={'z':True, 'X':True, 'Y':False})
+    n3 = domain.addNode(label='n3', coords=(3.,0.,0.), bcs={'z':False, 'X':False, 'Y':False})
+    n4 = domain.addNode(label='n4', coords=(3.,-4.,0.), bcs={'z':True, 'X':True, 'Y':True})
+    for label,nodes in (('e1',[n1,n3]), ('e2',[n3,n2]), ('e3',[n3,n4])):
+        domain.elements[label] = ebfem.BeamGrid2d(label=label, nodes=nodes, mat=material, cs=cs, domain=domain)
+    domain.elements['e1'].change(hinges=[False,True])
+    domain.addElementLoad(label='f1', where='e3', value={'magnitude':5000., 'dir':'Z', 'perX':False}, loadCase=loadCase)
+    domain.addNodalLoad(label='F1', where=n3, value={'fx':0., 'fy':0., 'fz':2000., 'mx':500., 'my':0., 'mz':0.}, loadCase=loadCase)
+    individualize(domain)
+    return domain, solver
+
+
+def giveResponses(domain, solver, responses):
+    ret = []
+    for type,where,index,loadCase in responses:
+        if type == 'displacement':
+            ret.append(solver.r[loadCase][domain.nodes[where].loc[domain.dofsNames.index(index)]])
+        elif type == 'reaction':
+            ret.append(solver.f[loadCase][domain.nodes[where].loc[domain.dofsNames.index(index)]])
+        else:
+            elems,fe = solver.computeEndForces([loadCase])
+            ret.append(fe[elems.index(domain.elements[where]),index,0])
+    return numpy.array(ret)
+
+
+def compareWithDifferences(domain, solver, responses, variables, h=1.e-6):
+    assert solver.solve(domain) == 0
+    sens = solver.computeSensitivities(responses, variables)
+    assert sens.shape == (len(responses),len(domain.elements),len(variables))
+    differences = numpy.zeros(sens.shape)
+    for ie,elem in enumerate(domain.elements.values()):
+        for iv,variable in enumerate(variables):
+            obj = elem.mat if variable in ('e','g') else elem.cs
+            x0 = getattr(obj, variable)
+            values = []
+            for x in (x0*(1.+h), x0*(1.-h)):
+                obj.change(**{variable:x})
+                perturbed = ebfem.LinearStaticSolver()
+                ebfem.Session(domain, perturbed)
+                perturbed.solve(domain)
+                values.append(giveResponses(domain, perturbed, responses))
+            obj.change(**{variable:x0})
+            differences[:,ie,iv] = (values[0]-values[1])/(2.*h*x0)
+    ebfem.Session(domain, solver)
+    # each response is compared relative to its largest derivative
+    scale = abs(differences).reshape(len(responses),-1).max(axis=1)
+    assert (scale > 0.).all()
+    assert (abs(sens-differences).reshape(len(responses),-1).max(axis=1) <= 1.e-5*scale).all()
+
+
+def test_beam2d_sensitivities():
+    domain,solver = buildFrame()
+    responses = [('displacement','t1','x','lc1'), ('displacement','t2','Y','lc2'), ('reaction','b0','Y','lc1'), ('reaction','b1','z','lc2'), ('endForce','e1',2,'lc1'), ('endForce','e2',5,'lc2'), ('endForce','c1',0,'lc2')]
+    compareWithDifferences(domain, solver, responses, ('e','g','a','iy','k'))
+
+
+def test_grid_sensitivities():
+    domain,solver = buildGrid()
+    responses = [('displacement','n3','z','lc1'), ('displacement','n2','Y','lc1'), ('reaction','n1','Y','lc1'), ('reaction','n2','X','lc1'), ('endForce','e3',2,'lc1'), ('endForce','e2',1,'lc1')]
+    compareWithDifferences(domain, solver, responses, ('e','g','iy','j'))
+
+
+if __name__ == '__main__':
+    test_beam2d_sensitivities()
+    test_grid_sensitivities()
+    print('sensitivity test passed')
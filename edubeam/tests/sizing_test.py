@@ -0,0 +1,100 @@
+"""
+Test of discrete sizing of cross sections of a symmetric two-span beam with deflection limit (ebanalysis.SectionSizing)
+"""
+
+import os
+import sys
+import itertools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebfem
+import ebanalysis
+from ebinit import logger
+logger.setLevel('WARN')
+
+stressLimit = 235.e6
+deflectionLimit = 6./500
+
+
+def buildBeam():
+    # two spans of 6 m, 12 elements in 4 groups of 3, symmetric designs of the two spans are mirror images of each other
+    solver = ebfem.LinearStaticSolver()
+    domain = ebfem.Domain()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='steel', e=210.e9, g=81.e9, alpha=12.e-6, d=7850.)
+    catalog = []
+    for i,h in enumerate(numpy.linspace(0.1, 0.45, 8)):
+        catalog.append(domain.addCrossSect(label='S%d'%i, a=0.0538*(h/0.3)**1.6, iy=8.356e-5*(h/0.3)**3.6, h=h, k=0.5, j=1.e-6).label)
+    domain.addLoadCase(label='lc1')
+    for i in range(13):
+        domain.addNode(label='n%d'%i, coords=(float(i),0.,0.), bcs={'x':i==0, 'z':i in (0,6,12), 'Y':False})
+    for i in range(12):
+        domain.addElement(label='e%d'%i, nodes=['n%d'%i,'n%d'%(i+1)], mat='steel', cs='S7')
+        domain.addElementLoad(label='q%d'%i, where='e%d'%i, value={'type':'Uniform','dir':'Z','magnitude':2.e3,'perX':False,'Fx':0.,'Fz':0.,'DistF':0.,'dTc':0.,'dTg':0.}, loadCase='lc1')
+    groups = [['e%d'%(3*g+k) for k in range(3)] for g in range(4)]
+    return domain, solver, catalog, groups
+
+
+def checkDesign(domain):
+    # weight, maximum stress ratio and maximum displacement ratio evaluated by independent solution
+    solver = ebfem.LinearStaticSolver()
+    ebfem.Session(domain, solver)
+    solver.solve(domain)
+    elems,x,(n,v,m) = solver.computeInternalForces(['lc1'])
+    stress = max((abs(n[i])/elem.cs.a + abs(m[i])*0.5*elem.cs.h/elem.cs.iy).max() for i,elem in enumerate(elems))/stressLimit
+    iz = domain.dofsNames.index('z')
+    col = solver.r.index['lc1']
+    deflection = max(abs(solver.r.data[node.loc[iz],col]) for node in domain.nodes.values())/deflectionLimit
+    weight = sum(elem.mat.d*elem.cs.a*elem.computeLength() for elem in domain.elements.values())
+    return weight, stress, deflection
+
+
+def test_deflection_limit():
+    domain,solver,catalog,groups = buildBeam()
+    startWeight = checkDesign(domain)[0]
+    sizing = ebanalysis.SectionSizing(domain, catalog, groups, stressLimit=stressLimit, deflectionLimit=deflectionLimit, dof='z', loadCases=['lc1'])
+    assert sizing.run(isUndoable=False) == 0
+    weight,stress,deflection = checkDesign(domain)
+    assert stress <= 1. and deflection <= 1.
+    assert weight < 0.5*startWeight
+
+    # the result is not heavier than the best symmetric design found by exhaustive search
+    best = None
+    for outer,inner in itertools.product(range(len(catalog)), repeat=2):
+        for group,s in zip(groups,(outer,inner,inner,outer)):
+            for label in group:
+                domain.elements[label].cs = domain.crossSects[catalog[s]]
+        w,st,de = checkDesign(domain)
+        if st <= 1. and de <= 1. and (best is None or w < best):
+            best = w
+    assert weight <= best*(1.+1.e-12)
+
+
+def test_infeasible_limit():
+    domain,solver,catalog,groups = buildBeam()
+    sizing = ebanalysis.SectionSizing(domain, catalog, groups, stressLimit=stressLimit, deflectionLimit=1.e-6, dof='z', loadCases=['lc1'])
+    assert sizing.run(isUndoable=False) == 1
+
+
+def test_grid_stress_limit():
+    # stresses of grid elements can not be checked, sizing fails and keeps the original sections
+    solver = ebfem.LinearStaticSolver()
+    domain = ebfem.Domain(type='grid2d')
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='m', e=20.e9, g=8.333e9, alpha=12.e-6, d=2400.)
+    catalog = [domain.addCrossSect(label='K%d'%i, a=0.35*(i+1), iy=1.728e-4*(i+1), h=0.7, j=1.747e-4*(i+1)).label for i in range(3)]
+    domain.addLoadCase(label='lc1')
+    nodes = [domain.addNode(label=label, coords=coords, bcs=bcs) for label,coords,bcs in (('n1',(0.,0.,0.),{'z':True,'X':True,'Y':True}), ('n2',(6.,0.,0.),{'z':True,'X':True,'Y':False}), ('n3',(3.,0.,0.),{'z':False,'X':False,'Y':False}), ('n4',(3.,-4.,0.),{'z':True,'X':True,'Y':True}))]
+    for label,i,j in (('e1',0,2), ('e2',2,1), ('e3',2,3)):
+        domain.elements[label] = ebfem.BeamGrid2d(label=label, nodes=[nodes[i],nodes[j]], mat=domain.materials['m'], cs=domain.crossSects['K2'], domain=domain)
+    domain.addNodalLoad(label='F1', where='n3', value={'fx':0., 'fy':0., 'fz':2000., 'mx':500., 'my':0., 'mz':0.}, loadCase='lc1')
+    sizing = ebanalysis.SectionSizing(domain, catalog, [['e1'],['e2'],['e3']], stressLimit=1.e3, loadCases=['lc1'])
+    assert sizing.run(isUndoable=False) == 1
+    assert [elem.cs.label for elem in domain.elements.values()] == ['K2','K2','K2']
+
+
+if __name__ == '__main__':
+    test_deflection_limit()
+    test_infeasible_limit()
+    test_grid_stress_limit()
+    print('sizing test passed')
@@ -0,0 +1,95 @@
+"""
+Test of critical load factors (ebfem.LinearStabilitySolver) of pinned column against Euler's critical force and of their caching for several load cases
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import numpy
+import ebfem
+from ebinit import logger
+logger.setLevel('ERROR')
+
+length = 5.
+e,iy = 210.e9, 1.e-5
+force = 10.e3
+
+
+def buildColumn(solver, nelem):
+    # pinned column compressed by axial force, shear deformation is suppressed (Euler-Bernoulli beam)
+    domain = ebfem.Domain()
+    ebfem.Session(domain, solver)
+    domain.addMaterial(label='steel', e=e, g=1.e6*e, alpha=12.e-6, d=7850.)
+    domain.addCrossSect(label='c', a=0.005, iy=iy, h=0.2, k=0.83)
+    domain.addLoadCase(label='lc1')
+    for i in range(nelem+1):
+        domain.addNode(label='n%d'%i, coords=(length*i/nelem,0.,0.), bcs={'x':i==0, 'z':i in (0,nelem), 'Y':False})
+    for i in range(nelem):
+        domain.addElement(label='e%d'%i, nodes=['n%d'%i,'n%d'%(i+1)], mat='steel', cs='c')
+    domain.addNodalLoad(label='F1', where='n%d'%nelem, value={'fx':-force, 'fy':0., 'fz':0., 'mx':0., 'my':0., 'mz':0.}, loadCase='lc1')
+    domain.changeActiveLoadCaseTo('lc1')
+    return domain
+
+
+def solveColumn(eigenSolver):
+    solver = ebfem.LinearStabilitySolver()
+    solver.eigenSolver = eigenSolver
+    # number of equations exceeds denseThreshold, so the matrices are sparse
+    domain = buildColumn(solver, 60)
+    assert solver.solve(domain) == 0
+    assert solver.linsolver.neq >= solver.linsolver.denseThreshold
+    return solver
+
+
+def test_euler_column():
+    solver = solveColumn('sparse')
+    assert len(solver.eigval) == solver.nmodes
+    assert numpy.isrealobj(solver.eigval)
+    # critical load factors of n-th buckling mode are n^2 times the first one
+    critical = numpy.pi**2*e*iy/length**2/force*numpy.arange(1,5)**2
+    assert abs(-solver.eigval[:4]/critical-1.).max() <= 1.e-4
+    assert abs(-solver.eigval[0]/critical[0]-1.) <= 1.e-6
+
+
+def test_sparse_equals_dense():
+    sparse = solveColumn('sparse')
+    dense = solveColumn('dense')
+    nmodes = len(sparse.eigval)
+    assert abs(dense.eigval[:nmodes].imag).max() <= 1.e-8*abs(dense.eigval[0])
+    assert abs(sparse.eigval-dense.eigval[:nmodes].real).max() <= 1.e-8*abs(sparse.eigval).max()
+
+
+def test_switching_load_cases():
+    solver = ebfem.LinearStabilitySolver()
+    domain = buildColumn(solver, 20)
+    domain.addLoadCase(label='lc2')
+    domain.addNodalLoad(label='F2', where='n20', value={'fx':-2.*force, 'fy':0., 'fz':0., 'mx':0., 'my':0., 'mz':0.}, loadCase='lc2')
+    domain.changeActiveLoadCaseTo('lc1')
+    assert solver.solve(domain) == 0
+    # both load cases are solved in one run, the load case without normal forces fails
+    assert 'lc1' in solver.eigenPairs and 'lc2' in solver.eigenPairs
+    assert 'Default_loadcase' in solver.failures
+    eigval1 = solver.eigval
+    assert solver.eigval is solver.eigenPairs['lc1'][0]
+    # neither the linear solution nor eigen problems are solved again
+    calls = []
+    solver.solveLoadCase = lambda *args: calls.append(args)
+    solver.linsolver.solve = lambda *args: calls.append(args)
+    domain.changeActiveLoadCaseTo('lc2')
+    solver.lcsChanged()
+    assert solver.isSolved
+    assert solver.eigval is solver.eigenPairs['lc2'][0]
+    assert abs(solver.eigval/eigval1-0.5).max() <= 1.e-8
+    assert solver.solve(domain) == 0
+    assert solver.eigval is solver.eigenPairs['lc2'][0]
+    domain.changeActiveLoadCaseTo('lc1')
+    assert solver.solve(domain) == 0
+    assert solver.eigval is eigval1
+    assert not calls
+
+
+if __name__ == '__main__':
+    test_euler_column()
+    test_sparse_equals_dense()
+    test_switching_load_cases()
+    print('stability test passed')